@@ -0,0 +1,298 @@
+#!/usr/bin/python3
+"""
+Benchmark generation throughput: drive each generator in-process, writing
+1, 100, 10k and 100k files into a temporary src/main/resources tree
+(assets/<modid>/... and data/<modid>/...), and report files/s, bytes/s and
+peak RSS for each.
+
+Each case runs in a forked child, so its peak RSS is its own. Results can
+be saved as a baseline, and a later run compared against it: a case that
+gets slower than the baseline by more than the tolerance fails the run
+(exit status 1).
+
+SYNOPSIS:
+
+usage: bench_generators.py [-h] [--sizes SIZES] [--cases PATTERN]
+                           [--profile {pretty,minified,canonical}]
+                           [--save-baseline FILE] [--baseline FILE]
+                           [--tolerance TOLERANCE] [--tmpdir TMPDIR]
+
+    --sizes       comma-separated file counts (default 1,100,10000,100000)
+    --cases       only run cases whose name contains PATTERN
+    --save-baseline FILE
+                  save files/s for each case and size as JSON
+    --baseline FILE
+                  compare against a saved baseline; fail on regressions
+    --tolerance   allowed slowdown against the baseline (default 0.25)
+
+e.g.
+    bench_generators.py --sizes 1000,10000 --save-baseline /tmp/base.json
+    ... change things ...
+    bench_generators.py --sizes 1000,10000 --baseline /tmp/base.json
+"""
+
+import sys
+import os
+import os.path
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mod_utils import output, template
+from mod_utils import (blockstates, models, recipes, silents, storage, tools,
+                       loot, advancements)
+
+MODID = 'benchmod'
+DEFAULT_SIZES = (1, 100, 10000, 100000)
+BLOCKSTATES = ('assets', 'blockstates')
+MODELS = ('assets', 'models')
+RECIPES = ('data', 'recipes')
+LOOT_TABLES = ('data', 'loot_tables/blocks')
+ADVANCEMENTS = ('data', 'advancements/recipes')
+# a furnace-like block for the 'other' blockstates: 32 states, 2 models.
+OTHER_SPEC = {
+    'properties' : { 'facing' : ['north', 'east', 'south', 'west'],
+                     'lit' : [True, False], 'level' : '0..3' },
+    'model' : '{name}{lit}',
+    'values' : { 'lit' : { True : '_on', False : '' } },
+    'rotate' : 'facing',
+}
+
+
+# CASES: each generator function yields (filename, text) for unit i; units
+# are generated until there are at least n files.
+def blockstate_case(blocktype):
+    def gen(i):
+        name = "b{}_{}".format(i, blocktype)
+        if blocktype == 'other':
+            # streamed from a property spec, as gen_blockstate_jsons.py does.
+            yield "{}.json".format(name), blockstates.stream_blockstate(MODID, name, OTHER_SPEC)
+        else:
+            yield "{}.json".format(name), blockstates.render_blockstate(MODID, name, blocktype)
+    return gen
+
+
+def model_case(modeltype):
+    def gen(i):
+        name = "m{}_{}".format(i, modeltype)
+        for model, text in models.block_models(MODID, name, modeltype):
+            yield "block/{}.json".format(model), text
+        for model, text in models.item_models(MODID, name, modeltype):
+            yield "item/{}.json".format(model), text
+    return gen
+
+
+CONDITIONS = recipes.flag_conditions(MODID, "{}_enabled".format(MODID))
+
+
+def custom_case(recipetype):
+    def gen(i):
+        result = "{}:r{}".format(MODID, i)
+        if recipetype == 'shaped':
+            text = recipes.shaped_recipe(["SSS", " T ", " T "],
+                    { "S" : "{}:x{}_ingot".format(MODID, i), "T" : "forge:rods/wooden" },
+                    result, conditions=CONDITIONS)
+        elif recipetype == 'shapeless':
+            text = recipes.shapeless_recipe("{}:x{}_block".format(MODID, i), result, 9)
+        elif recipetype in recipes.COOKING_TYPES:
+            text = recipes.cooking_recipe(recipetype, "{}:x{}_ore".format(MODID, i),
+                                          result, 0.7)
+        else:
+            text = recipes.fusion_recipe(["{}:tin_ingot".format(MODID),
+                                          "{}:copper_ingot".format(MODID)],
+                                         "minecraft:redstone", result, 2, 1.0)
+        yield recipes.recipe_filename(result, recipetype), text
+    return gen
+
+
+def silents_case(recipetype):
+    def gen(i):
+        if recipetype == 'crusher':
+            yield "crushing/r{}.json".format(i), silents.crushing_recipe(
+                    "#forge:ores/x{}".format(i),
+                    [ "{}:x{}_chunk,2".format(MODID, i), "{}:x{}_dust,0.1".format(MODID, i) ])
+        else:
+            yield "alloy_smelting/r{}.json".format(i), silents.alloy_recipe(
+                    [ "#forge:ingots/tin,1", "{}:x{},3".format(MODID, i) ],
+                    "{}:x{}_alloy,4".format(MODID, i), 200)
+    return gen
+
+
+def storage_set(i):
+    return storage.storage_recipes(MODID, "x{}".format(i), large_chunk=True,
+                                                medium_chunk=True)
+
+
+def tool_set(i):
+    prefix = "x{}".format(i)
+    return (tools.tool_recipes(MODID, prefix, armor=True)
+            + tools.recycling_recipes(MODID, prefix, armor=True))
+
+
+def loot_case(i):
+    name = "b{}_block".format(i)
+    yield "{}.json".format(name), loot.loot_table(MODID, name)
+
+
+def advancement_case(i):
+    name = "x{}_ingot".format(i)
+    yield "{}.json".format(name), advancements.advancement(MODID,
+            "{}:{}".format(MODID, name),
+            [ "{}:x{}_{}".format(MODID, i, r) for r in ('block', 'ingot', 'nugget') ])
+
+
+def all_cases():
+    """ [(name, tree, generator)] """
+    cases = []
+    for t in blockstates.BLOCKSTATE_TYPES:
+        cases.append(("blockstate {}".format(t), BLOCKSTATES, blockstate_case(t)))
+    for t in models.MODEL_TYPES:
+        cases.append(("model {}".format(t), MODELS, model_case(t)))
+    for t in ('shaped', 'shapeless') + tuple(recipes.COOKING_TYPES) + ('fusion',):
+        cases.append(("custom {}".format(t), RECIPES, custom_case(t)))
+    for t in ('crusher', 'alloy_smelter'):
+        cases.append(("silents {}".format(t), RECIPES, silents_case(t)))
+    cases.append(("storage set", RECIPES, storage_set))
+    cases.append(("tool set", RECIPES, tool_set))
+    cases.append(("loot table", LOOT_TABLES, loot_case))
+    cases.append(("advancement", ADVANCEMENTS, advancement_case))
+    return cases
+
+
+def peak_rss_kb():
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def counted(chunks, size):
+    """ pass chunks through, adding their byte count to size[0]. """
+    for chunk in chunks:
+        size[0] += len(chunk.encode('utf-8'))
+        yield chunk
+
+
+def run_case(tree, gen, n, tmpdir):
+    """ generate and write n files (at least); returns (files, bytes,
+    seconds), or None if the generator isn't implemented for this type.
+    """
+    base = os.path.join(tmpdir, 'src', 'main', 'resources', tree[0], MODID, tree[1])
+    os.makedirs(base)
+    files = 0
+    size = [0]
+    start = time.perf_counter()
+    out = output.OutputWriter(base, use_index=False)
+    try:
+        i = 0
+        while files < n:
+            for filename, text in gen(i):
+                # the writer makes subdirectories as needed.
+                if isinstance(text, str):
+                    size[0] += len(text.encode('utf-8'))
+                else:
+                    text = counted(text, size)
+                out.write(filename, text)
+                files += 1
+            i += 1
+    except NotImplementedError:
+        return None
+    finally:
+        out.close()
+    return files, size[0], time.perf_counter() - start
+
+
+def run_forked(tree, gen, n, tmpdir):
+    """ run_case in a child process; returns its result dict. """
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        status = 0
+        try:
+            result = run_case(tree, gen, n, tmpdir)
+            data = { 'result' : result, 'rss' : peak_rss_kb() }
+        except Exception as e:
+            data = { 'error' : "{}: {}".format(type(e).__name__, e) }
+            status = 1
+        with os.fdopen(w, 'w') as f:
+            json.dump(data, f)
+        os._exit(status)
+    os.close(w)
+    with os.fdopen(r, 'r') as f:
+        data = json.loads(f.read() or '{}')
+    os.waitpid(pid, 0)
+    shutil.rmtree(tmpdir, ignore_errors=True)
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark generator throughput")
+    parser.add_argument("--sizes", default=','.join(str(s) for s in DEFAULT_SIZES),
+            help="comma-separated file counts (default: %(default)s)")
+    parser.add_argument("--cases", metavar="PATTERN",
+            help="only run cases whose name contains PATTERN")
+    parser.add_argument("--profile", choices=template.PROFILES, default='pretty',
+            help="JSON output profile")
+    parser.add_argument("--save-baseline", metavar="FILE",
+            help="save files/s for each case and size as JSON")
+    parser.add_argument("--baseline", metavar="FILE",
+            help="compare against a saved baseline; fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+            help="allowed slowdown against the baseline (default: %(default)s)")
+    parser.add_argument("--tmpdir", help="where to make the temporary trees")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    template.set_profile(args.profile)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    print("{:<28} {:>8} {:>12} {:>12} {:>10} {:>10}".format("case", "files",
+          "files/s", "MB/s", "peak RSS", "baseline"))
+    results = {}
+    regressions = []
+    errors = 0
+    for name, tree, gen in all_cases():
+        if args.cases and args.cases not in name:
+            continue
+        for n in sizes:
+            key = "{}@{}".format(name, n)
+            tmpdir = tempfile.mkdtemp(prefix='bench_generators.', dir=args.tmpdir)
+            data = run_forked(tree, gen, n, tmpdir)
+            if 'error' in data or not data:
+                print("{:<28} {:>8} ERROR {}".format(name, n, data.get('error', 'child died')))
+                errors += 1
+                continue
+            if data['result'] is None:
+                print("{:<28} {:>8} not implemented".format(name, n))
+                break
+            files, size, seconds = data['result']
+            rate = files / seconds if seconds > 0 else float('inf')
+            results[key] = rate
+            compare = ''
+            if key in baseline:
+                change = rate / baseline[key] - 1.0
+                compare = "{:+.0%}".format(change)
+                if change < -args.tolerance:
+                    regressions.append((key, change))
+                    compare += ' !'
+            print("{:<28} {:>8} {:>12.0f} {:>12.2f} {:>7.1f} MB {:>10}".format(name,
+                  files, rate, size / seconds / 1e6 if seconds > 0 else 0.0,
+                  data['rss'] / 1024.0, compare))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+        print("Baseline saved to {}".format(args.save_baseline))
+    for key, change in regressions:
+        print("REGRESSION: {} is {:.0%} slower than the baseline".format(key, -change))
+    return 1 if regressions or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
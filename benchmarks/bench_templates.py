@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+"""
+Benchmark the compiled templates against the old per-file
+copy.deepcopy(TEMPLATE) / fill in / json.dump() way of doing things, and
+check that both give byte-identical output.
+
+SYNOPSIS:
+
+bench_templates.py [-h] [--number NUMBER]
+
+Reports the per-file cost of each template both ways.
+"""
+
+import sys
+import os.path
+import argparse
+import copy
+import json
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mod_utils.template import OMIT, Slot
+from mod_utils import (blockstates, models, recipes, silents, storage, tools,
+                       loot, advancements)
+
+CONDITIONS = [ { "type" : "foo:flag", "flag" : "foo_enabled" } ]
+KEY = { "S" : { "item" : "foo:bar_ingot" }, "T" : { "tag" : "forge:rods/wooden" } }
+
+
+def blockstate_case(blocktype):
+    return blockstates.blockstate_slots('foo', 'bar_' + blocktype, blocktype)
+
+
+CASES = [
+    ('blockstate simple', ) + blockstate_case('simple'),
+    ('blockstate pressure_plate', ) + blockstate_case('pressure_plate'),
+    ('blockstate slab', ) + blockstate_case('slab'),
+    ('blockstate bars', ) + blockstate_case('bars'),
+    ('blockstate stairs', ) + blockstate_case('stairs'),
+    ('blockstate door', ) + blockstate_case('door'),
+    ('model block', models.BLOCK_BLOCK, { 'texture' : 'foo:block/bar' }),
+    ('model slab', models.BLOCK_SLAB, { 'texture' : 'foo:block/bar' }),
+    ('model item', models.ITEM_GENERATED, { 'texture' : 'foo:item/bar' }),
+    ('custom shaped', recipes.SHAPED_TEMPLATE,
+        { 'conditions' : CONDITIONS, 'pattern' : ["SS ", "ST ", " T "], 'key' : KEY,
+          'result' : { "item" : "foo:bar_axe" } }),
+    ('custom shapeless', recipes.SHAPELESS_TEMPLATE,
+        { 'conditions' : OMIT, 'ingredient' : { "item" : "foo:bar_block" },
+          'result' : { "item" : "foo:bar_ingot", "count" : 9 } }),
+    ('custom smelting', recipes.SMELTING_TEMPLATE,
+        { 'type' : "minecraft:smelting", 'conditions' : OMIT,
+          'ingredient' : { "item" : "foo:bar_ore" }, 'result' : "foo:bar_ingot",
+          'experience' : 0.7, 'cookingtime' : 200 }),
+    ('custom fusion', recipes.FUSION_TEMPLATE,
+        { 'conditions' : OMIT, 'output' : { "item" : "foo:bronze_ingot" },
+          'input0' : "foo:tin_ingot", 'input1' : "foo:copper_ingot",
+          'catalyst' : { "item" : "minecraft:redstone" }, 'experience' : 1.0 }),
+    ('silents crusher', silents.CRUSHING_TEMPLATE,
+        { 'process_time' : 300, 'ingredient' : { "tag" : "forge:ores/bar" },
+          'results' : [ { "item" : "foo:bar_chunk", "count" : 2 },
+                        { "item" : "foo:bar_dust", "chance" : 0.1 } ] }),
+    ('silents alloy', silents.ALLOY_TEMPLATE,
+        { 'process_time' : 200, 'ingredients' : [ { "tag" : "forge:ingots/tin", "count" : 1 },
+                                                 { "item" : "foo:copper", "count" : 3 } ],
+          'result' : { "item" : "foo:bronze", "count" : 4 } }),
+    ('storage shaped', storage.SHAPED_TEMPLATE,
+        { 'conditions' : CONDITIONS, 'pattern' : ["SSS", "SSS", "SSS"],
+          'key' : { "S" : { "item" : "foo:bar_ingot" } },
+          'result' : { "item" : "foo:bar_block" } }),
+    ('tool shaped', tools.RECIPE_TEMPLATE,
+        { 'conditions' : OMIT, 'result' : "foo:bar_pickaxe",
+          'pattern' : ["SSS", " T ", " T "], 'key' : KEY }),
+    ('loot table', loot.LOOT_TABLE_TEMPLATE,
+        { 'pool_name' : "foo:droppool", 'name' : "foo:bar_block" }),
+    ('advancement', advancements.ADVANCEMENT_TEMPLATE,
+        { 'parent' : "foo:recipes/root", 'item' : "foo:bar_ingot",
+          'recipes' : [ "foo:bar_block", "foo:bar_nugget" ] }),
+]
+
+
+def slot_paths(node, path=()):
+    """ (path, slot) for every slot in a template tree, like the literal
+    blockstate['variants'][...]['model'] = ... lines the scripts used to have.
+    """
+    if isinstance(node, Slot):
+        yield path, node
+    elif isinstance(node, dict):
+        for k, v in node.items():
+            yield from slot_paths(v, path + (k,))
+    elif isinstance(node, list):
+        for i, v in enumerate(node):
+            yield from slot_paths(v, path + (i,))
+
+
+def make_legacy(template):
+    """ the old way: deepcopy a None-filled template, assign, json.dump. """
+    nones = { name : None for name in template.slots }
+    old_template = template.fill(**nones)
+    paths = list(slot_paths(template.tree))
+
+    def legacy(values):
+        tree = copy.deepcopy(old_template)
+        omitted = []
+        for path, slot in paths:
+            node = tree
+            for p in path[:-1]:
+                node = node[p]
+            value = values.get(slot.name, OMIT)
+            if value is OMIT:
+                omitted.append((node, path[-1]))
+            else:
+                node[path[-1]] = value
+        for node, k in reversed(omitted):
+            del node[k]
+        return json.dumps(tree, indent=template.indent, sort_keys=template.sort_keys)
+    return legacy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark compiled templates against deepcopy + json.dump")
+    parser.add_argument("--number", "-n", type=int, default=2000,
+            help="files rendered per timing run")
+    args = parser.parse_args(argv)
+
+    print("{:<26} {:>12} {:>12} {:>8}".format("template", "old us/file",
+                                                "new us/file", "speedup"))
+    failed = 0
+    for name, template, values in CASES:
+        legacy = make_legacy(template)
+        if legacy(values) != template.render(**values):
+            print("{:<26} OUTPUT DIFFERS".format(name))
+            failed += 1
+            continue
+        old = min(timeit.repeat(lambda: legacy(values), number=args.number, repeat=3))
+        new = min(timeit.repeat(lambda: template.render(**values), number=args.number, repeat=3))
+        print("{:<26} {:12.2f} {:12.2f} {:7.1f}x".format(name,
+              old * 1e6 / args.number, new * 1e6 / args.number, old / new))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
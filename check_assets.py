@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""
+Cross-check a mod's assets: every model a blockstate or model refers to,
+and every texture a model refers to, must exist. Also lists block models
+nothing refers to and block/item textures no model uses.
+
+Scans assets/<ns>/blockstates, assets/<ns>/models and assets/<ns>/textures
+for every namespace in the tree. The index of references is kept in the
+mod_utils cache directory and refreshed by mtime, so only files changed
+since the last check are read again.
+
+Must be run in src/main/resources (or given --resources).
+
+SYNOPSIS:
+
+usage: check_assets.py [-h] [--resources RESOURCES] [--rebuild] [--no-cache]
+                       [--quiet]
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --resources RESOURCES
+                        the src/main/resources directory (default: cwd)
+  --rebuild             ignore the saved index and read every file again
+  --no-cache            do not load or save the index
+  --quiet, -q           only report dangling references and unreadable files
+
+Exit status is 1 if there are dangling references or unreadable files;
+orphaned models and unused textures are only warnings.
+
+"""
+
+import sys
+import os
+import os.path
+import argparse
+import time
+
+from mod_utils.assets import AssetIndex
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check asset references: missing models and textures, orphaned models, unused textures")
+    parser.add_argument("--resources", default=os.getcwd(),
+            help="the src/main/resources directory (default: cwd)")
+    parser.add_argument("--rebuild", action="store_true",
+            help="ignore the saved index and read every file again")
+    parser.add_argument("--no-cache", action="store_true",
+            help="do not load or save the index")
+    parser.add_argument("--quiet", "-q", action="store_true",
+            help="only report dangling references and unreadable files")
+    args = parser.parse_args(argv)
+
+    resources = os.path.abspath(args.resources)
+    if not os.path.isdir(os.path.join(resources, 'assets')):
+        print('Warning: not in src/main/resources directory')
+        return 1
+
+    start = time.perf_counter()
+    index = AssetIndex(resources, use_cache=not args.no_cache)
+    if args.rebuild:
+        index.files = {}
+    count = index.refresh()
+    report = index.check()
+    index.save()
+    seconds = time.perf_counter() - start
+
+    for rel, error in report['errors']:
+        print("Error: cannot read {}: {}".format(rel, error))
+    if report['dangling']:
+        print("Dangling references ({}):".format(len(report['dangling'])))
+        for rel, kind, ref in report['dangling']:
+            print("  {}: missing {} {}".format(rel, kind, ref))
+    if not args.quiet:
+        if report['orphans']:
+            print("Orphaned block models ({}):".format(len(report['orphans'])))
+            for rid in report['orphans']:
+                print("  {}".format(rid))
+        if report['unused']:
+            print("Unused textures ({}):".format(len(report['unused'])))
+            for rid in report['unused']:
+                print("  {}".format(rid))
+
+    print("Checked {} files ({} read) in {:.3f} s: {} dangling, {} orphaned, {} unused, {} unreadable".format(
+          count, index.parsed, seconds, len(report['dangling']), len(report['orphans']),
+          len(report['unused']), len(report['errors'])))
+    return 1 if report['dangling'] or report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
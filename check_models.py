@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+"""
+Check that every model ends up with all the textures its elements use:
+follows each model's parent chain (the mod's own models, and vanilla ones
+read from a Minecraft client jar) and reports texture variables left
+unset, e.g. a slab model whose 'side' is never given, as well as parents
+that don't exist.
+
+Each model is resolved once and shared by all its children. Vanilla
+models are read straight from the jar (not extracted), and kept in an
+index in the mod_utils cache directory so later checks don't open the
+jar at all. Without a jar, chains ending in vanilla models aren't checked.
+Models that other models inherit from are taken to be templates, and only
+checked through their children.
+
+Must be run in src/main/resources (or given --resources).
+
+SYNOPSIS:
+
+usage: check_models.py [-h] [--resources RESOURCES] [--jar JAR] [--no-cache]
+                       [--quiet]
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --resources RESOURCES
+                        the src/main/resources directory (default: cwd)
+  --jar JAR             Minecraft client jar for vanilla models (default:
+                        $MOD_UTILS_CLIENT_JAR, or the newest one in the
+                        ForgeGradle cache or ~/.minecraft/versions)
+  --no-cache            do not load or save the vanilla model index
+  --quiet, -q           only print the totals
+
+Exit status is 1 if there are unresolved textures or missing parents.
+
+"""
+
+import sys
+import os
+import os.path
+import argparse
+import json
+import time
+
+from mod_utils import parents, vanilla
+
+
+def mod_models(resources):
+    """ (model id => model entry, namespaces, errors) for a resources tree. """
+    assets = os.path.join(resources, 'assets')
+    models = {}
+    errors = []
+    namespaces = sorted(os.listdir(assets))
+    for ns in namespaces:
+        top = os.path.join(assets, ns, 'models')
+        for dirpath, dirnames, filenames in os.walk(top):
+            for f in filenames:
+                if not f.endswith('.json'):
+                    continue
+                path = os.path.join(dirpath, f)
+                rel = os.path.relpath(path, top)[:-len('.json')].replace(os.sep, '/')
+                try:
+                    with open(path, 'rb') as fp:
+                        tree = json.loads(fp.read())
+                except (OSError, ValueError) as e:
+                    errors.append((path, str(e)))
+                    continue
+                models["{}:{}".format(ns, rel)] = vanilla.model_entry(tree)
+    return models, namespaces, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check models for texture variables their parents leave unset")
+    parser.add_argument("--resources", default=os.getcwd(),
+            help="the src/main/resources directory (default: cwd)")
+    parser.add_argument("--jar",
+            help="Minecraft client jar for vanilla models (default: $MOD_UTILS_CLIENT_JAR, "
+                 "or the newest one in the ForgeGradle cache or ~/.minecraft/versions)")
+    parser.add_argument("--no-cache", action="store_true",
+            help="do not load or save the vanilla model index")
+    parser.add_argument("--quiet", "-q", action="store_true",
+            help="only print the totals")
+    args = parser.parse_args(argv)
+
+    resources = os.path.abspath(args.resources)
+    if not os.path.isdir(os.path.join(resources, 'assets')):
+        print('Warning: not in src/main/resources directory')
+        return 1
+
+    start = time.perf_counter()
+    jar = args.jar or vanilla.find_client_jar()
+    models = None
+    if jar:
+        try:
+            models = vanilla.VanillaModels(jar, use_cache=not args.no_cache)
+        except OSError as e:
+            print("Error: cannot read {}: {}".format(jar, e), file=sys.stderr)
+            return 1
+    else:
+        print("Warning: no client jar found; vanilla parents are not checked")
+
+    found, namespaces, errors = mod_models(resources)
+    resolver = parents.ModelResolver(found, models, namespaces)
+    templates = set(parents.namespaced(entry[0]) for entry in found.values() if entry[0])
+    problems = 0
+    unchecked = 0
+    try:
+        for model_id in sorted(found):
+            if model_id in templates:
+                continue
+            missing, model = resolver.unresolved(model_id)
+            if not model.known:
+                unchecked += 1
+            if model.error:
+                problems += 1
+                if not args.quiet:
+                    print("{}: {} ({})".format(model_id, model.error, ' -> '.join(model.chain)))
+            elif missing:
+                problems += 1
+                if not args.quiet:
+                    print("{}: unresolved {} ({})".format(model_id,
+                          ', '.join('#' + name for name in missing), ' -> '.join(model.chain)))
+    finally:
+        if models is not None:
+            models.close()
+            models.save()
+
+    for path, error in errors:
+        print("Error: cannot read {}: {}".format(path, error))
+    print("Checked {} models in {:.3f} s{}: {} with problems, {} not checked, {} unreadable".format(
+          len(found), time.perf_counter() - start,
+          " ({} vanilla models read from the jar)".format(models.read) if models is not None else "",
+          problems, unchecked, len(errors)))
+    return 1 if problems or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
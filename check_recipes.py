@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""
+Find recipes that conflict: two recipes with the same shaped pattern and
+keys (or its mirror image), the same shapeless ingredients, the same
+smelting input, and so on. The game picks one of them arbitrarily.
+
+Every recipe JSON under the given directories is read, including the
+fusion_furnace/, crushing/ and alloy_smelting/ subdirectories. Each
+directory may be a src/main/resources directory, its data directory, or
+one mod's data/<modid>/recipes; give several to check mods against each
+other. Defaults to the current directory.
+
+SYNOPSIS:
+
+usage: check_recipes.py [-h] [--no-overlaps] [--quiet] [path [path ...]]
+
+positional arguments:
+  path             resources, data or recipes directories (default: cwd)
+
+optional arguments:
+  -h, --help       show this help message and exit
+  --no-overlaps    don't report shapeless recipes that also match a shaped
+                   recipe's pattern
+  --quiet, -q      only print the totals
+
+Recipes that make the same thing are reported as duplicates, others as
+conflicts. Exit status is 1 if anything was found.
+
+"""
+
+import sys
+import os
+import argparse
+import time
+
+from mod_utils import conflicts
+
+
+def describe(sig):
+    """ short description of a signature for the report. """
+    if sig[0] == conflicts.SHAPED:
+        return "{} {}".format(sig[0], ' / '.join(
+               ' '.join(c or '_' for c in row) for row in sig[1]))
+    parts = []
+    for part in sig:
+        if isinstance(part, tuple):
+            # an ingredient multiset
+            part = ' + '.join("{}x{}".format(n, k) if n > 1 else k for k, n in part)
+        parts.append(part)
+    return ' '.join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find conflicting and duplicate recipes")
+    parser.add_argument("path", nargs='*', default=[os.getcwd()],
+            help="resources, data or recipes directories (default: cwd)")
+    parser.add_argument("--no-overlaps", action="store_true",
+            help="don't report shapeless recipes that also match a shaped recipe's pattern")
+    parser.add_argument("--quiet", "-q", action="store_true",
+            help="only print the totals")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = conflicts.RecipeIndex()
+    for root in args.path:
+        for recipe_id, path in conflicts.recipe_files(root):
+            index.add_file(recipe_id, path)
+
+    found = 0
+    duplicates = 0
+    for sig, entries in sorted(index.conflicts(), key=lambda c: c[1][0][0]):
+        found += 1
+        same = len(set(e[2] for e in entries)) == 1
+        if same:
+            duplicates += 1
+        if not args.quiet:
+            print("{}: {}".format("Duplicate" if same else "Conflict", describe(sig)))
+            for recipe_id, path, result in entries:
+                print("  {:<40} => {}   ({})".format(recipe_id, result, path))
+
+    overlaps = 0
+    if not args.no_overlaps:
+        for shapeless, shaped in index.overlaps():
+            overlaps += 1
+            if not args.quiet:
+                print("Overlap: shapeless {} also matches shaped {}".format(
+                      ', '.join(e[0] for e in shapeless), ', '.join(e[0] for e in shaped)))
+
+    for path, error in index.errors:
+        print("Error: cannot read {}: {}".format(path, error))
+    print("Checked {} recipes in {:.3f} s: {} conflicts, {} duplicates, {} overlaps, {} unreadable".format(
+          index.count, time.perf_counter() - start, found - duplicates, duplicates,
+          overlaps, len(index.errors)))
+    return 1 if found or overlaps or index.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+"""
+Convert old .lang files to JSON lang files: camelCase names in the keys
+become snake_case (as fixCamelCaseResources.pl did) and the result is
+written straight out as <locale>.json, e.g. en_US.lang => en_us.json.
+Replaces fixCamelCaseResources.pl plus a web converter.
+
+Each file is streamed a line at a time, so memory doesn't grow with the
+size of the translations; all the locales of a lang/ directory are
+converted in parallel. Keys that end up the same after snake_casing are
+reported (the first one is kept).
+
+SYNOPSIS:
+
+usage: convert_lang.py [-h] [--output DIR] [--modid MODID] [--jobs N]
+                       [--force] [--profile {pretty,minified,canonical}]
+                       [path [path ...]]
+
+positional arguments:
+  path                  .lang files or lang directories (default: cwd)
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --output DIR, -o DIR  where to write the .json files (default: next to
+                        each .lang file)
+  --modid MODID         also rename keys to the 1.13+ scheme:
+                        tile.<name>.name => block.<modid>.<name>,
+                        item.<name>.name => item.<modid>.<name>
+  --jobs N, -j N        convert with N processes (default: one per CPU)
+  --force               rewrite files even if they appear unchanged
+  --profile {pretty,minified,canonical}
+                        JSON style to write; default pretty
+
+Exit status is 1 if any file couldn't be converted or had colliding keys.
+
+"""
+
+import sys
+import os
+import os.path
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mod_utils import lang, output, template
+
+
+def lang_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for f in sorted(os.listdir(path)):
+                if f.endswith('.lang'):
+                    yield os.path.join(path, f)
+        else:
+            yield path
+
+
+def json_name(path):
+    """ en_US.lang => en_us.json """
+    return os.path.splitext(os.path.basename(path))[0].lower() + '.json'
+
+
+def convert_file(path, out_dir, modid, profile, force):
+    """ convert one .lang file; returns a dict of what happened. """
+    template.set_profile(profile)
+    result = { 'path' : path, 'output' : json_name(path) }
+    t0 = time.perf_counter()
+    out = output.OutputWriter(out_dir or os.path.dirname(os.path.abspath(path)), force=force)
+    try:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            entries = lang.LangEntries(f, modid)
+            result['status'] = out.write(result['output'], template.stream_json(None, entries))
+    except (OSError, UnicodeDecodeError) as e:
+        result['error'] = str(e)
+        return result
+    finally:
+        out.close()
+    result['count'] = entries.count
+    result['collisions'] = entries.collisions
+    result['bad_lines'] = entries.bad_lines
+    result['time'] = time.perf_counter() - t0
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert .lang files to snake_cased JSON lang files")
+    parser.add_argument("path", nargs='*', default=[os.getcwd()],
+            help=".lang files or lang directories (default: cwd)")
+    parser.add_argument("--output", "-o", metavar="DIR",
+            help="where to write the .json files (default: next to each .lang file)")
+    parser.add_argument("--modid",
+            help="also rename keys to the 1.13+ scheme: tile.<name>.name => block.<modid>.<name>, "
+                 "item.<name>.name => item.<modid>.<name>")
+    parser.add_argument("--jobs", "-j", type=int, metavar="N",
+            help="convert with N processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true",
+            help="rewrite files even if they appear unchanged")
+    parser.add_argument("--profile", choices=template.PROFILES, default='pretty',
+            help="JSON style to write; default pretty")
+    args = parser.parse_args(argv)
+
+    files = list(lang_files(args.path))
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    start = time.perf_counter()
+    jobs = args.jobs or os.cpu_count() or 1
+    common = (args.output, args.modid, args.profile, args.force)
+    if jobs > 1 and len(files) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(files)))
+        results = pool.map(convert_file, files, *([v] * len(files) for v in common))
+    else:
+        pool = None
+        results = (convert_file(f, *common) for f in files)
+
+    problems = 0
+    entries = 0
+    try:
+        for result in results:
+            name = os.path.basename(result['path'])
+            if 'error' in result:
+                print("Error: {}: {}".format(result['path'], result['error']), file=sys.stderr)
+                problems += 1
+                continue
+            entries += result['count']
+            print("{:<20} => {:<20} {:>7} keys {:9.3f} ms  {}".format(name, result['output'],
+                  result['count'], result['time'] * 1000.0, result['status']))
+            for key, (first, firstline), (other, line) in result['collisions']:
+                print("  Collision: {} (line {}) and {} (line {}) both become {}".format(
+                      first, firstline, other, line, key))
+            if result['bad_lines']:
+                print("  Skipped lines without key=value: {}".format(
+                      ', '.join(str(n) for n in result['bad_lines'])))
+            if result['collisions']:
+                problems += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print("Converted {} files, {} keys in {:.3f} s; {} with problems".format(
+          len(files), entries, time.perf_counter() - start, problems))
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
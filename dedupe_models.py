@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+"""
+Find duplicate block & item models and consolidate them: block models that
+are exactly the same are merged into one (blockstates and models that
+refer to the others are pointed at it), and models that are the same but
+for their textures (all the slabs, all the generated items...) get a shared
+parent under block/shared/ or item/shared/ holding what they have in
+common, where that makes the files smaller. See mod_utils/dedupe.py.
+
+Must be run in src/main/resources/assets/<modid>/models. Only reports what
+it would do unless --apply is given.
+
+SYNOPSIS:
+
+usage: dedupe_models.py [-h] [--apply] [--quiet] [--force]
+                        [--profile {pretty,minified,canonical}]
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --apply               consolidate the models (default: only report)
+  --quiet, -q           only print the totals
+  --force               rewrite files even if they appear unchanged
+  --profile {pretty,minified,canonical}
+                        JSON style to write (and compare sizes in); default
+                        pretty
+
+Models referred to only from code (or from other mods) can't be seen;
+check what would be removed before using --apply.
+
+"""
+
+import sys
+import os
+import os.path
+import argparse
+
+from mod_utils import dedupe, output, template
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find and consolidate duplicate models")
+    parser.add_argument("--apply", action="store_true",
+            help="consolidate the models (default: only report)")
+    parser.add_argument("--quiet", "-q", action="store_true",
+            help="only print the totals")
+    parser.add_argument("--force", action="store_true",
+            help="rewrite files even if they appear unchanged")
+    parser.add_argument("--profile", choices=template.PROFILES, default='pretty',
+            help="JSON style to write (and compare sizes in); default pretty")
+    args = parser.parse_args(argv)
+    template.set_profile(args.profile)
+
+    # parse directory and make sure we are in the right place...
+    (head, tail) = os.path.split(os.getcwd())
+    if tail != 'models':
+        print('Warning: not in models directory')
+        return 1
+    (head, modid) = os.path.split(head)
+    (head, tail) = os.path.split(head)
+    if tail != 'assets':
+        print('Warning: not in assets/{}/models directory'.format(modid))
+        return 1
+
+    models = dedupe.ModelSet(os.getcwd(), modid)
+    plan = models.plan()
+    if not args.quiet:
+        for kept, removed in plan['exact']:
+            print("Duplicate: {} same as {}".format(', '.join(removed), kept))
+        for pid, parent, children in plan['shared']:
+            print("Shared parent {}: {} models".format(pid, len(children)))
+            for mid in children:
+                print("  {}".format(mid))
+
+    redirected = 0
+    errors = len(models.errors)
+    if args.apply:
+        blockstates = os.path.join(os.path.dirname(os.getcwd()), 'blockstates')
+        redirected, writers = models.apply(plan, blockstates, force=args.force)
+        for out in writers:
+            print(out.summary())
+            errors += output.report_errors(out)
+
+    for path, error in models.errors:
+        print("Error: cannot read {}: {}".format(path, error), file=sys.stderr)
+    saved = plan['size'] - plan['new_size']
+    print("{} models, {} duplicates {}, {} {} onto {} shared parents{}: {} => {} bytes ({:.1%} smaller)".format(
+          plan['models'], plan['removed'], "removed" if args.apply else "to remove",
+          plan['rewritten'], "rewritten" if args.apply else "to rewrite", len(plan['shared']),
+          ", {} references redirected".format(redirected) if args.apply else "",
+          plan['size'], plan['new_size'], saved / plan['size'] if plan['size'] else 0.0))
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
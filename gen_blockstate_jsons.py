@@ -6,9 +6,11 @@ Must be run in src/main/resources/assets/<modid>/blockstates.
 
 SYNOPSIS:
 
-gen_blockstate_jsons.py [-h] --type
-                               {simple,crop,facing,bars,doors,pane,stairs,pressure_plate,other}
-                               blockname
+gen_blockstate_jsons.py [-h]
+                        [--type {simple,crop,facing,bars,door,pane,stairs,pressure_plate,slab,horizontal_facing,machine,pillar,log,other}]
+                        [--spec SPEC] [--manifest MANIFEST]
+                        [--manifest-format {json,toml,csv}] [--quiet]
+                        [blockname]
 
 Generate blockstates for standard block types
 
@@ -17,8 +19,64 @@ positional arguments:
 
 optional arguments:
   -h, --help            show this help message and exit
-  --type {simple,crop,facing,bars,door,pane,stairs,pressure_plate,other}, -t {simple,crop,facing,bars,door,pane,stairs,pressure_plate,other}
+  --type {simple,crop,facing,bars,door,pane,stairs,pressure_plate,slab,horizontal_facing,machine,pillar,log,other}, -t {simple,crop,facing,bars,door,pane,stairs,pressure_plate,slab,horizontal_facing,machine,pillar,log,other}
                         type of blockstate
+  --spec SPEC, -s SPEC  property spec (JSON or TOML) for --type other
+  --manifest MANIFEST, -m MANIFEST
+                        batch mode: generate every blockname/type row listed
+                        in this JSON, TOML or CSV manifest ('-' for stdin)
+  --manifest-format {json,toml,csv}
+                        manifest format, if it cannot be told from the file
+                        extension
+  --quiet, -q           batch mode: only report total timings
+
+'facing' blocks turn to all 6 directions (like observers), 'horizontal_facing'
+to the 4 horizontal ones, and 'machine' is horizontal_facing plus a lit
+property using <blockname>_on (like furnaces). 'pillar' blocks turn one model
+to their axis; 'log' uses <blockname>_horizontal for the x and z axes.
+'crop' blocks use <blockname>_stage0..7 for age 0..7.
+
+OTHER BLOCKS:
+
+'other' blocks take a property spec listing their properties and how the
+states map to models and rotations, e.g. lamp.toml:
+
+    model = "{name}_{level}{lit}"
+    rotate = "facing"
+    [properties]
+    facing = [ "north", "east", "south", "west", "up", "down" ]
+    lit = [ false, true ]
+    level = "0..15"
+    waterlogged = [ false, true ]
+    [values.lit]
+    true = "_on"
+    false = ""
+
+    gen_blockstate_jsons.py -t other -s lamp.toml copper_lamp
+
+Variants are written out one at a time, so blocks with tens of thousands of
+states don't need the memory for them; past max_variants (default 4096)
+states, blocks whose model ignores some properties are written as
+multipart instead. See mod_utils/variants.py for all the spec keys.
+
+BATCH MODE:
+
+Rather than calling this script once per block, list the blocks in a
+manifest and generate them all in one process, e.g. blocks.csv:
+
+    blockname,type
+    copper_block,simple
+    copper_slab,slab
+    copper_stairs,stairs
+
+    gen_blockstate_jsons.py --manifest ../../../../../../scripts/blocks.csv
+
+'other' rows give their property spec file in a spec column; item_only
+rows (items, in a manifest shared with gen_model_jsons.py) are skipped.
+
+JSON manifests are a list of {"blockname": ..., "type": ...} objects (or an
+object with a "blocks" list); TOML manifests are a [[blocks]] array of tables.
+Per-file and total timings are reported.
 
 """
 
@@ -26,303 +84,143 @@ import sys
 import os
 import os.path
 import argparse
-import json
-import copy
-
-# TEMPLATES
-
-BLOCK_TEMPLATE = { 'variants' : { '' : { "model" : None } } }
-
-PRESSURE_PLATE = { 'variants' : { 
-    'powered=false' : { "model" : None },
-    'powered=true' : { "model" : None } 
-} }
-
-SLAB_TEMPLATE = { 'variants' : { 
-    'type=bottom' : { "model" : None },
-    'type=double' : { "model" : None },
-    'type=top' : { "model" : None },
-} }
-
-BARS_TEMPLATE = {   "multipart": [
-    { "apply": { "model": None } },
-    { "when": { "north": "false", "west": "false", "south": "false", "east": "false" },
-      "apply": { "model": None }
-    },
-    { "when": { "north": "true", "west": "false", "south": "false", "east": "false" },
-      "apply": { "model": None }
-    },
-    { "when": { "north": "false", "west": "false", "south": "false", "east": "true" },
-      "apply": { "model": None, "y": 90 }
-    },
-    { "when": { "north": "false", "west": "false", "south": "true", "east": "false" },
-      "apply": { "model": None }
-    },
-    { "when": { "north": "false", "west": "true", "south": "false", "east": "false" },
-      "apply": { "model": None, "y": 90 }
-    },
-    { "when": { "north": "true" }, 
-      "apply": { "model": None } },
-    { "when": { "east": "true" },
-      "apply": { "model": None, "y": 90 }
-    },
-    { "when": { "south": "true" },
-      "apply": { "model": None }
-    },
-    { "when": { "west": "true" },
-      "apply": { "model": None, "y": 90 }
-    }
-] }
-
-STAIRS_TEMPLATE = { "variants": {
-    "facing=east,half=bottom,shape=straight":  { "model": None },
-    "facing=west,half=bottom,shape=straight":  { "model": None, "y": 180, "uvlock": True },
-    "facing=south,half=bottom,shape=straight": { "model": None, "y": 90, "uvlock": True },
-    "facing=north,half=bottom,shape=straight": { "model": None, "y": 270, "uvlock": True },
-    "facing=east,half=bottom,shape=outer_right":  { "model": None },
-    "facing=west,half=bottom,shape=outer_right":  { "model": None, "y": 180, "uvlock": True },
-    "facing=south,half=bottom,shape=outer_right": { "model": None, "y": 90, "uvlock": True },
-    "facing=north,half=bottom,shape=outer_right": { "model": None, "y": 270, "uvlock": True },
-    "facing=east,half=bottom,shape=outer_left":  { "model": None, "y": 270, "uvlock": True },
-    "facing=west,half=bottom,shape=outer_left":  { "model": None, "y": 90, "uvlock": True },
-    "facing=south,half=bottom,shape=outer_left": { "model": None },
-    "facing=north,half=bottom,shape=outer_left": { "model": None, "y": 180, "uvlock": True },
-    "facing=east,half=bottom,shape=inner_right":  { "model": None },
-    "facing=west,half=bottom,shape=inner_right":  { "model": None, "y": 180, "uvlock": True },
-    "facing=south,half=bottom,shape=inner_right": { "model": None, "y": 90, "uvlock": True },
-    "facing=north,half=bottom,shape=inner_right": { "model": None, "y": 270, "uvlock": True },
-    "facing=east,half=bottom,shape=inner_left":  { "model": None, "y": 270, "uvlock": True },
-    "facing=west,half=bottom,shape=inner_left":  { "model": None, "y": 90, "uvlock": True },
-    "facing=south,half=bottom,shape=inner_left": { "model": None },
-    "facing=north,half=bottom,shape=inner_left": { "model": None, "y": 180, "uvlock": True },
-    "facing=east,half=top,shape=straight":  { "model": None, "x": 180, "uvlock": True },
-    "facing=west,half=top,shape=straight":  { "model": None, "x": 180, "y": 180, "uvlock": True },
-    "facing=south,half=top,shape=straight": { "model": None, "x": 180, "y": 90, "uvlock": True },
-    "facing=north,half=top,shape=straight": { "model": None, "x": 180, "y": 270, "uvlock": True },
-    "facing=east,half=top,shape=outer_right":  { "model": None, "x": 180, "y": 90, "uvlock": True },
-    "facing=west,half=top,shape=outer_right":  { "model": None, "x": 180, "y": 270, "uvlock": True },
-    "facing=south,half=top,shape=outer_right": { "model": None, "x": 180, "y": 180, "uvlock": True },
-    "facing=north,half=top,shape=outer_right": { "model": None, "x": 180, "uvlock": True },
-    "facing=east,half=top,shape=outer_left":  { "model": None, "x": 180, "uvlock": True },
-    "facing=west,half=top,shape=outer_left":  { "model": None, "x": 180, "y": 180, "uvlock": True },
-    "facing=south,half=top,shape=outer_left": { "model": None, "x": 180, "y": 90, "uvlock": True },
-    "facing=north,half=top,shape=outer_left": { "model": None, "x": 180, "y": 270, "uvlock": True },
-    "facing=east,half=top,shape=inner_right":  { "model": None, "x": 180, "y": 90, "uvlock": True },
-    "facing=west,half=top,shape=inner_right":  { "model": None, "x": 180, "y": 270, "uvlock": True },
-    "facing=south,half=top,shape=inner_right": { "model": None, "x": 180, "y": 180, "uvlock": True },
-    "facing=north,half=top,shape=inner_right": { "model": None, "x": 180, "uvlock": True },
-    "facing=east,half=top,shape=inner_left":  { "model": None, "x": 180, "uvlock": True },
-    "facing=west,half=top,shape=inner_left":  { "model": None, "x": 180, "y": 180, "uvlock": True },
-    "facing=south,half=top,shape=inner_left": { "model": None, "x": 180, "y": 90, "uvlock": True },
-    "facing=north,half=top,shape=inner_left": { "model": None, "x": 180, "y": 270, "uvlock": True }
-} }
-
-DOORS_TEMPLATE = {  "variants": {
-    "facing=east,half=lower,hinge=left,open=false": { "model": None },
-    "facing=east,half=lower,hinge=left,open=true": { "model": None, "y": 90 },
-    "facing=east,half=lower,hinge=right,open=false": { "model": None },
-    "facing=east,half=lower,hinge=right,open=true": { "model": None, "y": 270 },
-    "facing=east,half=upper,hinge=left,open=false": { "model": None },
-    "facing=east,half=upper,hinge=left,open=true": { "model": None, "y": 90 },
-    "facing=east,half=upper,hinge=right,open=false": { "model": None },
-    "facing=east,half=upper,hinge=right,open=true": { "model": None, "y": 270 },
-    "facing=north,half=lower,hinge=left,open=false": { "model": None, "y": 270 },
-    "facing=north,half=lower,hinge=left,open=true": { "model": None },
-    "facing=north,half=lower,hinge=right,open=false": { "model": None, "y": 270 },
-    "facing=north,half=lower,hinge=right,open=true": { "model": None, "y": 180 },
-    "facing=north,half=upper,hinge=left,open=false": { "model": None, "y": 270 },
-    "facing=north,half=upper,hinge=left,open=true": { "model": None },
-    "facing=north,half=upper,hinge=right,open=false": { "model": None, "y": 270 },
-    "facing=north,half=upper,hinge=right,open=true": { "model": None, "y": 180 },
-    "facing=south,half=lower,hinge=left,open=false": { "model": None, "y": 90 },
-    "facing=south,half=lower,hinge=left,open=true": { "model": None, "y": 180 },
-    "facing=south,half=lower,hinge=right,open=false": { "model": None, "y": 90 },
-    "facing=south,half=lower,hinge=right,open=true": { "model": None },
-    "facing=south,half=upper,hinge=left,open=false": { "model": None, "y": 90 },
-    "facing=south,half=upper,hinge=left,open=true": { "model": None, "y": 180 },
-    "facing=south,half=upper,hinge=right,open=false": { "model": None, "y": 90 },
-    "facing=south,half=upper,hinge=right,open=true": { "model": None },
-    "facing=west,half=lower,hinge=left,open=false": { "model": None, "y": 180 },
-    "facing=west,half=lower,hinge=left,open=true": { "model": None, "y": 270 },
-    "facing=west,half=lower,hinge=right,open=false": { "model": None, "y": 180 },
-    "facing=west,half=lower,hinge=right,open=true": { "model": None, "y": 90 },
-    "facing=west,half=upper,hinge=left,open=false": { "model": None, "y": 180 },
-    "facing=west,half=upper,hinge=left,open=true": { "model": None, "y": 270 },
-    "facing=west,half=upper,hinge=right,open=false": { "model": None, "y": 180 },
-    "facing=west,half=upper,hinge=right,open=true": { "model": None, "y": 90 }
-}}
-
-# command-line arguments
-parser = argparse.ArgumentParser(description="Generate blockstates for standard block types")
-parser.add_argument("blockname", help="blockstate filename")
-parser.add_argument("--type", "-t", 
-        choices=['simple', 'crop', 'facing', 'bars', 'door', 'pane', 'stairs',
-                 'pressure_plate', 'slab', 'other'], 
-        help="type of blockstate", required=True)
-
-args = parser.parse_args()
-#print(args);
-
-# parse directory and make sure we are in the right place...
-(head, tail) = os.path.split(os.getcwd())
-if tail != 'blockstates':
-    print('Warning: not in blockstates directory')
-    exit()
-(head, modid) = os.path.split(head)
-(head, tail) = os.path.split(head)
-if tail != 'assets':
-    print('Warning: not in assets/{}/blockstates directory'.format(modid))
-    exit()
-
-# construct the blockstate
-
-if args.type == 'simple':
-    blockstate = copy.deepcopy(BLOCK_TEMPLATE)
-    blockstate['variants']['']['model'] = "{}:block/{}".format(modid, args.blockname)
-elif args.type == 'pressure_plate':
-    blockstate = copy.deepcopy(PRESSURE_PLATE)
-    blockstate['variants']['powered=false']['model'] = "{}:block/{}".format(modid, args.blockname)
-    blockstate['variants']['powered=true']['model'] = "{}:block/{}_down".format(modid, args.blockname)
-elif args.type == 'slab':
-    blockstate = copy.deepcopy(SLAB_TEMPLATE)
-    lblockname = args.blockname
-    dblockname = args.blockname
-    if lblockname.endswith('_slab'):
-        nn = lblockname.rindex('_slab')
-        lblockname = lblockname[0:nn]
-        if lblockname.endswith('brick'):
-            dblockname = lblockname + 's'
-        else:
-            dblockname = lblockname + '_block'
-    if lblockname.endswith('_block'):
-        nn = lblockname.rindex('_block')
-        lblockname = lblockname[0:nn]
-    elif lblockname.endswith('bricks'):
-        nn = lblockname.rindex('s')
-        lblockname = lblockname[0:nn]
-    blockstate['variants']['type=bottom']['model'] = "{}:block/{}".format(modid, "{}_slab".format(lblockname))
-    blockstate['variants']['type=double']['model'] = "{}:block/{}".format(modid, dblockname)
-    blockstate['variants']['type=top']['model'] = "{}:block/{}".format(modid, "{}_slab_top".format(lblockname))
-elif args.type == 'bars':
-    blockstate = copy.deepcopy(BARS_TEMPLATE)
-    post_ends = "{}:block/{}_post_ends".format(modid, args.blockname)
-    post = "{}:block/{}_post".format(modid, args.blockname)
-    cap = "{}:block/{}_cap".format(modid, args.blockname)
-    cap_alt = "{}:block/{}_cap_alt".format(modid, args.blockname)
-    side = "{}:block/{}_side".format(modid, args.blockname)
-    side_alt = "{}:block/{}_side_alt".format(modid, args.blockname)
-    blockstate['multipart'][0]['apply']['model'] = post_ends
-    blockstate['multipart'][1]['apply']['model'] = post
-    blockstate['multipart'][2]['apply']['model'] = cap
-    blockstate['multipart'][3]['apply']['model'] = cap
-    blockstate['multipart'][4]['apply']['model'] = cap_alt
-    blockstate['multipart'][5]['apply']['model'] = cap_alt
-    blockstate['multipart'][6]['apply']['model'] = side
-    blockstate['multipart'][7]['apply']['model'] = side
-    blockstate['multipart'][8]['apply']['model'] = side_alt
-    blockstate['multipart'][9]['apply']['model'] = side_alt
-
-elif args.type == 'stairs':
-    blockstate = copy.deepcopy(STAIRS_TEMPLATE)
-    lblockname = args.blockname
-    if lblockname.endswith('_stairs'):
-        nn = lblockname.rindex('_stairs');
-        lblockname = lblockname[0:nn]
-    stairs = "{}:block/{}_stairs".format(modid, lblockname)
-    inner_stairs = "{}:block/{}_inner_stairs".format(modid, lblockname)
-    outer_stairs = "{}:block/{}_outer_stairs".format(modid, lblockname)
-    blockstate['variants']["facing=east,half=bottom,shape=straight"]['model'] = stairs
-    blockstate['variants']["facing=west,half=bottom,shape=straight"]['model'] = stairs
-    blockstate['variants']["facing=south,half=bottom,shape=straight"]['model'] = stairs
-    blockstate['variants']["facing=north,half=bottom,shape=straight"]['model'] = stairs
-    blockstate['variants']["facing=east,half=bottom,shape=outer_right"]['model'] = outer_stairs
-    blockstate['variants']["facing=west,half=bottom,shape=outer_right"]['model'] = outer_stairs
-    blockstate['variants']["facing=south,half=bottom,shape=outer_right"]['model'] = outer_stairs
-    blockstate['variants']["facing=north,half=bottom,shape=outer_right"]['model'] = outer_stairs
-    blockstate['variants']["facing=east,half=bottom,shape=outer_left"]['model'] = outer_stairs
-    blockstate['variants']["facing=west,half=bottom,shape=outer_left"]['model'] = outer_stairs
-    blockstate['variants']["facing=south,half=bottom,shape=outer_left"]['model'] = outer_stairs
-    blockstate['variants']["facing=north,half=bottom,shape=outer_left"]['model'] = outer_stairs
-    blockstate['variants']["facing=east,half=bottom,shape=inner_right"]['model'] = inner_stairs
-    blockstate['variants']["facing=west,half=bottom,shape=inner_right"]['model'] = inner_stairs
-    blockstate['variants']["facing=south,half=bottom,shape=inner_right"]['model'] = inner_stairs
-    blockstate['variants']["facing=north,half=bottom,shape=inner_right"]['model'] = inner_stairs
-    blockstate['variants']["facing=east,half=bottom,shape=inner_left"]['model'] = inner_stairs
-    blockstate['variants']["facing=west,half=bottom,shape=inner_left"]['model'] = inner_stairs
-    blockstate['variants']["facing=south,half=bottom,shape=inner_left"]['model'] = inner_stairs
-    blockstate['variants']["facing=north,half=bottom,shape=inner_left"]['model'] = inner_stairs
-    blockstate['variants']["facing=east,half=top,shape=straight"]['model'] = stairs
-    blockstate['variants']["facing=west,half=top,shape=straight"]['model'] = stairs
-    blockstate['variants']["facing=south,half=top,shape=straight"]['model'] = stairs
-    blockstate['variants']["facing=north,half=top,shape=straight"]['model'] = stairs
-    blockstate['variants']["facing=east,half=top,shape=outer_right"]['model'] = outer_stairs
-    blockstate['variants']["facing=west,half=top,shape=outer_right"]['model'] = outer_stairs
-    blockstate['variants']["facing=south,half=top,shape=outer_right"]['model'] = outer_stairs
-    blockstate['variants']["facing=north,half=top,shape=outer_right"]['model'] = outer_stairs
-    blockstate['variants']["facing=east,half=top,shape=outer_left"]['model'] = outer_stairs
-    blockstate['variants']["facing=west,half=top,shape=outer_left"]['model'] = outer_stairs
-    blockstate['variants']["facing=south,half=top,shape=outer_left"]['model'] = outer_stairs
-    blockstate['variants']["facing=north,half=top,shape=outer_left"]['model'] = outer_stairs
-    blockstate['variants']["facing=east,half=top,shape=inner_right"]['model'] = inner_stairs
-    blockstate['variants']["facing=west,half=top,shape=inner_right"]['model'] = inner_stairs
-    blockstate['variants']["facing=south,half=top,shape=inner_right"]['model'] = inner_stairs
-    blockstate['variants']["facing=north,half=top,shape=inner_right"]['model'] = inner_stairs
-    blockstate['variants']["facing=east,half=top,shape=inner_left"]['model'] = inner_stairs
-    blockstate['variants']["facing=west,half=top,shape=inner_left"]['model'] = inner_stairs
-    blockstate['variants']["facing=south,half=top,shape=inner_left"]['model'] = inner_stairs
-    blockstate['variants']["facing=north,half=top,shape=inner_left"]['model'] = inner_stairs
-
-elif args.type == 'door':
-    blockstate = copy.deepcopy(DOORS_TEMPLATE)
-    lblockname = args.blockname
-    bottom = "{}:block/{}_bottom".format(modid, lblockname)
-    bottom_hinge = "{}:block/{}_bottom_hinge".format(modid, lblockname)
-    top = "{}:block/{}_top".format(modid, lblockname)
-    top_hinge = "{}:block/{}_top_hinge".format(modid, lblockname)
-    blockstate['variants']["facing=east,half=lower,hinge=left,open=false"]['model'] = bottom
-    blockstate['variants']["facing=east,half=lower,hinge=left,open=true"]['model'] = bottom_hinge
-    blockstate['variants']["facing=east,half=lower,hinge=right,open=false"]['model'] = bottom_hinge
-    blockstate['variants']["facing=east,half=lower,hinge=right,open=true"]['model'] = bottom
-    blockstate['variants']["facing=east,half=upper,hinge=left,open=false"]['model'] = top
-    blockstate['variants']["facing=east,half=upper,hinge=left,open=true"]['model'] = top_hinge
-    blockstate['variants']["facing=east,half=upper,hinge=right,open=false"]['model'] = top_hinge
-    blockstate['variants']["facing=east,half=upper,hinge=right,open=true"]['model'] = top
-
-    blockstate['variants']["facing=north,half=lower,hinge=left,open=false"]['model'] = bottom
-    blockstate['variants']["facing=north,half=lower,hinge=left,open=true"]['model'] = bottom_hinge
-    blockstate['variants']["facing=north,half=lower,hinge=right,open=false"]['model'] = bottom_hinge
-    blockstate['variants']["facing=north,half=lower,hinge=right,open=true"]['model'] = bottom
-    blockstate['variants']["facing=north,half=upper,hinge=left,open=false"]['model'] = top
-    blockstate['variants']["facing=north,half=upper,hinge=left,open=true"]['model'] = top_hinge
-    blockstate['variants']["facing=north,half=upper,hinge=right,open=false"]['model'] = top_hinge
-    blockstate['variants']["facing=north,half=upper,hinge=right,open=true"]['model'] = top
-
-    blockstate['variants']["facing=south,half=lower,hinge=left,open=false"]['model'] = bottom
-    blockstate['variants']["facing=south,half=lower,hinge=left,open=true"]['model'] = bottom_hinge
-    blockstate['variants']["facing=south,half=lower,hinge=right,open=false"]['model'] = bottom_hinge
-    blockstate['variants']["facing=south,half=lower,hinge=right,open=true"]['model'] = bottom
-    blockstate['variants']["facing=south,half=upper,hinge=left,open=false"]['model'] = top
-    blockstate['variants']["facing=south,half=upper,hinge=left,open=true"]['model'] = top_hinge
-    blockstate['variants']["facing=south,half=upper,hinge=right,open=false"]['model'] = top_hinge
-    blockstate['variants']["facing=south,half=upper,hinge=right,open=true"]['model'] = top
-
-    blockstate['variants']["facing=west,half=lower,hinge=left,open=false"]['model'] = bottom
-    blockstate['variants']["facing=west,half=lower,hinge=left,open=true"]['model'] = bottom_hinge
-    blockstate['variants']["facing=west,half=lower,hinge=right,open=false"]['model'] = bottom_hinge
-    blockstate['variants']["facing=west,half=lower,hinge=right,open=true"]['model'] = bottom
-    blockstate['variants']["facing=west,half=upper,hinge=left,open=false"]['model'] = top
-    blockstate['variants']["facing=west,half=upper,hinge=left,open=true"]['model'] = top_hinge
-    blockstate['variants']["facing=west,half=upper,hinge=right,open=false"]['model'] = top_hinge
-    blockstate['variants']["facing=west,half=upper,hinge=right,open=true"]['model'] = top
-
-else:
-    print("Error: {} not yet implemented\n".format(args.type), file=sys.stderr)
-    sys.exit()
-
-
-#TODO
-
-filename = "{}.json".format(args.blockname)
-with open(filename, 'w') as f:
-    json.dump(blockstate, f, indent=4, sort_keys=False)
-
+import time
+
+from mod_utils import incremental, manifest, output
+from mod_utils.blockstates import BLOCKSTATE_TYPES, render_blockstate, stream_blockstate
+
+
+def get_modid(path):
+    """ parse directory and make sure we are in the right place...
+    returns the modid, or None (with a warning) if path is not
+    assets/<modid>/blockstates.
+    """
+    (head, tail) = os.path.split(path)
+    if tail != 'blockstates':
+        print('Warning: not in blockstates directory')
+        return None
+    (head, modid) = os.path.split(head)
+    (head, tail) = os.path.split(head)
+    if tail != 'assets':
+        print('Warning: not in assets/{}/blockstates directory'.format(modid))
+        return None
+    return modid
+
+
+def blockstate_text(modid, blockname, blocktype, spec=None, specs=None):
+    """ the blockstate text, or for 'other' blocks with a property spec
+    file, its chunks. specs caches the parsed spec files.
+    """
+    if blocktype == 'other' and spec:
+        if specs is None:
+            specs = {}
+        if spec not in specs:
+            specs[spec] = manifest.read_document(spec)
+        return stream_blockstate(modid, blockname, specs[spec])
+    return render_blockstate(modid, blockname, blocktype)
+
+
+def write_blockstate(out, text, blockname):
+    """ write through OutputWriter out; returns (filename, write status). """
+    filename = "{}.json".format(blockname)
+    return filename, out.write(filename, text)
+
+
+def run_manifest(modid, rows, out, quiet=False):
+    """ generate every blockstate listed in the manifest rows, timing each
+    file. Returns the number of rows that failed.
+    """
+    errors = 0
+    count = 0
+    specs = {}
+    start = time.perf_counter()
+    for lineno, row in enumerate(rows, 1):
+        blockname = row.get('blockname') or row.get('name')
+        blocktype = row.get('type')
+        if manifest.as_bool(row.get('item_only')):
+            # an item in a shared model manifest: no blockstate.
+            continue
+        if not blockname or blocktype not in BLOCKSTATE_TYPES:
+            print("Error: manifest row {}: need blockname and a type from {}".format(
+                  lineno, ', '.join(BLOCKSTATE_TYPES)), file=sys.stderr)
+            errors += 1
+            continue
+        t0 = time.perf_counter()
+        try:
+            text = blockstate_text(modid, blockname, blocktype, row.get('spec'), specs)
+            # streamed text is only generated as it is written.
+            filename, status = write_blockstate(out, text, blockname)
+        except (NotImplementedError, OSError, ValueError) as e:
+            print("Error: {}: {}".format(blockname, e), file=sys.stderr)
+            errors += 1
+            continue
+        count += 1
+        if not quiet:
+            print("{:<40} {:8.3f} ms  {}".format(filename,
+                  (time.perf_counter() - t0) * 1000.0, status))
+    total = time.perf_counter() - start
+    print("Generated {} blockstates in {:.3f} s ({:.3f} ms/file), {} errors".format(
+          count, total, (total * 1000.0 / count) if count else 0.0, errors))
+    return errors
+
+
+def main(argv=None):
+    # command-line arguments
+    parser = argparse.ArgumentParser(description="Generate blockstates for standard block types")
+    parser.add_argument("blockname", nargs='?', help="blockstate filename")
+    parser.add_argument("--type", "-t", choices=BLOCKSTATE_TYPES,
+            help="type of blockstate")
+    parser.add_argument("--spec", "-s",
+            help="property spec (JSON or TOML) for --type other")
+    parser.add_argument("--manifest", "-m",
+            help="batch mode: generate every blockname/type row listed in this JSON, TOML or CSV manifest ('-' for stdin)")
+    parser.add_argument("--manifest-format", choices=manifest.FORMATS,
+            help="manifest format, if it cannot be told from the file extension")
+    parser.add_argument("--quiet", "-q", action="store_true",
+            help="batch mode: only report total timings")
+    output.add_output_arguments(parser)
+
+    args = parser.parse_args(argv)
+    #print(args);
+    if args.manifest is None and (args.blockname is None or args.type is None):
+        parser.error("blockname and --type are required unless --manifest is given")
+    if args.manifest is None and args.type == 'other' and args.spec is None:
+        parser.error("--type other needs a --spec")
+
+    modid = get_modid(os.getcwd())
+    if modid is None:
+        return 1
+    build = incremental.Generation(args, os.getcwd(), __file__, inputs=(args.manifest, args.spec))
+    if build.up_to_date():
+        return 0
+
+    if args.manifest is not None:
+        try:
+            rows = manifest.read_manifest(args.manifest, args.manifest_format, 'blocks')
+        except (OSError, ValueError) as e:
+            print("Error: cannot read manifest {}: {}".format(args.manifest, e),
+                  file=sys.stderr)
+            return 1
+        build.add_inputs(row.get('spec') for row in rows)
+        with output.open_writer(args, os.getcwd()) as out:
+            errors = run_manifest(modid, rows, out, args.quiet)
+        print(out.summary())
+        errors += output.report_errors(out)
+        return build.finish(1 if errors else 0)
+
+    try:
+        text = blockstate_text(modid, args.blockname, args.type, args.spec)
+    except NotImplementedError as e:
+        print("Error: {}\n".format(e), file=sys.stderr)
+        return 0
+    except (OSError, ValueError) as e:
+        print("Error: bad property spec {}: {}".format(args.spec, e), file=sys.stderr)
+        return 1
+    with output.open_writer(args, os.getcwd()) as out:
+        write_blockstate(out, text, args.blockname)
+    print(out.summary())
+    return build.finish(1 if output.report_errors(out) else 0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,145 +6,224 @@ Must be run in src/main/resources/assets/<modid>/models
 
 SYNOPSIS:
 
+usage: gen_model_jsons.py [-h] [--item_only]
+                          [--type {block,crop,facing,bars,door,pane,stairs,slab,pressure_plate,pillar,log,machine,blockitem,bow,armor,tool,inventory}]
+                          [--manifest MANIFEST]
+                          [--manifest-format {json,toml,csv}] [--quiet]
+                          [--detect] [--emit MANIFEST]
+                          [modelname]
+
+Generate block & item models as specified
+
+positional arguments:
+  modelname             model filename
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --item_only, --item   item model only
+  --type {block,crop,facing,bars,door,pane,stairs,slab,pressure_plate,pillar,log,machine,blockitem,bow,armor,tool,inventory}, -t {...}
+                        type of model
+  --manifest MANIFEST, -m MANIFEST
+                        batch mode: generate the models of every
+                        blockname/type row listed in this JSON, TOML or CSV
+                        manifest ('-' for stdin)
+  --manifest-format {json,toml,csv}
+                        manifest format, if it cannot be told from the file
+                        extension
+  --quiet, -q           batch mode: only report total timings
+  --detect, -d          batch mode: work out the blocks and items and their
+                        model types from the textures
+  --emit MANIFEST       with --detect: write the CSV manifest found ('-' for
+                        stdout) instead of the models
+
+The model names are the ones gen_blockstate_jsons.py's blockstates use.
+Textures are <modid>:block/<name> (with _top, _side, _front... for the
+other faces), or <modid>:item/<name> for inventory items.
+
+BATCH MODE:
+
+The same manifest as gen_blockstate_jsons.py --manifest makes all the
+models for a mod's block list in one process; blockstate types are mapped
+to model types (simple => block, horizontal_facing => facing), a 'model'
+column gives a different model type, and an 'item_only' column skips the
+block models. 'other' rows are skipped. A 'textures' column overrides
+texture slots, e.g. "end=foo:block/copper_pillar_end;side=foo:block/copper"
+(a table in JSON/TOML).
+
+--detect reads the names (and PNG headers) in ../textures/block and
+../textures/item instead, and works out each block's model type and
+textures from the suffixes (_stage0..7, _front, _top, _side, _end, door
+_bottom/_top...; see mod_utils/detect.py). With --emit it writes that as
+a manifest to check and edit, which gen_blockstate_jsons.py can use too.
+
 """
 import sys
 import os
 import os.path
 import argparse
-import json
-import copy
-
-# TEMPLATES
-# items
-ITEM_BLOCK = { "parent" : None }
-ITEM_GENERATED = { "parent": "minecraft:item/generated", "textures": {"layer0": None } }
-ITEM_HANDHELD = { "parent": "minecraft:item/handheld", "textures": { "layer0": None } }
-# blocks
-BLOCK_BLOCK = { "parent" : "block/cube_all", "textures" : { "all" : None }}
-BLOCK_PLATE = { 
-    "parent" : "minecraft:block/pressure_plate_up",
-    "textures" : { "texture" : None }
-}
-BLOCK_PLATE_DOWN = {
-    "parent" : "minecraft:block/pressure_plate_down",
-    "textures" : { "texture" : None }
-    }
-BLOCK_SLAB = {
-    "parent": "minecraft:block/slab",
-    "textures": { "bottom": None, "top": None, "side": None }    
-}
-BLOCK_SLAB_TOP = {
-    "parent": "minecraft:block/slab_top",
-    "textures": { "bottom": None, "top": None, "side": None }    
-}
-
-# LOOKUP TABLES FOR types => templates
-LOOKUP_BLOCK = { 'block' : BLOCK_BLOCK  }
-
-LOOKUP_ITEM = { 'block' : ITEM_BLOCK, 'pressure_plate' : ITEM_BLOCK, 'slab' : ITEM_BLOCK,
-        'inventory' : ITEM_GENERATED, 'tool' : ITEM_HANDHELD, 'armor' : ITEM_GENERATED }
-
-# command-line arguments
-parser = argparse.ArgumentParser(description="Generate block & item models as specified")
-parser.add_argument("modelname", help="model filename")
-parser.add_argument("--item_only", "--item", help="item model only", action="store_true")
-parser.add_argument("--type", "-t", 
-        choices=['block', 'crop', 'facing', 'bars', 'door', 'pane', 'stairs', 'slab',
-                 'pressure_plate', 'pillar', 'log', 'machine', 'blockitem', 'bow',
-                 'armor', 'tool', 'inventory'], 
-        help="type of blockstate", required=True)
-
-args = parser.parse_args()
-#print(args);
-
-# parse directory and make sure we are in the right place...
-(head, tail) = os.path.split(os.getcwd())
-if tail != 'models':
-    print('Warning: not in models directory')
-    exit()
-(head, modid) = os.path.split(head)
-(head, tail) = os.path.split(head)
-if tail != 'assets':
-    print('Warning: not in assets/{}/models directory'.format(modid))
-    exit()
-
-BLOCK_MODEL_PATH = os.path.join(os.getcwd(), 'block')
-if not os.path.exists(BLOCK_MODEL_PATH):
-    os.makedirs(BLOCK_MODEL_PATH)
-
-ITEM_MODEL_PATH =  os.path.join(os.getcwd(), 'item')
-if not os.path.exists(ITEM_MODEL_PATH):
-    os.makedirs(ITEM_MODEL_PATH)
-
-# construct the models
-# blocks
-if not args.item_only:
-    if args.type in ('block',):
-        block_model = copy.deepcopy(LOOKUP_BLOCK[args.type])
-        texture = "{}:block/{}".format(modid, args.modelname)
-        block_model['textures']['all'] = texture
-    elif args.type == 'pressure_plate':
-        # there are two model files for pressure plates...
-        block_model = copy.deepcopy(BLOCK_PLATE_DOWN)
-        texture = "{}:block/{}".format(modid, args.modelname)
-        block_model['textures']['texture'] = texture
-        # write the 'down' model file.
-        filename = os.path.join(BLOCK_MODEL_PATH, 
-                               "{}_down.json".format(args.modelname))
-        with open(filename, 'w') as f:
-            json.dump(block_model, f, indent=4, sort_keys=False)
-        del block_model
-
-        # now fall through and create 'up' model as default.
-        block_model = copy.deepcopy(BLOCK_PLATE)
-        block_model['textures']['texture'] = texture
-    elif args.type == 'slab':
-        # there are two model files for slabs
-        block_model = copy.deepcopy(BLOCK_SLAB_TOP)
-        stem = args.modelname
-        nn = stem.rfind('_slab')
-        stem = stem[0:nn]
-        if stem.endswith('brick'):
-            stem = "{}s".format(stem)
-        texture = "{}:block/{}".format(modid, stem)
-        block_model['textures']['bottom'] = texture
-        block_model['textures']['top'] = texture
-        block_model['textures']['side'] = texture
-        # write the 'slab_top' model file.
-        filename = os.path.join(BLOCK_MODEL_PATH, "{}_top.json".format(args.modelname))
-        with open(filename, 'w') as f:
-            json.dump(block_model, f, indent=4, sort_keys=False)
-        del block_model
-        # now fall through and create default 'slab' model.
-        block_model = copy.deepcopy(BLOCK_SLAB)
-        block_model['textures']['bottom'] = texture
-        block_model['textures']['top'] = texture
-        block_model['textures']['side'] = texture
-    # TODO
-    else:
-        print("{} type not yet implemented, sorry.\n".format(args.type), file=sys.stderr)
-        sys.exit()
-
-    filename = os.path.join(BLOCK_MODEL_PATH, "{}.json".format(args.modelname))
-    with open(filename, 'w') as f:
-        json.dump(block_model, f, indent=4, sort_keys=False)
-
-# items
-item_model = copy.deepcopy(LOOKUP_ITEM[args.type])
-if args.type in ('block','pressure_plate','inventory','tool','armor','slab'):
-    item_model = copy.deepcopy(LOOKUP_ITEM[args.type])
-    if args.type in ('block','pressure_plate','slab'):
-        parent = "{}:block/{}".format(modid, args.modelname)
-        item_model['parent'] = parent
-    elif args.type in ('inventory','tool','armor'):
-        texture = "{}:item/{}".format(modid, args.modelname)
-        item_model['textures']['layer0'] = texture
-    #TODO
-    else:
-        print("{} type not yet implemented, sorry.\n".format(args.type), file=sys.stderr)
-        sys.exit()
-
-filename = os.path.join(ITEM_MODEL_PATH, "{}.json".format(args.modelname))
-with open(filename, 'w') as f:
-    json.dump(item_model, f, indent=4, sort_keys=False)
-
+import time
+
+from mod_utils import manifest, output, detect, incremental
+from mod_utils.models import MODEL_TYPES, MODEL_TYPE_FOR_BLOCKSTATE, block_models, item_models, model_type
+
+
+def write_model(out, path, name, text):
+    filename = os.path.join(path, "{}.json".format(name))
+    out.write(filename, text)
+    return filename
+
+
+def model_files(modid, modelname, modeltype, item_only=False, textures=None):
+    """ [(folder, model name, json text)] for the block and item models;
+    raises NotImplementedError, or ValueError for textures that aren't
+    slots of the model type.
+    """
+    if textures:
+        unknown = set(textures) - set(model_type(modeltype).slots())
+        if unknown:
+            raise ValueError("{} models have no {} texture slots".format(
+                             modeltype, ', '.join(sorted(unknown))))
+    files = []
+    if not item_only:
+        files.extend(('block', name, text)
+                     for name, text in block_models(modid, modelname, modeltype, textures))
+    files.extend(('item', name, text)
+                 for name, text in item_models(modid, modelname, modeltype, textures))
+    return files
+
+
+def run_manifest(modid, rows, out, quiet=False):
+    """ generate the models of every block/item listed in the manifest
+    rows, timing each. Returns the number of rows that failed.
+    """
+    errors = 0
+    count = 0
+    start = time.perf_counter()
+    for lineno, row in enumerate(rows, 1):
+        name = row.get('blockname') or row.get('name')
+        rowtype = row.get('model') or row.get('type')
+        if rowtype == 'other':
+            continue
+        modeltype = MODEL_TYPE_FOR_BLOCKSTATE.get(rowtype, rowtype)
+        if not name or modeltype not in MODEL_TYPES:
+            print("Error: manifest row {}: need blockname and a type from {}".format(
+                  lineno, ', '.join(MODEL_TYPES)), file=sys.stderr)
+            errors += 1
+            continue
+        t0 = time.perf_counter()
+        try:
+            files = model_files(modid, name, modeltype, manifest.as_bool(row.get('item_only')),
+                                manifest.as_table(row.get('textures')))
+        except ValueError as e:
+            print("Error: {}: {}".format(name, e), file=sys.stderr)
+            errors += 1
+            continue
+        for folder, model, text in files:
+            write_model(out, folder, model, text)
+        count += len(files)
+        if not quiet:
+            print("{:<40} {:8.3f} ms  {} models".format(name,
+                  (time.perf_counter() - t0) * 1000.0, len(files)))
+    total = time.perf_counter() - start
+    print("Generated {} models in {:.3f} s ({:.3f} ms/file), {} errors".format(
+          count, total, (total * 1000.0 / count) if count else 0.0, errors))
+    return errors
+
+
+def main(argv=None):
+    # command-line arguments
+    parser = argparse.ArgumentParser(description="Generate block & item models as specified")
+    parser.add_argument("modelname", nargs='?', help="model filename")
+    parser.add_argument("--item_only", "--item", help="item model only", action="store_true")
+    parser.add_argument("--type", "-t",
+            choices=MODEL_TYPES,
+            help="type of model")
+    parser.add_argument("--manifest", "-m",
+            help="batch mode: generate the models of every blockname/type row listed in this JSON, TOML or CSV manifest ('-' for stdin)")
+    parser.add_argument("--manifest-format", choices=manifest.FORMATS,
+            help="manifest format, if it cannot be told from the file extension")
+    parser.add_argument("--quiet", "-q", action="store_true",
+            help="batch mode: only report total timings")
+    parser.add_argument("--detect", "-d", action="store_true",
+            help="batch mode: work out the blocks and items and their model types from the textures")
+    parser.add_argument("--emit", metavar="MANIFEST",
+            help="with --detect: write the CSV manifest found ('-' for stdout) instead of the models")
+    output.add_output_arguments(parser)
+
+    args = parser.parse_args(argv)
+    #print(args);
+    if args.manifest is None and not args.detect and (args.modelname is None or args.type is None):
+        parser.error("modelname and --type are required unless --manifest or --detect is given")
+
+    # parse directory and make sure we are in the right place...
+    (head, tail) = os.path.split(os.getcwd())
+    if tail != 'models':
+        print('Warning: not in models directory')
+        return 1
+    (head, modid) = os.path.split(head)
+    (head, tail) = os.path.split(head)
+    if tail != 'assets':
+        print('Warning: not in assets/{}/models directory'.format(modid))
+        return 1
+
+    build = incremental.Generation(args, os.getcwd(), __file__, inputs=(args.manifest,))
+    if args.emit is None and build.up_to_date():
+        return 0
+
+    if args.detect:
+        start = time.perf_counter()
+        textures = detect.TextureIndex(os.path.join(os.path.dirname(os.getcwd()), 'textures'))
+        rows, unused = detect.detect_models(textures, modid)
+        # textures added, removed or renamed change the directories' mtimes.
+        build.add_inputs(os.path.join(textures.textures_dir, folder) for folder in textures.folders)
+        for path in textures.bad:
+            print("Warning: not a PNG: {}".format(path), file=sys.stderr)
+        if unused:
+            print("Warning: textures not matched to a block: {}".format(', '.join(unused)),
+                  file=sys.stderr)
+        print("Scanned {} textures ({} animated) in {:.3f} s: {} blocks and items".format(
+              textures.count(), textures.animated, time.perf_counter() - start, len(rows)),
+              file=sys.stderr)
+        if args.emit is not None:
+            if args.emit == '-':
+                manifest.write_csv(rows, detect.COLUMNS, sys.stdout)
+            else:
+                with open(args.emit, 'w', encoding='utf-8', newline='') as f:
+                    manifest.write_csv(rows, detect.COLUMNS, f)
+            return 0
+    elif args.manifest is not None:
+        try:
+            rows = manifest.read_manifest(args.manifest, args.manifest_format, 'blocks')
+        except (OSError, ValueError) as e:
+            print("Error: cannot read manifest {}: {}".format(args.manifest, e),
+                  file=sys.stderr)
+            return 1
+    if args.detect or args.manifest is not None:
+        with output.open_writer(args, os.getcwd()) as out:
+            errors = run_manifest(modid, rows, out, args.quiet)
+        print(out.summary())
+        errors += output.report_errors(out)
+        return build.finish(1 if errors else 0)
+
+    # block/ and item/ are created as needed.
+    BLOCK_MODEL_PATH = os.path.join(os.getcwd(), 'block')
+    ITEM_MODEL_PATH =  os.path.join(os.getcwd(), 'item')
+
+    out = output.open_writer(args, os.getcwd())
+
+    # construct the models
+    # blocks
+    if not args.item_only:
+        for name, text in block_models(modid, args.modelname, args.type):
+            write_model(out, BLOCK_MODEL_PATH, name, text)
+
+    # items
+    for name, text in item_models(modid, args.modelname, args.type):
+        write_model(out, ITEM_MODEL_PATH, name, text)
+    out.close()
+    print(out.summary())
+    return build.finish(1 if output.report_errors(out) else 0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -50,180 +50,93 @@ import sys
 import os
 import os.path
 import argparse
-import json
-import copy
-
-SHAPED_TEMPLATE = { 
-    "type" : "minecraft:crafting_shaped",
-    "conditions" : [], 
-    "pattern" : None,
-    "key" : {  },
-    "result" : { "item" : None }
-}
-
-SHAPELESS_TEMPLATE = { 
-    "type" : "minecraft:crafting_shapeless",
-    "conditions" : [], 
-    "ingredients" : [ {"item" : None } ],
-    "result" : { "item" : None } 
-}
-
-# also used for blasting, smoking and campfire_cooking.
-SMELTING_TEMPLATE = {
-    "type" : "minecraft:smelting",
-    "conditions" : [], 
-    "ingredient" : { "item" : None },
-    "result" : None,
-    "experience" : 0.0,
-    "cookingtime": 200
-}
-
-# used for fusion_furnace alloy recipes.
-FUSION_TEMPLATE = {
-    "type" : "fusion:alloying",
-    "conditions" : [],
-    "output" : { "item" : None },
-    "inputs" : [ { "item" : None }, {"item" : None} ],
-    "catalyst" : { "item" : None },
-    "experience" : 0.0,
-    "cookingtime" : 600
-}
-
-CONDITION_TEMPLATE = { "type" : None, "flag" : None }
-
-
-# command-line arguments
-parser = argparse.ArgumentParser(description="Generate custom recipes")
-parser.add_argument("result", help="id of recipe result; e.g. 'foo:bar_tool'")
-parser.add_argument("result_count", help="number of result items", type=int,
-        default=1)
-parser.add_argument("-t", "--type", choices=['shaped','shapeless','smelting',
-                                         'smoking', 'blasting', 'campfire', 
-                                         'fusion'],
-                    help="type of recipe", required=True)
-parser.add_argument("-c", "--conditions", action="store_true",
-        help="insert flag condition into recipe. Will need editing.")
-parser.add_argument("--xp", type=float, help="smelting xp")
-parser.add_argument("-f","--filename", help="specify filename instead of using default, which is the result")
-group = parser.add_mutually_exclusive_group(required=True)
-group.add_argument("-i","--ingredient", help="id of shapeless or smelting/cooking ingredient")
-group.add_argument("-p","--pattern", help="shaped crafting pattern, e.g. '\"SSS\",\" T \",\" T \"'")
-group.add_argument("--catalyst", help="catalyst for fusion alloying, e.g. 'minecraft:redstone_dust'")
-group2 = parser.add_mutually_exclusive_group()
-group2.add_argument("-n","--count", type=int, default=1, help="count of shapeless ingredients")
-group2.add_argument("-k","--keys", 
-    help="key values for pattern, semi-colon separated; e.g. 'S=minecraft:iron;T=forge:items/wooden_rod'")
-group2.add_argument("-a","--alloy_inputs", 
-        help="the 2 inputs to fusion alloying, semi-colon separated: e.g. 'minecraft:iron; minecraft:items/coals'")
-args = parser.parse_args()
-#print(args, "\n")
-# end command-line arguments
-
-# parse directory and make sure we are in the right place...
-(head, tail) = os.path.split(os.getcwd())
-if tail != 'recipes':
-    print('Warning: not in recipes directory')
-    exit()
-(head, modid) = os.path.split(head)
-(head, tail) = os.path.split(head)
-if tail != 'data':
-    print('Warning: not in data/{}/recipes directory'.format(modid))
-    exit()
-
-# get filename
-if args.filename != None:
-    if args.type == 'fusion':
-        filename = "./fusion_furnace/{}.json".format(args.filename)
+
+from mod_utils import incremental, output, recipes
+
+
+def main(argv=None):
+    # command-line arguments
+    parser = argparse.ArgumentParser(description="Generate custom recipes")
+    parser.add_argument("result", help="id of recipe result; e.g. 'foo:bar_tool'")
+    parser.add_argument("result_count", help="number of result items", type=int,
+            default=1)
+    parser.add_argument("-t", "--type", choices=['shaped','shapeless','smelting',
+                                             'smoking', 'blasting', 'campfire', 
+                                             'fusion'],
+                        help="type of recipe", required=True)
+    parser.add_argument("-c", "--conditions", action="store_true",
+            help="insert flag condition into recipe. Will need editing.")
+    parser.add_argument("--xp", type=float, help="smelting xp")
+    parser.add_argument("-f","--filename", help="specify filename instead of using default, which is the result")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("-i","--ingredient", help="id of shapeless or smelting/cooking ingredient")
+    group.add_argument("-p","--pattern", help="shaped crafting pattern, e.g. '\"SSS\",\" T \",\" T \"'")
+    group.add_argument("--catalyst", help="catalyst for fusion alloying, e.g. 'minecraft:redstone_dust'")
+    group2 = parser.add_mutually_exclusive_group()
+    group2.add_argument("-n","--count", type=int, default=1, help="count of shapeless ingredients")
+    group2.add_argument("-k","--keys", 
+        help="key values for pattern, semi-colon separated; e.g. 'S=minecraft:iron;T=forge:items/wooden_rod'")
+    group2.add_argument("-a","--alloy_inputs", 
+            help="the 2 inputs to fusion alloying, semi-colon separated: e.g. 'minecraft:iron; minecraft:items/coals'")
+    output.add_output_arguments(parser)
+    args = parser.parse_args(argv)
+    #print(args, "\n")
+    # end command-line arguments
+
+    # parse directory and make sure we are in the right place...
+    (head, tail) = os.path.split(os.getcwd())
+    if tail != 'recipes':
+        print('Warning: not in recipes directory')
+        return 1
+    (head, modid) = os.path.split(head)
+    (head, tail) = os.path.split(head)
+    if tail != 'data':
+        print('Warning: not in data/{}/recipes directory'.format(modid))
+        return 1
+    build = incremental.Generation(args, os.getcwd(), __file__)
+    if build.up_to_date():
+        return 0
+
+    # fix up result name
+    if ':' in args.result:
+        result = args.result
     else:
-        filename = "{}.json".format(args.filename)
-else:
-    # clean up any ':'
-    tempstr = args.result.split(':')[-1]
-    if (args.type == 'smelting') or (args.type == 'smoking') \
-        or (args.type == 'blasting') or (args.type == 'campfire'):
-        filename = "{}_from_{}.json".format(tempstr, args.type)
-    elif args.type == 'fusion':
-        filename = "./fusion_furnace/{}.json".format(tempstr)
+        result = "{}:{}".format(modid, args.result)
+    filename = recipes.recipe_filename(result, args.type, args.filename)
+
+    if args.conditions:
+        conditions = recipes.flag_conditions(modid, "{}_enabled".format(modid))
     else:
-        filename = "{}.json".format(tempstr)
-
-# fix up result name
-if ':' in args.result:
-    result = args.result
-else:
-    result = "{}:{}".format(modid, args.result)
-    
-if args.type == 'shapeless':
-    recipe = copy.deepcopy(SHAPELESS_TEMPLATE)
-    recipe["ingredients"][0]["item"] = args.ingredient
-    if args.count > 1:
-        recipe["ingredients"][0]["count"] = args.count
-    recipe["result"]["item"] = result
-    if args.result_count > 1:
-        recipe["result"]["count"] = args.result_count
-        
-elif args.type == 'shaped':
-    recipe = copy.deepcopy(SHAPED_TEMPLATE)
-    recipe["result"]["item"] = result
-    if args.result_count > 1:
-        recipe["result"]["count"] = args.result_count
-    recipe["pattern"] = [a for a in args.pattern.split(',')]
-    keylist = args.keys.split(';')
-    for keystring in keylist:
-        k,v = keystring.split('=')
-        if "/" in v:
-            recipe["key"][k] = { "tag" : v } 
-        else:
-            recipe["key"][k] = { "item" : v } 
-
-elif (args.type == 'smelting') or (args.type == 'smoking') \
-     or (args.type == 'blasting') or (args.type == 'campfire'):
-    recipe = copy.deepcopy(SMELTING_TEMPLATE)
-    recipe["ingredient"]["item"] = args.ingredient
-    if "/" in args.ingredient:
-        recipe["ingredients"]["tag"] = args.ingredient
-        del recipe["ingredient"]["item"]
-    recipe["result"] = result
-    recipe["experience"] = args.xp
-
-    if args.type == 'smoking':
-        recipe["type"] = "minecraft:smoking"
-        recipe["cookingtime"] = 100
-
-    elif args.type == 'blasting':
-        recipe["type"] = "minecraft:blasting"
-        recipe["cookingtime"] = 100
-
-    elif args.type == 'campfire':
-        recipe["type"] = "minecraft:campfire_cooking"
-        recipe["cookingtime"] = 600
-
-elif args.type == 'fusion':
-    if not os.path.exists("./fusion_furnace"):
-        os.mkdir("./fusion_furnace")
-    recipe = copy.deepcopy(FUSION_TEMPLATE)
-    recipe["output"]["item"] = result
-    if args.result_count > 1:
-        recipe["output"]["count"] = args.result_count
-    inputs_list = args.alloy_inputs.split(';')
-    recipe["inputs"][0]["item"] = inputs_list[0]
-    recipe["inputs"][1]["item"] = inputs_list[1]
-    recipe["catalyst"]["item"] = args.catalyst
-    if args.catalyst == 'minecraft:coals':
-        recipe["catalyst"]["tag"] = args.catalyst
-        del recipe["catalyst"]["item"]
-    recipe["experience"] = args.xp
-
-if args.conditions:
-    mycondition = copy.deepcopy(CONDITION_TEMPLATE)
-    mycondition["type"] = "{}:flag".format(modid)
-    mycondition["flag"] = "{}_enabled".format(modid)
-    recipe["conditions"].append(mycondition)
-else:
-    del recipe["conditions"]
-
-with open(filename, 'w') as f:
-    json.dump(recipe, f, indent=4, sort_keys=False)
-
-print("Recipe done")
+        conditions = None
+
+    if args.type == 'shapeless':
+        recipe = recipes.shapeless_recipe(args.ingredient, result,
+                    args.result_count, args.count, conditions)
+
+    elif args.type == 'shaped':
+        key = {}
+        keylist = args.keys.split(';')
+        for keystring in keylist:
+            k,v = keystring.split('=')
+            key[k] = v
+        recipe = recipes.shaped_recipe(args.pattern.split(','), key, result,
+                    args.result_count, conditions)
+
+    elif args.type in recipes.COOKING_TYPES:
+        recipe = recipes.cooking_recipe(args.type, args.ingredient, result,
+                    args.xp, conditions)
+
+    elif args.type == 'fusion':
+        recipe = recipes.fusion_recipe(args.alloy_inputs.split(';'), args.catalyst,
+                    result, args.result_count, args.xp, conditions)
+
+    with output.open_writer(args, os.getcwd()) as out:
+        out.write(filename, recipe)
+
+    print("Recipe done")
+    print(out.summary())
+    return build.finish(1 if output.report_errors(out) else 0)
+
 
+if __name__ == '__main__':
+    sys.exit(main())
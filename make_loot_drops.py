@@ -14,45 +14,46 @@ import sys
 import os
 import os.path
 import argparse
-import json
-import copy
-
-LOOT_TABLE_TEMPLATE = { "type": "minecraft:block",
-        "pools" : [ { "name" : None, "rolls" : 1,
-            "entries" : [ { "type": "minecraft:item",
-                            "name" : None
-                            } ],
-            "conditions" : [ { "condition" : "minecraft:survives_explosion"}]
-            } ]
-        }
-
-# command-line arguments
-parser = argparse.ArgumentParser(description="Generate standard 'drop myself' loot tables for blocks")
-parser.add_argument("block_name", help="name of block (without modid) to be harvested")
-args = parser.parse_args()
-
-# parse directory and make sure we are in the right place...
-# Must be run in src/main/resources/data/<modid>/loot_tables/blocks.
-(head, tail) = os.path.split(os.getcwd())
-if tail != 'blocks':
-    print('Warning: not in loot_tables/blocks directory')
-    sys.exit()
-(head, tail) = os.path.split(head)
-if tail != 'loot_tables':
-    print('Warning: not in loot_tables/blocks directory')
-    sys.exit()
-(head, modid) = os.path.split(head)
-(head, tail) = os.path.split(head)
-if tail != 'data':
-    print('Warning: not in data/{}/loot_tables/blocks directory'.format(modid))
-    sys.exit()
-
-filename = "{}.json".format(args.block_name);
-recipe = copy.deepcopy(LOOT_TABLE_TEMPLATE);
-recipe["pools"][0]["name"] = "{}:droppool".format(modid)
-recipe["pools"][0]["entries"][0]["name"] = "{}:{}".format(modid, args.block_name)
-with open(filename, 'w') as f:
-        json.dump(recipe, f, indent=4, sort_keys=True)
-
-print("Created {}".format(filename))
 
+from mod_utils import incremental, output
+from mod_utils.loot import loot_table
+
+
+def main(argv=None):
+    # command-line arguments
+    parser = argparse.ArgumentParser(description="Generate standard 'drop myself' loot tables for blocks")
+    parser.add_argument("block_name", help="name of block (without modid) to be harvested")
+    output.add_output_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # parse directory and make sure we are in the right place...
+    # Must be run in src/main/resources/data/<modid>/loot_tables/blocks.
+    (head, tail) = os.path.split(os.getcwd())
+    if tail != 'blocks':
+        print('Warning: not in loot_tables/blocks directory')
+        return 1
+    (head, tail) = os.path.split(head)
+    if tail != 'loot_tables':
+        print('Warning: not in loot_tables/blocks directory')
+        return 1
+    (head, modid) = os.path.split(head)
+    (head, tail) = os.path.split(head)
+    if tail != 'data':
+        print('Warning: not in data/{}/loot_tables/blocks directory'.format(modid))
+        return 1
+    build = incremental.Generation(args, os.getcwd(), __file__)
+    if build.up_to_date():
+        return 0
+
+    filename = "{}.json".format(args.block_name);
+    recipe = loot_table(modid, args.block_name)
+    with output.open_writer(args, os.getcwd()) as out:
+        out.write(filename, recipe)
+
+    print("Created {}".format(filename))
+    print(out.summary())
+    return build.finish(1 if output.report_errors(out) else 0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/python3
+"""
+Generate everything for one or more materials (metals, gems...) in one go:
+storage, tool, armor and recycling recipes, block and item models,
+blockstates, loot tables and recipe advancements. Replaces running
+make_storage_recipes.py, make_tool_recipes.py, gen_model_jsons.py,
+gen_blockstate_jsons.py, make_loot_drops.py and make_recipe_advancements.py
+over and over for each new material.
+
+Must be run in src/main/resources (or given --resources).
+
+SYNOPSIS:
+
+usage: make_material.py [-h] [--modid MODID] [--resources RESOURCES]
+                        [--manifest-format {json,toml,csv}] [--force]
+                        [--zip ARCHIVE] [--profile {pretty,minified,canonical}]
+                        [--jobs N]
+                        spec [spec ...]
+
+positional arguments:
+  spec                  material spec manifest(s), JSON, TOML or CSV; '-'
+                        for stdin
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --modid MODID         mod id (default: the only mod under assets/ & data/)
+  --resources RESOURCES
+                        the src/main/resources directory (default: cwd)
+  --manifest-format {json,toml,csv}
+                        spec format, if it cannot be told from the file
+                        extension
+  --jobs N, -j N        run up to N stages at once, and write files with a
+                        pool of N threads
+
+MATERIAL SPECS:
+
+One row (or [[materials]] table) per material. Only 'name' is required:
+
+    name          material name, e.g. 'copper'
+    item          storage item suffix (default 'ingot', e.g. 'gem')
+    block         storage block suffix (default 'block')
+    nugget        make nuggets (default true)
+    large_chunk   make large chunks (default false)
+    medium_chunk  make medium chunks (default false)
+    tools         make tools and their recycling recipes (default true)
+    armor         make armor (default false)
+    conditions    insert flag condition into recipes (default false)
+    blocks        extra blocks, e.g. ores: a list of names or
+                  {name, type} tables, or 'copper_ore;copper_slab:slab' in CSV.
+                  Type is a gen_blockstate_jsons.py type (default 'simple').
+
+e.g. materials.toml:
+
+    [[materials]]
+    name = "copper"
+    large_chunk = true
+    blocks = [ "copper_ore", { name = "copper_bricks_slab", type = "slab" } ]
+
+"""
+
+import sys
+import os
+import os.path
+import argparse
+import time
+
+from mod_utils import incremental, manifest, output
+from mod_utils.pipeline import Stage, StageError, run_stages
+from mod_utils import storage, tools, models, blockstates, loot, advancements
+
+
+class Material(object):
+    """ a material spec row, with defaults filled in. """
+
+    def __init__(self, row):
+        self.name = row.get('name') or row.get('material')
+        if not self.name:
+            raise ValueError("material spec row without a name: {!r}".format(row))
+        self.item = row.get('item') or 'ingot'
+        self.block = row.get('block') or 'block'
+        self.nugget = manifest.as_bool(row.get('nugget'), True)
+        self.large_chunk = manifest.as_bool(row.get('large_chunk'))
+        self.medium_chunk = manifest.as_bool(row.get('medium_chunk'))
+        self.tools = manifest.as_bool(row.get('tools'), True)
+        self.armor = manifest.as_bool(row.get('armor'))
+        self.conditions = manifest.as_bool(row.get('conditions'))
+        # storage block first, then any extra blocks.
+        self.blocks = [ ("{}_{}".format(self.name, self.block), 'simple') ]
+        for b in manifest.as_list(row.get('blocks')):
+            if isinstance(b, dict):
+                self.blocks.append((b['name'], b.get('type') or 'simple'))
+            elif ':' in b:
+                name, btype = b.split(':', 1)
+                self.blocks.append((name, btype))
+            else:
+                self.blocks.append((b, 'simple'))
+        for name, btype in self.blocks:
+            # material specs have no property specs, so no 'other' blocks.
+            if btype not in blockstates.BLOCKSTATE_TYPES or btype == 'other':
+                raise ValueError("{}: block {}: unsupported type {!r}".format(
+                                 self.name, name, btype))
+
+    def storage_item(self):
+        return "{}_{}".format(self.name, self.item)
+
+    def items(self):
+        """ (item name, gen_model_jsons.py type) for every item model. """
+        items = [ (self.storage_item(), 'inventory') ]
+        if self.nugget:
+            items.append(("{}_nugget".format(self.name), 'inventory'))
+        if self.large_chunk:
+            items.append(("large_{}_chunk".format(self.name), 'inventory'))
+        if self.medium_chunk:
+            items.append(("medium_{}_chunk".format(self.name), 'inventory'))
+        if self.tools:
+            items.extend((t, 'tool') for t in tools.tool_items(self.name))
+        if self.armor:
+            items.extend(("{}_{}".format(self.name, a), 'armor')
+                         for a in tools.ARMORS)
+        return items
+
+
+def find_modid(resources):
+    """ the only mod directory under assets/ and data/, or None. """
+    mods = set()
+    for tree in ('assets', 'data'):
+        path = os.path.join(resources, tree)
+        if os.path.isdir(path):
+            mods.update(d for d in os.listdir(path)
+                        if os.path.isdir(os.path.join(path, d)) and d != 'minecraft'
+                        and d != 'forge')
+    return mods.pop() if len(mods) == 1 else None
+
+
+class MaterialPipeline(object):
+    """ builds the stage graph for a list of materials. """
+
+    def __init__(self, resources, modid, materials, args):
+        self.modid = modid
+        self.materials = materials
+        self.writers = {}
+        data = os.path.join(resources, 'data', modid)
+        assets = os.path.join(resources, 'assets', modid)
+        self.dirs = {
+            'recipes' : os.path.join(data, 'recipes'),
+            'loot_tables' : os.path.join(data, 'loot_tables', 'blocks'),
+            'advancements' : os.path.join(data, 'advancements', 'recipes'),
+            'blockstates' : os.path.join(assets, 'blockstates'),
+            'models' : os.path.join(assets, 'models'),
+        }
+        for name, path in self.dirs.items():
+            self.writers[name] = output.open_writer(args, path)
+
+    def _write_all(self, tree, files):
+        out = self.writers[tree]
+        for material, filename, text in files:
+            out.write(filename, text)
+        return [ (material, filename) for material, filename, text in files ]
+
+    # STAGES: each returns the (material, filename) pairs it wrote.
+    def storage_recipes(self, deps):
+        files = []
+        for m in self.materials:
+            files.extend((m.name, f, t) for f, t in
+                         storage.storage_recipes(self.modid, m.name,
+                            m.item, m.block, m.nugget, m.large_chunk,
+                            m.medium_chunk, m.conditions))
+        return self._write_all('recipes', files)
+
+    def tool_recipes(self, deps):
+        files = []
+        for m in self.materials:
+            files.extend((m.name, f, t) for f, t in
+                         tools.tool_recipes(self.modid, m.name,
+                            m.armor, m.conditions, m.item, tools=m.tools))
+        return self._write_all('recipes', files)
+
+    def recycling_recipes(self, deps):
+        files = []
+        for m in self.materials:
+            if m.nugget:
+                files.extend((m.name, f, t) for f, t in
+                             tools.recycling_recipes(self.modid, m.name, m.armor, m.tools))
+        return self._write_all('recipes', files)
+
+    def block_models(self, deps):
+        files = []
+        for m in self.materials:
+            for name, btype in m.blocks:
+                mtype = models.MODEL_TYPE_FOR_BLOCKSTATE.get(btype, btype)
+                try:
+                    block_files = models.block_models(self.modid, name, mtype)
+                except NotImplementedError as e:
+                    # same as gen_model_jsons.py: complain and carry on.
+                    print("Warning: {}: {}".format(name, e), file=sys.stderr)
+                    continue
+                files.extend((m.name, os.path.join('block', "{}.json".format(model)), text)
+                             for model, text in block_files)
+        return self._write_all('models', files)
+
+    def item_models(self, deps):
+        files = []
+        for m in self.materials:
+            for name, btype in m.blocks:
+                mtype = models.MODEL_TYPE_FOR_BLOCKSTATE.get(btype, btype)
+                try:
+                    text = models.item_model(self.modid, name, mtype)
+                except NotImplementedError as e:
+                    print("Warning: {}: {}".format(name, e), file=sys.stderr)
+                    continue
+                files.append((m.name, os.path.join('item', "{}.json".format(name)), text))
+            for name, mtype in m.items():
+                files.append((m.name, os.path.join('item', "{}.json".format(name)),
+                              models.item_model(self.modid, name, mtype)))
+        return self._write_all('models', files)
+
+    def blockstates(self, deps):
+        files = []
+        for m in self.materials:
+            for name, btype in m.blocks:
+                try:
+                    text = blockstates.render_blockstate(self.modid, name, btype)
+                except (NotImplementedError, ValueError) as e:
+                    print("Warning: {}: {}".format(name, e), file=sys.stderr)
+                    continue
+                files.append((m.name, "{}.json".format(name), text))
+        return self._write_all('blockstates', files)
+
+    def loot_tables(self, deps):
+        files = []
+        for m in self.materials:
+            for name, btype in m.blocks:
+                files.append((m.name, "{}.json".format(name), loot.loot_table(self.modid, name)))
+        return self._write_all('loot_tables', files)
+
+    def advancements(self, deps):
+        # one advancement per material, unlocking all its recipes once the
+        # player has the storage item.
+        recipes = { m.name : [] for m in self.materials }
+        for stage in ('storage_recipes', 'tool_recipes', 'recycling_recipes'):
+            for material, filename in deps[stage]:
+                recipes[material].append("{}:{}".format(self.modid, filename[:-len('.json')]))
+        files = []
+        for m in self.materials:
+            files.append((m.name, "{}.json".format(m.storage_item()),
+                          advancements.advancement(self.modid,
+                            "{}:{}".format(self.modid, m.storage_item()), recipes[m.name])))
+        return self._write_all('advancements', files)
+
+    def stages(self):
+        return [
+            Stage('storage_recipes', self.storage_recipes),
+            Stage('tool_recipes', self.tool_recipes),
+            Stage('recycling_recipes', self.recycling_recipes),
+            Stage('block_models', self.block_models),
+            Stage('item_models', self.item_models),
+            Stage('blockstates', self.blockstates),
+            Stage('loot_tables', self.loot_tables),
+            Stage('advancements', self.advancements,
+                  deps=('storage_recipes', 'tool_recipes', 'recycling_recipes')),
+        ]
+
+    def close(self):
+        for out in self.writers.values():
+            out.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate recipes, models, blockstates, loot tables and advancements for whole materials")
+    parser.add_argument("spec", nargs='+',
+            help="material spec manifest(s), JSON, TOML or CSV; '-' for stdin")
+    parser.add_argument("--modid", help="mod id (default: the only mod under assets/ & data/)")
+    parser.add_argument("--resources", default=os.getcwd(),
+            help="the src/main/resources directory (default: cwd)")
+    parser.add_argument("--manifest-format", choices=manifest.FORMATS,
+            help="spec format, if it cannot be told from the file extension")
+    output.add_output_arguments(parser)
+    args = parser.parse_args(argv)
+
+    resources = os.path.abspath(args.resources)
+    if os.path.basename(resources) != 'resources':
+        print('Warning: not in src/main/resources directory')
+        return 1
+    modid = args.modid or find_modid(resources)
+    if modid is None:
+        print('Error: cannot tell which mod this is; use --modid', file=sys.stderr)
+        return 1
+    build = incremental.Generation(args, resources, __file__, inputs=args.spec)
+    if build.up_to_date():
+        return 0
+
+    materials = []
+    try:
+        for spec in args.spec:
+            for row in manifest.read_manifest(spec, args.manifest_format, 'materials'):
+                materials.append(Material(row))
+    except (OSError, ValueError, KeyError) as e:
+        print("Error: bad material spec: {}".format(e), file=sys.stderr)
+        return 1
+
+    print("Generating {} materials for mod {}: {}".format(len(materials), modid,
+          ', '.join(m.name for m in materials)))
+
+    def report(name, seconds, files):
+        print("  {:<20} {:6d} files  {:8.3f} s".format(name, len(files), seconds))
+
+    start = time.perf_counter()
+    pipeline = MaterialPipeline(resources, modid, materials, args)
+    status = 0
+    try:
+        run_stages(pipeline.stages(), args.jobs, report)
+    except StageError as e:
+        for name, err in e.errors.items():
+            print("Error: stage {} failed: {}".format(name, err), file=sys.stderr)
+        status = 1
+    finally:
+        pipeline.close()
+    for out in pipeline.writers.values():
+        if output.report_errors(out):
+            status = 1
+    total = sum(sum(out.counts.values()) for out in pipeline.writers.values())
+    print("Done: {} files in {:.3f} s".format(total, time.perf_counter() - start))
+    for name, out in sorted(pipeline.writers.items()):
+        print("  {:<20} {}".format(name, out.summary()))
+    return build.finish(status)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
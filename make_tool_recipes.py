@@ -7,13 +7,21 @@ Generate standard tool recipes, given material input. Outputs are
 Must be run in src/main/resources/data/<modid>/recipes.
 
 SYNOPSIS:
-    make_tool_recipes.py [--armor][--nostore] <tooltype_prefix>
+    make_tool_recipes.py [--armor][--recycle_only][-c][-i ITEM][-y]
+                         [--batch MANIFEST] <tooltype_prefix>...
 
     tooltype_prefix - tool material name to prefix 'axe', 'sword', etc.
+        Several may be given at once.
 
     Options:
         --armor - also generate armor recipes for material
         --recycle_only - only do vanilla recycling recipes.
+        -c, --conditions - insert flag condition into recipes.
+        -i, --item - crafting item name, if not 'ingot' (e.g. 'gem').
+        -y, --yes - don't ask for confirmation.
+        --batch MANIFEST - JSON/TOML/CSV list of materials; implies --yes.
+            Rows name a 'material' and may override armor, conditions,
+            item and recycle_only.
 
 """
 
@@ -21,152 +29,149 @@ import sys
 import os
 import os.path
 import argparse
-import json
-import copy
-
-TOOLS = ('axe', 'hoe', 'pickaxe', 'shears', 'shovel', 'sword')
-ARMORS = ('boots', 'chestplate', 'helmet', 'leggings')
-
-PATTERN_TEMPLATES = { 
-    'axe' : [ "SS ", "ST ", " T " ], 
-    'hoe' : [ "SS ", " T ", " T " ], 
-    'pickaxe' : ["SSS", " T ", " T "],
-    'shears' : ["S ", " S"], 
-    'shovel' : [" S ", " T ", " T "],
-    'sword' : [ " S ", " S ", " T "],
-    'boots' : [ "S S", "S S"],
-    'chestplate' : ["S S", "SSS", "SSS"],
-    'helmet' : ["SSS", "S S"],
-    'leggings' : ["SSS", "S S", "S S"]
-}
-
-RECIPE_TEMPLATE = { 
-    "conditions" : [], 
-    "result" : { "item" : None },
-    "pattern" : None,
-    "type" : "minecraft:crafting_shaped",
-    "key" : {  }
-}
-
-VANILLA_RECYCLING_TEMPLATE = { 
-    "type" : "minecraft:smelting",
-    "ingredient" : [],
-    "result" : None,
-    "experience" : 0.2,
-    "cookingtime" : 200
-}
-
-INGREDIENT_TEMPLATE = { 
-    "item" : None,
-    "count" : 1
-}
-
-CONDITION_TEMPLATE = { "type" : None, "flag" : None }
-
-# command-line arguments
-parser = argparse.ArgumentParser(description="Generate standard tool and armor recipes, including vanilla recycling")
-parser.add_argument("tooltype_prefix", help="tool material-based prefix for standard tools; e.g. 'iron' for 'iron_axe','iron_pickaxe', etc")
-parser.add_argument("-a", "--armor", action="store_true",
-        help="also generate armor recipes for material");
-parser.add_argument("-c", "--conditions", action="store_true",
-        help="insert flag condition into recipe. Will need editing.")
-parser.add_argument("--recycle_only", action="store_true",
-        help="only generate vanilla recycling recipes")
-
-args = parser.parse_args()
-
-# parse directory and make sure we are in the right place...
-(head, tail) = os.path.split(os.getcwd())
-if tail != 'recipes':
-    print('Warning: not in recipes directory')
-    exit()
-(head, modid) = os.path.split(head)
-(head, tail) = os.path.split(head)
-if tail != 'data':
-    print('Warning: not in data/{}/recipes directory'.format(modid))
-    exit()
-
-# VANILLA RECYCLING RECIPES:
-# smelting
-filename = "{}_nugget_from_smelting.json".format(args.tooltype_prefix)
-recyc_list = ["{}_{}".format(args.tooltype_prefix, a) for a in TOOLS]
-if args.armor:
-    armor_list = ["{}_{}".format(args.tooltype_prefix, a) for a in ARMORS]
-    recyc_list.extend(armor_list)
-recipe = copy.deepcopy(VANILLA_RECYCLING_TEMPLATE)
-recipe["result"] = "{}:{}_nugget".format(modid, args.tooltype_prefix)
-for item in recyc_list:
-    ingredient = copy.deepcopy(INGREDIENT_TEMPLATE)
-    ingredient["item"] = "{}:{}".format(modid, item)
-    recipe["ingredient"].append(ingredient)
-with open(filename, 'w') as f:
-        json.dump(recipe, f, indent=4, sort_keys=True)
-
-#blasting
-filename = "{}_nugget_from_blasting.json".format(args.tooltype_prefix)
-recipe["cookingtime"] = 100
-recipe["type"] = "minecraft:blasting"
-with open(filename, 'w') as f:
-        json.dump(recipe, f, indent=4, sort_keys=True)
-
-if (args.recycle_only):
-    sys.exit(None)
-
-# what all are we doing? Inform user.
-item_list = ["{}_{}".format(args.tooltype_prefix, a) for a in TOOLS]
-if args.armor:
-    armor_list = ["{}_{}".format(args.tooltype_prefix, a) for a in ARMORS]
-    item_list.extend(armor_list)
-print("Generating {} recipes for mod {}:".format(args.tooltype_prefix, modid))
-for a in item_list:
-    print("\t",a)
-print()
-ok = input("Is this okay? ")
-if ok[0:1].lower() != 'y':
-    exit()
-print()
- 
-# get my constants:
-pattern_dict = {
-    "S" : "{}:{}_{}".format(modid, args.tooltype_prefix, "ingot"), 
-    "T" : "forge:rods/wooden" 
-}
-
-# tell the user what we settled on.
-for c in pattern_dict.keys():
-    print("{} will be {}".format(c, pattern_dict[c]))
-ok = input("Is this okay? ")
-if ok[0:1].lower() != 'y':
-    exit()
-print()
-
-# cycle through items, select conditions, write file.
-for item in item_list:
-    filename = "{}.json".format(item)
-    print("Creating {} for item {}".format( filename, item))
-
-    type_of_item = item.rsplit("_",1)[1]
-    print("type of item: ", type_of_item)
-
-    recipe = copy.deepcopy(RECIPE_TEMPLATE)
-    recipe["result"]['item'] = "{}:{}".format(modid, item)
-    recipe["pattern"] = PATTERN_TEMPLATES[type_of_item]
-    # build recipe key
-    if any('S' in a for a in recipe["pattern"]):
-        recipe["key"]["S"] = {"item" : pattern_dict["S"] }
-    if any('T' in a for a in recipe["pattern"]):
-        recipe["key"]["T"] = {"tag" : pattern_dict["T"] }
-
-    if args.conditions:
-        mycondition = copy.deepcopy(CONDITION_TEMPLATE)
-        mycondition["type"] = "{}:flag".format(modid)
-        mycondition["flag"] = "{}_tools_enabled".format(args.tooltype_prefix);
-        recipe["conditions"].append(mycondition)
-    else:
-        del recipe["conditions"]
-
-    with open(filename, 'w') as f:
-        json.dump(recipe, f, indent=4, sort_keys=True)
-
-print("Recipes done")
 
+from mod_utils import incremental, manifest, output
+from mod_utils.tools import (tool_items, recycling_recipes,
+        tool_pattern_keys, tool_recipes)
+
+
+def material_rows(args):
+    """ (prefix, options) for each material to do: the command-line prefixes
+    with the command-line options, then the --batch manifest rows, each
+    overriding the command-line options.
+    """
+    defaults = { 'armor' : args.armor, 'conditions' : args.conditions,
+                 'item' : args.item, 'recycle_only' : args.recycle_only }
+    rows = [ (p, dict(defaults)) for p in args.tooltype_prefix ]
+    if args.batch:
+        for row in manifest.read_manifest(args.batch, args.manifest_format, 'materials'):
+            prefix = (row.pop('tooltype_prefix', None) or row.pop('material', None)
+                      or row.pop('name', None))
+            if not prefix:
+                raise ValueError("batch row without a material: {!r}".format(row))
+            rows.append((prefix, manifest.with_defaults(row, defaults)))
+    return rows
+
+
+def main(argv=None):
+    # command-line arguments
+    parser = argparse.ArgumentParser(description="Generate standard tool and armor recipes, including vanilla recycling")
+    parser.add_argument("tooltype_prefix", nargs='*', help="tool material-based prefix for standard tools; e.g. 'iron' for 'iron_axe','iron_pickaxe', etc")
+    parser.add_argument("-a", "--armor", action="store_true",
+            help="also generate armor recipes for material");
+    parser.add_argument("-c", "--conditions", action="store_true",
+            help="insert flag condition into recipe. Will need editing.")
+    parser.add_argument("--recycle_only", action="store_true",
+            help="only generate vanilla recycling recipes")
+    parser.add_argument("-i", "--item", default="ingot",
+            help="alternate name for the crafting item (default: ingot)")
+    parser.add_argument("-y", "--yes", action="store_true",
+            help="don't ask for confirmation")
+    parser.add_argument("--batch", metavar="MANIFEST",
+            help="JSON/TOML/CSV list of materials, with per-material options; implies --yes")
+    parser.add_argument("--manifest-format", choices=manifest.FORMATS,
+            help="batch manifest format, if it cannot be told from the file extension")
+
+    output.add_output_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.tooltype_prefix and not args.batch:
+        parser.error("give at least one tooltype_prefix, or --batch")
+
+    # parse directory and make sure we are in the right place...
+    (head, tail) = os.path.split(os.getcwd())
+    if tail != 'recipes':
+        print('Warning: not in recipes directory')
+        return 1
+    (head, modid) = os.path.split(head)
+    (head, tail) = os.path.split(head)
+    if tail != 'data':
+        print('Warning: not in data/{}/recipes directory'.format(modid))
+        return 1
+    build = incremental.Generation(args, os.getcwd(), __file__, inputs=(args.batch,))
+    if build.up_to_date():
+        return 0
+
+    try:
+        rows = material_rows(args)
+    except (OSError, ValueError) as e:
+        print("Error: bad batch manifest: {}".format(e), file=sys.stderr)
+        return 1
+
+    if len(rows) > 1 or args.yes or args.batch:
+        return run_batch(modid, rows, args, build)
+
+    prefix, opts = rows[0]
+    out = output.open_writer(args, os.getcwd())
+
+    # VANILLA RECYCLING RECIPES:
+    for filename, recipe in recycling_recipes(modid, prefix, opts['armor']):
+        out.write(filename, recipe)
+    out.close()
+
+    if (opts['recycle_only']):
+        print(out.summary())
+        return build.finish(1 if output.report_errors(out) else 0)
+
+    # what all are we doing? Inform user.
+    item_list = tool_items(prefix, opts['armor'])
+    print("Generating {} recipes for mod {}:".format(prefix, modid))
+    for a in item_list:
+        print("\t",a)
+    print()
+    ok = input("Is this okay? ")
+    if ok[0:1].lower() != 'y':
+        return 0
+    print()
+ 
+    # tell the user what we settled on.
+    pattern_dict = tool_pattern_keys(modid, prefix, opts['item'])
+    for c in pattern_dict.keys():
+        print("{} will be {}".format(c, pattern_dict[c]))
+    ok = input("Is this okay? ")
+    if ok[0:1].lower() != 'y':
+        return 0
+    print()
+
+    # write files.
+    for filename, recipe in tool_recipes(modid, prefix, opts['armor'],
+                                         opts['conditions'], opts['item']):
+        print("Creating {}".format(filename))
+        out.write(filename, recipe)
+
+    out.close()
+    print("Recipes done")
+    print(out.summary())
+    return build.finish(1 if output.report_errors(out) else 0)
+
+
+def run_batch(modid, rows, args, build):
+    """ all the materials in one pass, asking (at most) once. """
+    batch = []
+    for prefix, opts in rows:
+        recipes = recycling_recipes(modid, prefix, opts['armor'])
+        if not opts['recycle_only']:
+            recipes.extend(tool_recipes(modid, prefix, opts['armor'],
+                                        opts['conditions'], opts['item']))
+        batch.append((prefix, recipes))
+
+    total = sum(len(recipes) for prefix, recipes in batch)
+    print("Generating {} tool recipes for {} materials for mod {}: {}".format(
+          total, len(batch), modid, ', '.join(prefix for prefix, recipes in batch)))
+    if not (args.yes or args.batch):
+        ok = input("Is this okay? ")
+        if ok[0:1].lower() != 'y':
+            return 0
+
+    # write files, reporting progress per material.
+    with output.open_writer(args, os.getcwd()) as out:
+        for n, (prefix, recipes) in enumerate(batch, 1):
+            for filename, recipe in recipes:
+                out.write(filename, recipe)
+            print("[{}/{}] {}: {} recipes".format(n, len(batch), prefix, len(recipes)))
+    print("Recipes done")
+    print(out.summary())
+    return build.finish(1 if output.report_errors(out) else 0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
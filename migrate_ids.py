@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+"""
+Migrate a whole resource tree from camelCase to snake_case IDs: renames
+every file under assets/ and data/ named with capitals (fooBar.png =>
+foo_bar.png, as fixCamelCaseFiles.pl does for one directory) and rewrites
+the references to those names in every JSON file there - models,
+blockstates, recipes, loot tables, lang file keys (not their text)... -
+in one pass, over all the files in parallel. See mod_utils/migrate.py.
+
+Must be run in src/main/resources (or given --resources). Only reports
+what it would do unless --apply is given.
+
+SYNOPSIS:
+
+usage: migrate_ids.py [-h] [--resources RESOURCES] [--apply] [--jobs N]
+                      [--quiet]
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --resources RESOURCES
+                        the src/main/resources directory (default: cwd)
+  --apply               rename the files and rewrite the references
+                        (default: only report)
+  --jobs N, -j N        rewrite with N processes (default: one per CPU)
+  --quiet, -q           only print the totals and collisions
+
+Names whose snake_case form another file already has (fooBar and foo_bar
+both existing) are collisions: they are reported and left alone, and the
+exit status is 1. References from code can't be seen; search the java
+sources for the old names too.
+
+"""
+
+import sys
+import os
+import os.path
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mod_utils import migrate, output
+
+_matcher = None
+_out = None
+
+
+def _init_worker(names, resources):
+    global _matcher, _out
+    _matcher = migrate.Matcher(names)
+    _out = output.OutputWriter(resources, use_index=False)
+
+
+def rewrite_file(path, apply):
+    """ (path, references replaced, error or None) for one JSON file. """
+    try:
+        with open(path, 'rb') as f:
+            text = f.read().decode('utf-8')
+    except (OSError, UnicodeDecodeError) as e:
+        return path, 0, str(e)
+    text, count = migrate.rewrite_json(text, _matcher, migrate.is_lang_file(path))
+    if count and apply:
+        try:
+            _out.write(path, text)
+        except OSError as e:
+            return path, count, str(e)
+    return path, count, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate camelCase resource names to snake_case, references included")
+    parser.add_argument("--resources", default=os.getcwd(),
+            help="the src/main/resources directory (default: cwd)")
+    parser.add_argument("--apply", action="store_true",
+            help="rename the files and rewrite the references (default: only report)")
+    parser.add_argument("--jobs", "-j", type=int, metavar="N",
+            help="rewrite with N processes (default: one per CPU)")
+    parser.add_argument("--quiet", "-q", action="store_true",
+            help="only print the totals and collisions")
+    args = parser.parse_args(argv)
+
+    resources = os.path.abspath(args.resources)
+    if not os.path.isdir(os.path.join(resources, 'assets')) \
+            and not os.path.isdir(os.path.join(resources, 'data')):
+        print('Warning: not in src/main/resources directory')
+        return 1
+
+    start = time.perf_counter()
+    plan = migrate.rename_plan(resources)
+    for name, new, paths in plan.collisions:
+        print("Collision: {} would become {}, which is already used; not migrated ({})".format(
+              name, new, ', '.join(os.path.relpath(p, resources) for p in paths)),
+              file=sys.stderr)
+    if not args.quiet and not args.apply:
+        for directory, old, new in plan.renames:
+            print("Would rename {} => {}".format(os.path.relpath(os.path.join(directory, old), resources), new))
+
+    errors = 0
+    files = 0
+    references = 0
+    rewritten = []
+    if plan.names:
+        paths = list(migrate.json_files(resources))
+        jobs = args.jobs or os.cpu_count() or 1
+        if jobs > 1 and len(paths) > 1:
+            pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                       initargs=(plan.names, resources))
+            results = pool.map(rewrite_file, paths, [args.apply] * len(paths),
+                               chunksize=max(1, len(paths) // (jobs * 8)))
+        else:
+            pool = None
+            _init_worker(plan.names, resources)
+            results = (rewrite_file(p, args.apply) for p in paths)
+        try:
+            for path, count, error in results:
+                if error is not None:
+                    print("Error: {}: {}".format(path, error), file=sys.stderr)
+                    errors += 1
+                    continue
+                if count:
+                    files += 1
+                    references += count
+                    rewritten.append((path, count))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    # files are renamed last, so a failed rewrite leaves the names it refers to.
+    # old path => new path, of the files renamed (or that would be)
+    renamed = {}
+    if args.apply and not errors:
+        for directory, old, new in plan.renames:
+            path = os.path.join(directory, old)
+            try:
+                os.rename(path, os.path.join(directory, new))
+            except OSError as e:
+                print("Error: cannot rename {}: {}".format(path, e), file=sys.stderr)
+                errors += 1
+                continue
+            renamed[path] = os.path.join(directory, new)
+            if not args.quiet:
+                print("Renamed {} => {}".format(os.path.relpath(path, resources), new))
+    elif args.apply:
+        print("Not renaming any files: fix the errors above and run again", file=sys.stderr)
+    else:
+        renamed = {os.path.join(d, old): os.path.join(d, new) for d, old, new in plan.renames}
+
+    # JSON files are reported by the name they end up with.
+    if not args.quiet:
+        for path, count in rewritten:
+            print("{} references in {}".format(count, os.path.relpath(renamed.get(path, path), resources)))
+
+    print("{} {} files ({} names), {} references in {} JSON files; {} collisions, {} errors in {:.3f} s".format(
+          "Renamed" if args.apply else "Would rename", len(renamed), len(plan.names), references, files,
+          len(plan.collisions), errors, time.perf_counter() - start))
+    return 1 if plan.collisions or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
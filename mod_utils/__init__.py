@@ -0,0 +1,32 @@
+"""
+Shared python helpers for the mod_utils generator scripts; the python
+counterpart of generator.pm for the perl scripts.
+
+The generators themselves are importable too, for build steps that would
+rather generate in-process than run the scripts. Each returns the JSON text
+of its files without touching the disk:
+
+    blockstates  - render_blockstate(modid, name, type)
+    models       - block_models(modid, name, type), item_model(...)
+    recipes      - shaped_recipe(pattern, key, result), shapeless_recipe,
+                   cooking_recipe, fusion_recipe
+    silents      - crushing_recipe, alloy_recipe
+    storage      - storage_recipes(modid, material, ...)
+    tools        - tool_recipes(modid, prefix, ...), recycling_recipes
+    loot         - loot_table(modid, block_name)
+    advancements - advancement(modid, item, recipe_list)
+
+Submodules are imported on first use (mod_utils.blockstates etc), so
+importing mod_utils itself costs nothing.
+"""
+
+import importlib
+
+GENERATORS = ('blockstates', 'models', 'recipes', 'silents', 'storage',
+              'tools', 'loot', 'advancements')
+
+
+def __getattr__(name):
+    if name in GENERATORS:
+        return importlib.import_module('mod_utils.' + name)
+    raise AttributeError("module 'mod_utils' has no attribute {!r}".format(name))
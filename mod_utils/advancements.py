@@ -0,0 +1,36 @@
+"""
+Recipe advancements: grant a list of recipes once the player has an item,
+as made by make_recipe_advancements.py.
+
+    text = advancements.advancement('foo', 'foo:copper_ingot', ['foo:copper_block'])
+"""
+
+from mod_utils.template import Template, Slot
+
+ADVANCEMENT_TEMPLATE = Template({
+    "parent" : Slot('parent'),
+    "rewards": {
+        "recipes": Slot('recipes')
+    },
+    "criteria" : {
+        "has_item" : {
+            "trigger": "minecraft:inventory_changed",
+            "conditions" : {
+                "items" : [
+                    { "item" : Slot('item')}
+                ]
+           }
+        }
+    },
+    "requirements": [
+        [ "has_item" ]
+    ]
+})
+
+
+def advancement(modid, item, recipe_list):
+    """ the json text of an advancement granting recipe_list when the
+    player gets item.
+    """
+    return ADVANCEMENT_TEMPLATE.render(parent="{}:recipes/root".format(modid),
+                item=item, recipes=recipe_list)
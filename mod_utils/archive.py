@@ -0,0 +1,234 @@
+"""
+Write generated files straight into a datapack/resource pack zip.
+
+A ZipWriter takes the place of an OutputWriter: instead of creating loose
+files under base_dir it adds entries to an archive, named by where base_dir
+sits in the resources tree (e.g. data/<modid>/recipes/foo.json), so the
+archive has the usual data/ and assets/ layout.
+
+Entry data is spooled to a temporary file as it is written (chunk by chunk
+for the streaming writers), so memory use stays flat however many entries
+there are, or however big. When the last writer for an archive is closed
+the spooled entries are merged with whatever the archive already holds
+(other runs of the same or other generators) and the archive is rewritten:
+entries in sorted order, with fixed timestamps and permissions, so the same
+content always gives a byte-identical zip. If it is byte-identical to the
+archive already there, that is left alone. Merges are serialized with an
+flock on <archive>.lock, which is removed again afterwards.
+
+Entries are never removed: since many runs add to the same directories
+there's no telling a stale entry from another run's. Delete the archive
+before a full release build to get rid of files no generator makes any
+more.
+"""
+
+import os
+import os.path
+import shutil
+import tempfile
+import threading
+import zipfile
+import filecmp
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# the earliest timestamp a zip can hold.
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+FILE_MODE = 0o644
+TREES = ('assets', 'data')
+COPY_BUFFER = 64 * 1024
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+
+def archive_prefix(base_dir):
+    """ where base_dir goes in the archive: its path from the resources
+    directory, e.g. 'data/foo/recipes/'.
+    """
+    parts = os.path.abspath(base_dir).split(os.sep)
+    start = None
+    if 'resources' in parts:
+        i = len(parts) - 1 - parts[::-1].index('resources')
+        if i + 1 < len(parts) and parts[i + 1] in TREES:
+            start = i + 1
+    if start is None:
+        for i in range(len(parts) - 1, -1, -1):
+            if parts[i] in TREES:
+                start = i
+                break
+    if start is None:
+        raise ValueError("{} is not under an assets/ or data/ directory".format(base_dir))
+    return '/'.join(parts[start:]) + '/'
+
+
+def zip_info(name):
+    info = zipfile.ZipInfo(name, date_time=FIXED_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.create_system = 3
+    info.external_attr = (0o100000 | FILE_MODE) << 16
+    return info
+
+
+class ZipSink(object):
+    """ spooled entries for one archive, shared by all its writers in this
+    process.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.refs = 0
+        self._spool = None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, chunks):
+        """ spool entry name; chunks is an iterable of bytes. """
+        with self._lock:
+            if self._spool is None:
+                self._spool = tempfile.TemporaryFile(
+                        dir=os.path.dirname(self.path) or None)
+            self._spool.seek(0, os.SEEK_END)
+            offset = self._spool.tell()
+            for chunk in chunks:
+                self._spool.write(chunk)
+            self._entries[name] = (offset, self._spool.tell() - offset)
+
+    def _copy_spooled(self, name, dest):
+        offset, size = self._entries[name]
+        self._spool.seek(offset)
+        while size > 0:
+            data = self._spool.read(min(size, COPY_BUFFER))
+            dest.write(data)
+            size -= len(data)
+
+    def _lock_archive(self):
+        """ an open, flock()ed <archive>.lock (None without fcntl). Another
+        process may remove the lock file between our open() and flock(),
+        so retry until the file we locked is still the one at the path.
+        """
+        if fcntl is None:
+            return None
+        path = self.path + '.lock'
+        while True:
+            lock = open(path, 'w')
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if os.path.samestat(os.fstat(lock.fileno()), os.stat(path)):
+                    return lock
+            except FileNotFoundError:
+                pass
+            lock.close()
+
+    def flush(self):
+        """ merge the spooled entries into the archive. """
+        with self._lock:
+            if not self._entries:
+                return
+            lock = self._lock_archive()
+            try:
+                self._merge()
+            finally:
+                if lock is not None:
+                    # unlinked while still locked; see _lock_archive().
+                    os.unlink(lock.name)
+                    lock.close()
+                self._spool.close()
+                self._spool = None
+                self._entries = {}
+
+    def _merge(self):
+        old = None
+        if os.path.exists(self.path):
+            old = zipfile.ZipFile(self.path, 'r')
+        try:
+            names = set(self._entries)
+            if old is not None:
+                names.update(old.namelist())
+            tmp = "{}.{}.tmp".format(self.path, os.getpid())
+            with zipfile.ZipFile(tmp, 'w') as z:
+                for name in sorted(names):
+                    with z.open(zip_info(name), 'w') as dest:
+                        if name in self._entries:
+                            self._copy_spooled(name, dest)
+                        else:
+                            with old.open(name) as src:
+                                shutil.copyfileobj(src, dest, COPY_BUFFER)
+        finally:
+            if old is not None:
+                old.close()
+        if os.path.exists(self.path) and filecmp.cmp(tmp, self.path, shallow=False):
+            os.unlink(tmp)
+        else:
+            os.replace(tmp, self.path)
+
+
+def acquire(path):
+    """ the shared sink for archive path. """
+    with _sinks_lock:
+        sink = _sinks.get(os.path.abspath(path))
+        if sink is None:
+            sink = ZipSink(path)
+            _sinks[sink.path] = sink
+        sink.refs += 1
+        return sink
+
+
+def release(sink):
+    """ drop a reference; the last one out writes the archive. """
+    with _sinks_lock:
+        sink.refs -= 1
+        last = sink.refs == 0
+        if last:
+            del _sinks[sink.path]
+    if last:
+        sink.flush()
+
+
+class ZipWriter(object):
+    """ same interface as output.OutputWriter, adding entries to a zip. """
+
+    def __init__(self, archive, base_dir):
+        self.archive = archive
+        self.base_dir = os.path.abspath(base_dir)
+        self.prefix = archive_prefix(base_dir)
+        self.counts = { 'written' : 0, 'skipped' : 0, 'unchanged' : 0 }
+        self._sink = None
+        self._lock = threading.Lock()
+
+    def write(self, filename, text):
+        """ add text (str or bytes, or an iterable of chunks) as filename,
+        relative to base_dir. There is no "unchanged": the archive is only
+        compared as a whole, once merged.
+        """
+        if isinstance(text, (str, bytes)):
+            text = (text,)
+        chunks = (c.encode('utf-8') if isinstance(c, str) else c for c in text)
+        rel = os.path.relpath(os.path.join(self.base_dir, filename), self.base_dir)
+        name = self.prefix + rel.replace(os.sep, '/')
+        with self._lock:
+            if self._sink is None:
+                self._sink = acquire(self.archive)
+            sink = self._sink
+            self.counts['written'] += 1
+        sink.add(name, chunks)
+        return 'written'
+
+    def close(self):
+        with self._lock:
+            sink = self._sink
+            self._sink = None
+        if sink is not None:
+            release(sink)
+
+    def summary(self):
+        return "{} entries written to {}".format(self.counts['written'], self.archive)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
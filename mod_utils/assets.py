@@ -0,0 +1,255 @@
+"""
+Cross-reference index of a resource tree's assets: which models each
+blockstate uses, which parent models and textures each model uses, and
+which of those actually exist.
+
+    index = AssetIndex(resources_dir)
+    index.refresh()
+    report = index.check()
+    index.save()
+
+The index keeps, per file, its (mtime, size) and the references found in
+it, and is saved in the mod_utils cache directory. refresh() stats every
+file but only re-reads the ones that changed since the last run, so
+checking a large tree again is quick.
+
+Resource locations without a namespace are minecraft's. References into
+namespaces not present in the tree (minecraft's own assets, other mods)
+are taken on trust.
+"""
+
+import os
+import os.path
+import json
+
+from mod_utils import output
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+INDEX_VERSION = 1
+# assets/<ns>/<kind>/... => file extension we index.
+KINDS = { 'blockstates' : '.json', 'models' : '.json', 'textures' : '.png' }
+# model folders that blockstates/other models are expected to use; item
+# models are used by the items themselves.
+ORPHAN_MODEL_FOLDERS = ('block/',)
+# texture folders that models are expected to use (entity, gui... textures
+# are used from code).
+UNUSED_TEXTURE_FOLDERS = ('block/', 'item/')
+
+
+def resource_location(ref):
+    """ 'foo:block/bar' => ('foo', 'block/bar'); no namespace means minecraft. """
+    if ':' in ref:
+        ns, path = ref.split(':', 1)
+        return ns, path
+    return 'minecraft', ref
+
+
+def _add_model(refs, node):
+    if isinstance(node, dict):
+        model = node.get('model')
+        if isinstance(model, str):
+            refs.append(model)
+    elif isinstance(node, list):
+        for n in node:
+            _add_model(refs, n)
+
+
+def blockstate_refs(tree):
+    """ model references in a blockstate: variants (single or weighted
+    lists) and multipart 'apply's.
+    """
+    models = []
+    if not isinstance(tree, dict):
+        return models
+    variants = tree.get('variants')
+    if isinstance(variants, dict):
+        for v in variants.values():
+            _add_model(models, v)
+    multipart = tree.get('multipart')
+    if isinstance(multipart, list):
+        for part in multipart:
+            if isinstance(part, dict):
+                _add_model(models, part.get('apply'))
+    return models
+
+
+def model_refs(tree):
+    """ (model references, texture references) in a model: the parent and
+    any override models; texture variables (#all...) are not references.
+    """
+    models = []
+    textures = []
+    if not isinstance(tree, dict):
+        return models, textures
+    parent = tree.get('parent')
+    if isinstance(parent, str) and not parent.startswith('builtin/'):
+        models.append(parent)
+    for o in tree.get('overrides') or ():
+        _add_model(models, o)
+    tex = tree.get('textures')
+    if isinstance(tex, dict):
+        for t in tex.values():
+            if isinstance(t, str) and not t.startswith('#'):
+                textures.append(t)
+    return models, textures
+
+
+class AssetIndex(object):
+    """ the reference index for one src/main/resources tree. """
+
+    def __init__(self, resources, use_cache=True):
+        self.resources = os.path.abspath(resources)
+        self.assets = os.path.join(self.resources, 'assets')
+        self.cache_file = output.cache_file('assets', self.resources) if use_cache else None
+        # relative path => [mtime_ns, size, model refs, texture refs, error]
+        self.files = {}
+        self.parsed = 0
+        self.dirty = True
+        if self.cache_file is not None:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.files = data.get('files', {})
+            self.dirty = False
+
+    def save(self):
+        if self.cache_file is None or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        tmp = "{}.{}.tmp".format(self.cache_file, os.getpid())
+        # dumps() rather than dump(): dump() streams through the pure
+        # python encoder, several times slower on a big index.
+        text = json.dumps({ 'version' : INDEX_VERSION, 'base' : self.resources,
+                            'files' : self.files }, separators=(',', ':'))
+        with open(tmp, 'w') as f:
+            f.write(text)
+        os.replace(tmp, self.cache_file)
+        self.dirty = False
+
+    def _walk(self, top):
+        """ (path, stat) of every file under top. """
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            try:
+                it = os.scandir(path)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry.path, entry.stat()
+
+    def scan(self):
+        """ (relative path, kind, stat) of every indexed file in the tree. """
+        try:
+            namespaces = sorted(os.listdir(self.assets))
+        except OSError:
+            return
+        skip = len(self.resources) + 1
+        for ns in namespaces:
+            for kind, ext in KINDS.items():
+                top = os.path.join(self.assets, ns, kind)
+                for path, st in self._walk(top):
+                    if path.endswith(ext):
+                        yield path[skip:], kind, st
+
+    def _parse(self, rel, kind):
+        """ (model refs, texture refs, error) for one file. """
+        if kind == 'textures':
+            return [], [], None
+        try:
+            with open(os.path.join(self.resources, rel), 'rb') as f:
+                tree = _loads(f.read())
+        except (OSError, ValueError) as e:
+            return [], [], str(e)
+        if kind == 'blockstates':
+            models, textures = blockstate_refs(tree), []
+        else:
+            models, textures = model_refs(tree)
+        # a blockstate names the same model in many variants.
+        return list(dict.fromkeys(models)), list(dict.fromkeys(textures)), None
+
+    def refresh(self):
+        """ bring the index up to date with the tree; returns the number of
+        files indexed.
+        """
+        seen = {}
+        self.parsed = 0
+        for rel, kind, st in self.scan():
+            entry = self.files.get(rel)
+            if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+                models, textures, error = self._parse(rel, kind)
+                entry = [st.st_mtime_ns, st.st_size, models, textures, error]
+                self.parsed += 1
+            seen[rel] = entry
+        if self.parsed or len(seen) != len(self.files):
+            self.dirty = True
+        self.files = seen
+        return len(seen)
+
+    @staticmethod
+    def split(rel):
+        """ 'assets/foo/models/block/x.json' => ('models', 'foo:block/x') """
+        parts = rel.replace(os.sep, '/').split('/', 3)
+        ns, kind, path = parts[1], parts[2], parts[3]
+        return kind, "{}:{}".format(ns, os.path.splitext(path)[0])
+
+    def check(self):
+        """ cross-reference the index. Returns a dict of
+            dangling - [(file, 'model'/'texture', reference)] to missing files
+            orphans  - block model ids nothing refers to
+            unused   - block/item texture ids no model refers to
+            errors   - [(file, error)] for files that could not be read
+        """
+        namespaces = set()
+        have = { 'models' : set(), 'textures' : set(), 'blockstates' : set() }
+        for rel in self.files:
+            kind, rid = self.split(rel)
+            have[kind].add(rid)
+            namespaces.add(rid.split(':', 1)[0])
+        namespaces.discard('minecraft')
+
+        used_models = set()
+        used_textures = set()
+        dangling = []
+        errors = []
+        for rel in sorted(self.files):
+            mtime, size, models, textures, error = self.files[rel]
+            if error:
+                errors.append((rel, error))
+            for ref in models:
+                ns, path = resource_location(ref)
+                rid = "{}:{}".format(ns, path)
+                used_models.add(rid)
+                if ns in namespaces and rid not in have['models']:
+                    dangling.append((rel, 'model', ref))
+            for ref in textures:
+                ns, path = resource_location(ref)
+                rid = "{}:{}".format(ns, path)
+                used_textures.add(rid)
+                if ns in namespaces and rid not in have['textures']:
+                    dangling.append((rel, 'texture', ref))
+
+        def unreferenced(ids, used, folders):
+            return sorted(rid for rid in ids - used
+                          if rid.split(':', 1)[0] in namespaces
+                          and rid.split(':', 1)[1].startswith(folders))
+
+        return { 'dangling' : dangling,
+                 'orphans' : unreferenced(have['models'], used_models, ORPHAN_MODEL_FOLDERS),
+                 'unused' : unreferenced(have['textures'], used_textures, UNUSED_TEXTURE_FOLDERS),
+                 'errors' : errors }
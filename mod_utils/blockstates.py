@@ -0,0 +1,187 @@
+"""
+Blockstates for the standard block types, as used by gen_blockstate_jsons.py.
+
+    text = blockstates.render_blockstate('foo', 'copper_stairs', 'stairs')
+    tree = blockstates.make_blockstate('foo', 'copper_stairs', 'stairs')
+
+'other' blocks need a property spec (see variants.PropertySpec), and are
+streamed rather than rendered whole:
+
+    chunks = blockstates.stream_blockstate('foo', 'copper_lamp', spec)
+"""
+
+from mod_utils.template import Template, Slot
+from mod_utils.variants import variant_template, PropertySpec
+
+# TEMPLATES
+
+BLOCK_TEMPLATE = Template({ 'variants' : { '' : { "model" : Slot('model') } } })
+
+PRESSURE_PLATE = Template({ 'variants' : { 
+    'powered=false' : { "model" : Slot('model') },
+    'powered=true' : { "model" : Slot('model_down') } 
+} })
+
+SLAB_TEMPLATE = Template({ 'variants' : { 
+    'type=bottom' : { "model" : Slot('bottom') },
+    'type=double' : { "model" : Slot('double') },
+    'type=top' : { "model" : Slot('top') },
+} })
+
+BARS_TEMPLATE = Template({   "multipart": [
+    { "apply": { "model": Slot('post_ends') } },
+    { "when": { "north": "false", "west": "false", "south": "false", "east": "false" },
+      "apply": { "model": Slot('post') }
+    },
+    { "when": { "north": "true", "west": "false", "south": "false", "east": "false" },
+      "apply": { "model": Slot('cap') }
+    },
+    { "when": { "north": "false", "west": "false", "south": "false", "east": "true" },
+      "apply": { "model": Slot('cap'), "y": 90 }
+    },
+    { "when": { "north": "false", "west": "false", "south": "true", "east": "false" },
+      "apply": { "model": Slot('cap_alt') }
+    },
+    { "when": { "north": "false", "west": "true", "south": "false", "east": "false" },
+      "apply": { "model": Slot('cap_alt'), "y": 90 }
+    },
+    { "when": { "north": "true" }, 
+      "apply": { "model": Slot('side') } },
+    { "when": { "east": "true" },
+      "apply": { "model": Slot('side'), "y": 90 }
+    },
+    { "when": { "south": "true" },
+      "apply": { "model": Slot('side_alt') }
+    },
+    { "when": { "west": "true" },
+      "apply": { "model": Slot('side_alt'), "y": 90 }
+    }
+] })
+
+# crops grow through age=0..7, a model per stage.
+CROP_TEMPLATE = Template({ 'variants' : {
+    "age={}".format(n) : { "model" : Slot("stage{}".format(n)) } for n in range(8)
+} })
+
+PANE_TEMPLATE = Template({ "multipart": [
+    { "apply": { "model": Slot('post') } },
+    { "when": { "north": "true" }, "apply": { "model": Slot('side') } },
+    { "when": { "east": "true" }, "apply": { "model": Slot('side'), "y": 90 } },
+    { "when": { "south": "true" }, "apply": { "model": Slot('side_alt') } },
+    { "when": { "west": "true" }, "apply": { "model": Slot('side_alt'), "y": 90 } },
+    { "when": { "north": "false" }, "apply": { "model": Slot('noside') } },
+    { "when": { "east": "false" }, "apply": { "model": Slot('noside_alt') } },
+    { "when": { "south": "false" }, "apply": { "model": Slot('noside_alt'), "y": 90 } },
+    { "when": { "west": "false" }, "apply": { "model": Slot('noside'), "y": 270 } }
+] })
+
+# rotated blocks: expanded from the rotation tables in mod_utils.variants.
+STAIRS_TEMPLATE = variant_template('stairs')
+DOORS_TEMPLATE = variant_template('door')
+FACING_TEMPLATE = variant_template('facing')
+HORIZONTAL_TEMPLATE = variant_template('horizontal_facing')
+MACHINE_TEMPLATE = variant_template('machine')
+PILLAR_TEMPLATE = variant_template('pillar')
+LOG_TEMPLATE = variant_template('log')
+
+BLOCKSTATE_TYPES = ('simple', 'crop', 'facing', 'bars', 'door', 'pane', 'stairs',
+                   'pressure_plate', 'slab', 'horizontal_facing', 'machine', 'pillar',
+                   'log', 'other')
+
+
+def blockstate_slots(modid, blockname, blocktype):
+    """ pick the template for blocktype and work out its model names.
+    Returns (template, slot values); raises NotImplementedError for block
+    types we cannot do yet.
+    """
+    if blocktype == 'simple':
+        return BLOCK_TEMPLATE, { 'model' : "{}:block/{}".format(modid, blockname) }
+    elif blocktype == 'pressure_plate':
+        return PRESSURE_PLATE, {
+            'model' : "{}:block/{}".format(modid, blockname),
+            'model_down' : "{}:block/{}_down".format(modid, blockname) }
+    elif blocktype == 'slab':
+        lblockname = blockname
+        dblockname = blockname
+        if lblockname.endswith('_slab'):
+            nn = lblockname.rindex('_slab')
+            lblockname = lblockname[0:nn]
+            if lblockname.endswith('brick'):
+                dblockname = lblockname + 's'
+            else:
+                dblockname = lblockname + '_block'
+        if lblockname.endswith('_block'):
+            nn = lblockname.rindex('_block')
+            lblockname = lblockname[0:nn]
+        elif lblockname.endswith('bricks'):
+            nn = lblockname.rindex('s')
+            lblockname = lblockname[0:nn]
+        return SLAB_TEMPLATE, {
+            'bottom' : "{}:block/{}".format(modid, "{}_slab".format(lblockname)),
+            'double' : "{}:block/{}".format(modid, dblockname),
+            'top' : "{}:block/{}".format(modid, "{}_slab_top".format(lblockname)) }
+    elif blocktype == 'bars':
+        return BARS_TEMPLATE, {
+            'post_ends' : "{}:block/{}_post_ends".format(modid, blockname),
+            'post' : "{}:block/{}_post".format(modid, blockname),
+            'cap' : "{}:block/{}_cap".format(modid, blockname),
+            'cap_alt' : "{}:block/{}_cap_alt".format(modid, blockname),
+            'side' : "{}:block/{}_side".format(modid, blockname),
+            'side_alt' : "{}:block/{}_side_alt".format(modid, blockname) }
+    elif blocktype == 'stairs':
+        lblockname = blockname
+        if lblockname.endswith('_stairs'):
+            nn = lblockname.rindex('_stairs');
+            lblockname = lblockname[0:nn]
+        return STAIRS_TEMPLATE, {
+            'stairs' : "{}:block/{}_stairs".format(modid, lblockname),
+            'inner' : "{}:block/{}_inner_stairs".format(modid, lblockname),
+            'outer' : "{}:block/{}_outer_stairs".format(modid, lblockname) }
+    elif blocktype == 'door':
+        return DOORS_TEMPLATE, {
+            'bottom' : "{}:block/{}_bottom".format(modid, blockname),
+            'bottom_hinge' : "{}:block/{}_bottom_hinge".format(modid, blockname),
+            'top' : "{}:block/{}_top".format(modid, blockname),
+            'top_hinge' : "{}:block/{}_top_hinge".format(modid, blockname) }
+    elif blocktype in ('facing', 'horizontal_facing'):
+        template = FACING_TEMPLATE if blocktype == 'facing' else HORIZONTAL_TEMPLATE
+        return template, { 'model' : "{}:block/{}".format(modid, blockname) }
+    elif blocktype == 'machine':
+        return MACHINE_TEMPLATE, {
+            'model' : "{}:block/{}".format(modid, blockname),
+            'model_on' : "{}:block/{}_on".format(modid, blockname) }
+    elif blocktype == 'crop':
+        return CROP_TEMPLATE, { "stage{}".format(n) : "{}:block/{}_stage{}".format(modid, blockname, n)
+                                for n in range(8) }
+    elif blocktype == 'pane':
+        return PANE_TEMPLATE, { part : "{}:block/{}_{}".format(modid, blockname, part)
+                                for part in ('post', 'side', 'side_alt', 'noside', 'noside_alt') }
+    elif blocktype == 'pillar':
+        return PILLAR_TEMPLATE, { 'model' : "{}:block/{}".format(modid, blockname) }
+    elif blocktype == 'log':
+        return LOG_TEMPLATE, {
+            'model' : "{}:block/{}".format(modid, blockname),
+            'horizontal' : "{}:block/{}_horizontal".format(modid, blockname) }
+    elif blocktype == 'other':
+        raise NotImplementedError("other blockstates need a property spec")
+    raise NotImplementedError("{} not yet implemented".format(blocktype))
+
+
+def make_blockstate(modid, blockname, blocktype):
+    """ construct the blockstate dict for blockname. """
+    template, values = blockstate_slots(modid, blockname, blocktype)
+    return template.fill(**values)
+
+
+def render_blockstate(modid, blockname, blocktype):
+    """ the blockstate json text for blockname, same as json.dump(indent=4). """
+    template, values = blockstate_slots(modid, blockname, blocktype)
+    return template.render(**values)
+
+
+def stream_blockstate(modid, blockname, spec):
+    """ the text of an 'other' blockstate described by property spec (a
+    parsed JSON/TOML document), as an iterator of chunks; raises ValueError
+    for a bad spec.
+    """
+    return PropertySpec(spec, modid, blockname).stream()
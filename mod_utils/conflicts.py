@@ -0,0 +1,243 @@
+"""
+Recipe conflict detection: reduce each recipe to a signature of what it
+takes, so recipes the game cannot tell apart end up with equal signatures.
+
+    index = conflicts.RecipeIndex()
+    for recipe_id, path in conflicts.recipe_files(resources_dir):
+        index.add_file(recipe_id, path)
+    for signature, recipes in index.conflicts():
+        ...
+
+Signatures:
+
+    crafting_shaped    the pattern with each key replaced by its ingredient,
+                       trimmed of empty rows and columns; a pattern and its
+                       mirror image are the same recipe.
+    crafting_shapeless the multiset of ingredients.
+    smelting etc       the ingredient (also Silent's crushing).
+    stonecutting       the ingredient, result and count: the stonecutter
+                       offers every recipe for an input, so only exact
+                       duplicates clash.
+    fusion:alloying    the multiset of inputs and the catalyst.
+    alloy_smelting     the multiset of Silent's alloy smelter ingredients.
+    anything else      everything but results, conditions, timings and xp.
+
+Ingredients without a namespace are minecraft's; item/tag alternatives are
+sorted. Conditions are ignored, since two recipes under different config
+flags can both be enabled.
+
+A shaped recipe also overlaps a shapeless one with the same multiset of
+ingredients (the shapeless recipe matches the shaped arrangement too);
+overlaps() reports those.
+"""
+
+import os
+import os.path
+import json
+from collections import Counter
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+SHAPED = 'minecraft:crafting_shaped'
+SHAPELESS = 'minecraft:crafting_shapeless'
+COOKING = ('minecraft:smelting', 'minecraft:blasting', 'minecraft:smoking',
+           'minecraft:campfire_cooking')
+STONECUTTING = 'minecraft:stonecutting'
+# keys that don't affect which inputs a recipe matches.
+IGNORED_KEYS = ('result', 'results', 'output', 'conditions', 'experience',
+                'cookingtime', 'process_time', 'processTime', 'group', 'count')
+
+
+def namespaced(rid):
+    return rid if ':' in rid else "minecraft:" + rid
+
+
+def ingredient_key(node):
+    """ hashable string for an ingredient: 'item:<id>', 'tag:<id>', a sorted
+    'any[...]' of alternatives, or the canonical JSON of anything else.
+    """
+    if isinstance(node, str):
+        return "item:" + namespaced(node)
+    if isinstance(node, list):
+        return "any[{}]".format(",".join(sorted(ingredient_key(n) for n in node)))
+    if isinstance(node, dict):
+        if 'item' in node and isinstance(node['item'], str):
+            return "item:" + namespaced(node['item'])
+        if 'tag' in node and isinstance(node['tag'], str):
+            return "tag:" + namespaced(node['tag'])
+        node = { k : v for k, v in node.items() if k != 'count' }
+    return json.dumps(node, sort_keys=True, separators=(',', ':'))
+
+
+def ingredient_count(node):
+    if isinstance(node, dict):
+        count = node.get('count', 1)
+        if isinstance(count, int):
+            return count
+    return 1
+
+
+def multiset(nodes):
+    """ sorted ((ingredient key, count)...) of a list of ingredients. """
+    counts = Counter()
+    for n in nodes:
+        counts[ingredient_key(n)] += ingredient_count(n)
+    return tuple(sorted(counts.items()))
+
+
+_patterns = {}
+
+
+def _trim(pattern):
+    """ (rows, mirrored rows, characters) of the pattern, without the blank
+    rows and columns around it. Mods reuse a handful of patterns, so these
+    are remembered.
+    """
+    pattern = tuple(pattern)
+    trimmed = _patterns.get(pattern)
+    if trimmed is not None:
+        return trimmed
+    rows = [i for i, r in enumerate(pattern) if r.strip(' ')]
+    if rows:
+        rows = pattern[rows[0]:rows[-1] + 1]
+        width = max(len(r) for r in rows)
+        rows = [r.ljust(width) for r in rows]
+        left = min(len(r) - len(r.lstrip(' ')) for r in rows)
+        right = max(len(r.rstrip(' ')) for r in rows)
+        rows = [r[left:right] for r in rows]
+    trimmed = (rows, [r[::-1] for r in rows], set(''.join(rows)))
+    _patterns[pattern] = trimmed
+    return trimmed
+
+
+def shaped_grid(tree):
+    """ the trimmed pattern of ingredient keys ('' for a blank), or the
+    lesser of it and its mirror image.
+    """
+    cells = { k : ingredient_key(v) for k, v in (tree.get('key') or {}).items() }
+    cells[' '] = ''
+    rows, mirrored, chars = _trim([r for r in tree.get('pattern') or () if isinstance(r, str)])
+    for c in chars - cells.keys():
+        cells[c] = "missing:" + c
+    grid = tuple(tuple(map(cells.__getitem__, row)) for row in rows)
+    mirror = tuple(tuple(map(cells.__getitem__, row)) for row in mirrored)
+    return min(grid, mirror)
+
+
+def signature(tree):
+    """ hashable signature of a recipe's inputs, or None if it has no type. """
+    if not isinstance(tree, dict) or not isinstance(tree.get('type'), str):
+        return None
+    rtype = namespaced(tree['type'])
+    if rtype == SHAPED:
+        return (rtype, shaped_grid(tree))
+    if rtype == SHAPELESS:
+        return (rtype, multiset(tree.get('ingredients') or ()))
+    if rtype in COOKING or rtype == 'silents_mechanisms:crushing':
+        return (rtype, ingredient_key(tree.get('ingredient')))
+    if rtype == STONECUTTING:
+        result = namespaced(str(tree.get('result')))
+        count = tree.get('count', 1)
+        return (rtype, ingredient_key(tree.get('ingredient')),
+                "=> {}x{}".format(count, result) if count != 1 else "=> " + result)
+    if rtype == 'silents_mechanisms:alloy_smelting':
+        return (rtype, multiset(tree.get('ingredients') or ()))
+    if rtype == 'fusion:alloying':
+        return (rtype, multiset(tree.get('inputs') or ()),
+                ingredient_key(tree.get('catalyst')))
+    rest = { k : v for k, v in tree.items() if k not in IGNORED_KEYS }
+    return (rtype, json.dumps(rest, sort_keys=True, separators=(',', ':')))
+
+
+def result_key(tree):
+    """ what a recipe makes, for telling duplicates from conflicts. """
+    for k in ('result', 'output', 'results'):
+        if k in tree:
+            result = tree[k]
+            if isinstance(result, str):
+                return result
+            if isinstance(result, dict) and result.keys() <= { 'item', 'count' }:
+                count = result.get('count', 1)
+                return "{}x{}".format(count, result.get('item')) if count != 1 else result.get('item')
+            return json.dumps(result, sort_keys=True, separators=(',', ':'))
+    return None
+
+
+def recipe_files(root):
+    """ (recipe id, path) of every recipe under root, which may be a
+    resources directory, its data directory, or one mod's recipes
+    directory. Subdirectories (fusion_furnace/, crushing/...) are included.
+    """
+    root = os.path.abspath(root)
+    if os.path.basename(root) == 'recipes':
+        tops = [(os.path.basename(os.path.dirname(root)), root)]
+    else:
+        data = root if os.path.basename(root) == 'data' else os.path.join(root, 'data')
+        try:
+            namespaces = sorted(os.listdir(data))
+        except OSError:
+            namespaces = []
+        tops = [(ns, os.path.join(data, ns, 'recipes')) for ns in namespaces]
+    for ns, top in tops:
+        skip = len(top) + 1
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames.sort()
+            for f in sorted(filenames):
+                if f.endswith('.json'):
+                    path = os.path.join(dirpath, f)
+                    yield "{}:{}".format(ns, path[skip:-5].replace(os.sep, '/')), path
+
+
+class RecipeIndex(object):
+    """ recipes by signature; one pass over the recipes finds every
+    conflict.
+    """
+
+    def __init__(self):
+        # signature => [(recipe id, path, result key)]
+        self.by_signature = {}
+        self.count = 0
+        self.errors = []
+
+    def add(self, recipe_id, path, tree):
+        sig = signature(tree)
+        if sig is None:
+            return
+        self.count += 1
+        entry = (recipe_id, path, result_key(tree))
+        self.by_signature.setdefault(sig, []).append(entry)
+
+    def add_file(self, recipe_id, path):
+        try:
+            with open(path, 'rb') as f:
+                tree = _loads(f.read())
+        except (OSError, ValueError) as e:
+            self.errors.append((path, str(e)))
+            return
+        self.add(recipe_id, path, tree)
+
+    def conflicts(self):
+        """ (signature, [(recipe id, path, result)]) for every signature
+        shared by more than one recipe.
+        """
+        for sig, entries in self.by_signature.items():
+            if len(entries) > 1:
+                yield sig, entries
+
+    def overlaps(self):
+        """ (shapeless entries, shaped entries) with the same ingredients. """
+        shapeless = { sig[1] : entries for sig, entries in self.by_signature.items()
+                      if sig[0] == SHAPELESS }
+        found = {}
+        for sig, entries in self.by_signature.items():
+            if sig[0] == SHAPED:
+                cells = Counter(c for row in sig[1] for c in row if c)
+                key = tuple(sorted(cells.items()))
+                if key in shapeless:
+                    found.setdefault(key, []).extend(entries)
+        for key, shaped in found.items():
+            yield shapeless[key], shaped
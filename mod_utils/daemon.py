@@ -0,0 +1,230 @@
+"""
+Persistent generator server for mod_utils_client.py.
+
+The server imports the generator scripts once, compiles all their
+templates, and then listens on a Unix domain socket. Each request names a
+script, its argv and the caller's working directory; the server forks a
+child per request (so parallel build jobs run concurrently, each with its
+own cwd and output), runs the script's main() there, and sends back its
+exit status and output. The server exits after being idle for a while.
+
+Protocol: the client sends one JSON line,
+    { "script" : "gen_blockstate_jsons.py", "argv" : [ ... ], "cwd" : "..." }
+and gets one JSON line back,
+    { "status" : 0, "stdout" : "...", "stderr" : "..." }
+A request of { "script" : "--stop" } shuts the server down.
+
+Requests have no terminal: a script that asks for input (say
+make_storage_recipes.py for one material without --yes) is stopped there,
+and the response has "interactive" : true so the client runs it directly
+instead.
+"""
+
+import sys
+import os
+import io
+import json
+import socket
+import time
+import signal
+import importlib
+import socketserver
+
+from mod_utils import GENERATORS
+from mod_utils.template import Template
+
+# scripts the server will run => their module names.
+SCRIPTS = {
+    'gen_blockstate_jsons.py' : 'gen_blockstate_jsons',
+    'gen_model_jsons.py' : 'gen_model_jsons',
+    'make_custom_recipes.py' : 'make_custom_recipes',
+    'make_silents_recipes.py' : 'make_silents_recipes',
+    'make_loot_drops.py' : 'make_loot_drops',
+    'make_recipe_advancements.py' : 'make_recipe_advancements',
+    'make_storage_recipes.py' : 'make_storage_recipes',
+    'make_tool_recipes.py' : 'make_tool_recipes',
+}
+
+DEFAULT_IDLE = 900
+
+
+class ServerRunning(Exception):
+    """ serve() found another server listening on the socket. """
+
+
+class NeedsInput(Exception):
+    """ a script run by the server tried to read stdin. """
+
+
+class _NoInput(io.TextIOBase):
+    """ stdin for requests: reading it stops the script. """
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        raise NeedsInput()
+
+    def readline(self, size=-1):
+        raise NeedsInput()
+
+
+def socket_path():
+    """ default socket: $MOD_UTILS_SOCKET, else in $XDG_RUNTIME_DIR or /tmp.
+    mod_utils_client.py has its own copy of this; keep them in step.
+    """
+    path = os.environ.get('MOD_UTILS_SOCKET')
+    if path:
+        return path
+    rundir = os.environ.get('XDG_RUNTIME_DIR')
+    if rundir and os.path.isdir(rundir):
+        return os.path.join(rundir, 'mod_utils.sock')
+    return os.path.join('/tmp', 'mod_utils-{}.sock'.format(os.getuid()))
+
+
+def script_name(name):
+    """ map 'gen_blockstate_jsons.py', 'gen_blockstate_jsons' or a path to
+    the script's name; None if we don't serve that script.
+    """
+    name = os.path.basename(name)
+    if not name.endswith('.py'):
+        name = name + '.py'
+    return name if name in SCRIPTS else None
+
+
+def warm_up():
+    """ import every served script and generator module and compile their
+    templates, so forked children start with everything ready.
+    """
+    modules = {}
+    for script, modname in SCRIPTS.items():
+        modules[script] = importlib.import_module(modname)
+    for modname in GENERATORS:
+        module = importlib.import_module('mod_utils.' + modname)
+        for value in vars(module).values():
+            if isinstance(value, Template):
+                value.compile()
+    return modules
+
+
+def run_script(module, script, argv, cwd):
+    """ run a script's main() in this (forked) process, capturing output.
+    Returns the response dict.
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    status = 0
+    sys.stdout = stdout
+    sys.stderr = stderr
+    sys.stdin = _NoInput()
+    sys.argv = [script] + list(argv)
+    try:
+        os.chdir(cwd)
+        status = module.main(list(argv)) or 0
+    except NeedsInput:
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+        return { 'status' : 2, 'stdout' : '', 'interactive' : True,
+                 'stderr' : "mod_utils server: {} asks for input; run it directly "
+                            "or with --yes\n".format(script) }
+    except SystemExit as e:
+        if e.code is None:
+            status = 0
+        elif isinstance(e.code, int):
+            status = e.code
+        else:
+            print(e.code, file=stderr)
+            status = 1
+    except Exception as e:
+        print("Error: {}: {}".format(type(e).__name__, e), file=stderr)
+        status = 1
+    finally:
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+    return { 'status' : status, 'stdout' : stdout.getvalue(),
+             'stderr' : stderr.getvalue() }
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """ runs in the forked child for each request. """
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+            script = request['script']
+            if script == '--stop':
+                response = { 'status' : 0, 'stdout' : '', 'stderr' : '' }
+                os.kill(os.getppid(), signal.SIGTERM)
+            elif script_name(script) is None:
+                response = { 'status' : 2, 'stdout' : '',
+                             'stderr' : "mod_utils server: unknown script {}\n".format(script) }
+            else:
+                script = script_name(script)
+                response = run_script(self.server.modules[script], script,
+                                      request.get('argv', []), request['cwd'])
+        except (ValueError, KeyError, TypeError) as e:
+            response = { 'status' : 2, 'stdout' : '',
+                         'stderr' : "mod_utils server: bad request: {}\n".format(e) }
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+class GeneratorServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """ forks a child per request; remembers when it was last busy. """
+
+    def __init__(self, path, modules):
+        self.modules = modules
+        self.last_active = time.monotonic()
+        self.stopping = False
+        socketserver.UnixStreamServer.__init__(self, path, RequestHandler)
+        os.chmod(path, 0o600)
+
+    def process_request(self, request, client_address):
+        self.last_active = time.monotonic()
+        socketserver.ForkingMixIn.process_request(self, request, client_address)
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+
+def remove_stale_socket(path):
+    """ remove the socket at path if no server is listening on it; raises
+    ServerRunning if one is.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(path)
+        except FileNotFoundError:
+            return
+        except ConnectionRefusedError:
+            # left behind by a server that died.
+            os.unlink(path)
+            return
+        except OSError:
+            # not a socket, say: leave it for bind() to report.
+            return
+    raise ServerRunning("a mod_utils server is already running on {}".format(path))
+
+
+def serve(path=None, idle=DEFAULT_IDLE):
+    """ run the server until stopped (SIGTERM, or a --stop request) or idle
+    for idle seconds. Raises ServerRunning if another server is listening
+    on path already.
+    """
+    if path is None:
+        path = socket_path()
+    remove_stale_socket(path)
+    modules = warm_up()
+    server = GeneratorServer(path, modules)
+    server.timeout = min(1.0, idle)
+    signal.signal(signal.SIGTERM, server.stop)
+    try:
+        while not server.stopping:
+            server.handle_request()
+            server.collect_children()
+            if (time.monotonic() - server.last_active > idle
+                    and not server.active_children):
+                break
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
@@ -0,0 +1,332 @@
+"""
+Model deduplication: find block/item models that are the same, or the
+same but for their textures, and consolidate them.
+
+    models = dedupe.ModelSet(models_dir, modid)
+    plan = models.plan()
+    models.apply(plan, blockstates_dir)
+
+Models are compared in a canonical form: keys sorted, resource locations
+namespaced ('block/cube_all' is 'minecraft:block/cube_all').
+
+    exact      - block models identical in canonical form; all but one
+                 are removed, and blockstates and models referring to them
+                 are pointed at the one kept.
+    structural - models identical but for their texture values (e.g. every
+                 slab whose bottom, top and side are one texture); what they
+                 share goes in a new parent model under block/shared/ or
+                 item/shared/, and each becomes { parent, textures } with
+                 one texture per distinct value. Only done for a group when
+                 it makes the files smaller.
+
+Models that other models inherit from and set textures on are left alone
+in the structural pass (a child setting one texture of a merged group would
+change the others). References from code or from other mods can't be seen.
+"""
+
+import os
+import os.path
+import json
+
+from mod_utils import output, template
+from mod_utils.assets import resource_location, blockstate_refs
+
+# keys a model inherits from its parent; anything else (overrides, custom
+# loaders) stays in the model itself.
+INHERITED = ('parent', 'ambientocclusion', 'gui_light', 'display', 'textures', 'elements')
+FOLDERS = ('block/', 'item/')
+SHARED = 'shared/'
+
+
+def namespaced(ref):
+    if ref.startswith('builtin/'):
+        return ref
+    return "{}:{}".format(*resource_location(ref))
+
+
+def normalize(tree):
+    """ a copy of a model with its parent, textures and override models
+    namespaced.
+    """
+    tree = dict(tree)
+    if isinstance(tree.get('parent'), str):
+        tree['parent'] = namespaced(tree['parent'])
+    if isinstance(tree.get('textures'), dict):
+        tree['textures'] = { k : namespaced(v) if isinstance(v, str) and not v.startswith('#') else v
+                             for k, v in tree['textures'].items() }
+    if isinstance(tree.get('overrides'), list):
+        tree['overrides'] = [ dict(o, model=namespaced(o['model']))
+                              if isinstance(o, dict) and isinstance(o.get('model'), str) else o
+                              for o in tree['overrides'] ]
+    return tree
+
+
+def canonical(tree):
+    return json.dumps(tree, sort_keys=True, separators=(',', ':'))
+
+
+def texture_classes(textures):
+    """ {representative key : value} and {key : representative key} for a
+    textures table: keys with the same value share the first of them (in
+    sorted order). Variable references (#all...) are left out.
+    """
+    reps = {}
+    classes = {}
+    for key in sorted(textures):
+        value = textures[key]
+        if isinstance(value, str) and value.startswith('#'):
+            continue
+        rep = reps.setdefault(canonical(value), key)
+        classes[key] = rep
+    return { rep : textures[rep] for rep in set(classes.values()) }, classes
+
+
+def structure(tree):
+    """ the canonical form of a normalized model with each texture value
+    replaced by its class (see texture_classes); None for models with keys
+    that aren't plainly inherited.
+    """
+    if any(k not in INHERITED and k != 'overrides' for k in tree):
+        return None
+    textures = tree.get('textures') or {}
+    if not isinstance(textures, dict):
+        return None
+    bound, classes = texture_classes(textures)
+    shape = { k : v for k, v in tree.items() if k != 'overrides' }
+    shape['textures'] = { k : ('#' + classes[k] if k in classes else v) for k, v in textures.items() }
+    return canonical(shape)
+
+
+def _redirect(node, moved):
+    """ replace 'model' references in a blockstate/override node; returns
+    the number replaced.
+    """
+    n = 0
+    if isinstance(node, dict):
+        model = node.get('model')
+        if isinstance(model, str) and namespaced(model) in moved:
+            node['model'] = moved[namespaced(model)]
+            n += 1
+    elif isinstance(node, list):
+        for item in node:
+            n += _redirect(item, moved)
+    return n
+
+
+def redirect_blockstate(tree, moved):
+    n = 0
+    variants = tree.get('variants')
+    if isinstance(variants, dict):
+        for v in variants.values():
+            n += _redirect(v, moved)
+    multipart = tree.get('multipart')
+    if isinstance(multipart, list):
+        for part in multipart:
+            if isinstance(part, dict):
+                n += _redirect(part.get('apply'), moved)
+    return n
+
+
+def redirect_model(tree, moved):
+    n = 0
+    parent = tree.get('parent')
+    if isinstance(parent, str) and namespaced(parent) in moved:
+        tree['parent'] = moved[namespaced(parent)]
+        n += 1
+    for o in tree.get('overrides') or ():
+        n += _redirect(o, moved)
+    return n
+
+
+def _size(tree):
+    return len(template.dumps(tree).encode('utf-8'))
+
+
+class ModelSet(object):
+    """ every model under one assets/<modid>/models directory. """
+
+    def __init__(self, models_dir, modid):
+        self.models_dir = os.path.abspath(models_dir)
+        self.modid = modid
+        # model id => (tree, file size)
+        self.models = {}
+        self.errors = []
+        for dirpath, dirnames, filenames in os.walk(self.models_dir):
+            dirnames.sort()
+            for f in sorted(filenames):
+                if not f.endswith('.json'):
+                    continue
+                path = os.path.join(dirpath, f)
+                rel = os.path.relpath(path, self.models_dir)[:-len('.json')].replace(os.sep, '/')
+                try:
+                    with open(path, 'rb') as fp:
+                        data = fp.read()
+                    tree = json.loads(data)
+                except (OSError, ValueError) as e:
+                    self.errors.append((path, str(e)))
+                    continue
+                if isinstance(tree, dict):
+                    self.models["{}:{}".format(modid, rel)] = (tree, len(data))
+
+    def path(self, model_id):
+        return os.path.join(self.models_dir, model_id.split(':', 1)[1] + '.json')
+
+    def _folder(self, model_id):
+        rel = model_id.split(':', 1)[1]
+        for folder in FOLDERS:
+            if rel.startswith(folder) and not rel.startswith(folder + SHARED):
+                return folder
+        return None
+
+    def plan(self):
+        """ what to consolidate: a dict of
+            exact   - [(kept id, [removed ids])]
+            shared  - [(new parent id, parent tree, {model id : new tree})]
+            models, size, removed, rewritten, new_size - totals
+        """
+        exact = []
+        normal = { mid : normalize(tree) for mid, (tree, size) in self.models.items() }
+        groups = {}
+        for mid in sorted(self.models):
+            if self._folder(mid) == 'block/':
+                groups.setdefault(canonical(normal[mid]), []).append(mid)
+        moved = {}
+        for ids in groups.values():
+            if len(ids) > 1:
+                exact.append((ids[0], ids[1:]))
+                for mid in ids[1:]:
+                    moved[mid] = ids[0]
+
+        # the models left, with references to removed duplicates redirected.
+        trees = {}
+        redirected = set()
+        for mid, (tree, size) in self.models.items():
+            if mid not in moved:
+                tree = json.loads(json.dumps(tree))
+                if redirect_model(tree, moved):
+                    normal[mid] = normalize(tree)
+                    redirected.add(mid)
+                trees[mid] = tree
+        # models other models inherit from while setting textures of their
+        # own: leave those alone.
+        parents = set(normal[mid].get('parent') for mid in trees if normal[mid].get('textures'))
+
+        shapes = {}
+        for mid in sorted(self.models):
+            if mid not in trees or mid in parents or self._folder(mid) is None:
+                continue
+            shape = structure(normal[mid])
+            if shape is not None:
+                shapes.setdefault((self._folder(mid), shape), []).append(mid)
+
+        shared = []
+        taken = set(self.models)
+        for (folder, shape), ids in sorted(shapes.items(), key=lambda s: s[1][0]):
+            if len(ids) < 2:
+                continue
+            pid, parent, children = self._consolidate(folder, ids, trees, normal, taken)
+            before = sum(self.models[mid][1] for mid in ids)
+            after = _size(parent) + sum(_size(t) for t in children.values())
+            if after < before:
+                taken.add(pid)
+                shared.append((pid, parent, children))
+
+        size = sum(size for tree, size in self.models.values())
+        removed = sum(self.models[mid][1] for mid in moved)
+        rewritten = sum(len(children) for pid, parent, children in shared)
+        new_size = size - removed
+        for pid, parent, children in shared:
+            new_size += _size(parent)
+            for mid, tree in children.items():
+                new_size += _size(tree) - self.models[mid][1]
+                redirected.discard(mid)
+        for mid in redirected:
+            new_size += _size(trees[mid]) - self.models[mid][1]
+        return { 'exact' : exact, 'shared' : shared, 'models' : len(self.models),
+                 'removed' : len(moved), 'rewritten' : rewritten,
+                 'size' : size, 'new_size' : new_size }
+
+    def _consolidate(self, folder, ids, trees, normal, taken):
+        """ (shared parent id, its tree, {model id : new tree}). """
+        first = trees[ids[0]]
+        bound, classes = texture_classes(normal[ids[0]].get('textures') or {})
+        parent = {}
+        for k, v in first.items():
+            if k == 'textures':
+                textures = { key : ('#' + classes[key] if key in classes else value)
+                             for key, value in v.items() if classes.get(key) != key }
+                if textures:
+                    parent['textures'] = textures
+            elif k != 'overrides':
+                parent[k] = v
+        stem = namespaced(first.get('parent', 'model')).rsplit('/', 1)[-1]
+        pid = "{}:{}{}{}".format(self.modid, folder, SHARED, stem)
+        n = 1
+        while pid in taken:
+            n += 1
+            pid = "{}:{}{}{}_{}".format(self.modid, folder, SHARED, stem, n)
+        children = {}
+        for mid in ids:
+            tree = trees[mid]
+            textures = tree.get('textures') or {}
+            child = { 'parent' : pid }
+            own = { key : textures[key] for key in textures if classes.get(key) == key }
+            if own:
+                child['textures'] = own
+            if 'overrides' in tree:
+                child['overrides'] = tree['overrides']
+            children[mid] = child
+        return pid, parent, children
+
+    def apply(self, plan, blockstates_dir=None, force=False):
+        """ carry out a plan: write the new and rewritten models, point
+        references at the kept duplicates, remove the others. Returns
+        (the number of references redirected, [writers]).
+        """
+        moved = {}
+        for kept, removed in plan['exact']:
+            for mid in removed:
+                moved[mid] = kept
+        rewritten = {}
+        models = output.OutputWriter(self.models_dir, force=force)
+        for pid, parent, children in plan['shared']:
+            models.write(self.path(pid), template.dumps(parent))
+            rewritten.update(children)
+        redirected = 0
+        for mid, (tree, size) in sorted(self.models.items()):
+            if mid in moved:
+                continue
+            tree = rewritten.get(mid, tree)
+            if moved:
+                tree = json.loads(json.dumps(tree))
+                n = redirect_model(tree, moved)
+                redirected += n
+                if not n and mid not in rewritten:
+                    continue
+            elif mid not in rewritten:
+                continue
+            models.write(self.path(mid), template.dumps(tree))
+        writers = [models]
+        if moved and blockstates_dir and os.path.isdir(blockstates_dir):
+            states = output.OutputWriter(blockstates_dir, force=force)
+            for f in sorted(os.listdir(blockstates_dir)):
+                if not f.endswith('.json'):
+                    continue
+                path = os.path.join(blockstates_dir, f)
+                try:
+                    with open(path, 'rb') as fp:
+                        tree = json.loads(fp.read())
+                except (OSError, ValueError) as e:
+                    self.errors.append((path, str(e)))
+                    continue
+                if not isinstance(tree, dict) \
+                        or not any(namespaced(m) in moved for m in blockstate_refs(tree)):
+                    continue
+                redirected += redirect_blockstate(tree, moved)
+                states.write(path, template.dumps(tree))
+            writers.append(states)
+        for writer in writers:
+            writer.close()
+        for mid in moved:
+            os.remove(self.path(mid))
+        return redirected, writers
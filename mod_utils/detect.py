@@ -0,0 +1,197 @@
+"""
+Work out model types from a mod's textures, for gen_model_jsons.py
+--detect: which blocks are crops, doors, machines, pillars... and which
+textures go in which slots, from the texture names alone.
+
+    index = TextureIndex(textures_dir)
+    rows, unused = detect_models(index, modid)
+
+textures/block and textures/item are each scanned once: only directory
+entries are listed, and only the 24-byte PNG header of each file is read
+(to skip files that aren't PNGs, and to note animated strips), so it
+stays quick on folders with thousands of textures.
+
+Block textures are grouped by name and suffix:
+
+    <name>_stage0..7              crop, if all eight stages are there
+                                  (else reported, with the missing ones)
+    <name>_front_on, <name>_front machine (with _side, _top)
+    <name>_front                  horizontal_facing (with _side, _top)
+    <name>_bottom, <name>_top     door, if <name> ends in _door or has an
+                                  item texture
+    <name>_top, name ends _pane   pane
+    name ends _bars               bars
+    <name>, <name>_top or _end    log (names ending _log, _stem, _wood), or
+                                  pillar
+    <name>                        simple block
+
+Item textures: <name>_pulling_0..2 is a bow, names ending in a tool or
+armor piece are tool/armor, anything else (not a block's) is inventory;
+item rows are item_only, so gen_blockstate_jsons.py passes over them.
+Missing side/top faces fall back to the block's own texture (or its
+front).
+"""
+
+import os
+import re
+import struct
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+STAGE_RE = re.compile(r'^(.+)_stage([0-7])$')
+CROP_STAGES = 8
+PULLING_RE = re.compile(r'^(.+)_pulling_([0-2])$')
+# texture name suffixes of other faces; left over ones are reported.
+FACE_SUFFIXES = ('_top', '_side', '_bottom', '_end', '_front', '_front_on', '_on')
+LOG_SUFFIXES = ('_log', '_stem', '_wood')
+TOOL_SUFFIXES = ('_sword', '_pickaxe', '_axe', '_shovel', '_hoe')
+ARMOR_SUFFIXES = ('_helmet', '_chestplate', '_leggings', '_boots')
+# manifest columns written for the detected rows.
+COLUMNS = ('blockname', 'type', 'item_only', 'textures')
+
+
+def png_size(path):
+    """ (width, height) from a PNG's header, or None if it isn't a PNG. """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(24)
+    except OSError:
+        return None
+    if len(head) < 24 or not head.startswith(PNG_SIGNATURE) or head[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', head[16:24])
+
+
+class TextureIndex(object):
+    """ the .png files of textures/block and textures/item, by name. """
+
+    def __init__(self, textures_dir):
+        self.textures_dir = textures_dir
+        # folder => { name : (width, height) }
+        self.folders = { 'block' : {}, 'item' : {} }
+        self.bad = []
+        self.animated = 0
+        for folder, names in self.folders.items():
+            try:
+                it = os.scandir(os.path.join(textures_dir, folder))
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if not entry.name.endswith('.png') or not entry.is_file():
+                        continue
+                    size = png_size(entry.path)
+                    if size is None:
+                        self.bad.append(entry.path)
+                        continue
+                    width, height = size
+                    if width and height > width and height % width == 0:
+                        self.animated += 1
+                    names[entry.name[:-len('.png')]] = size
+
+    def count(self):
+        return sum(len(names) for names in self.folders.values())
+
+
+def detect_models(index, modid):
+    """ (manifest rows, unused block texture names): a row per block and
+    item found, with its type and any texture slots that differ from the
+    model type's defaults. Crops without all their stages are among the
+    unused, noting which stages are missing.
+    """
+    blocks = set(index.folders['block'])
+    items = set(index.folders['item'])
+    claimed = set()
+    rows = {}
+
+    def texture(name):
+        return "{}:block/{}".format(modid, name)
+
+    def add(name, rowtype, textures=None, item_only=False, used=()):
+        rows[name] = { 'blockname' : name, 'type' : rowtype,
+                       'item_only' : item_only, 'textures' : textures or {} }
+        claimed.update(used)
+
+    # crops: every _stageN, whatever the block name. The crop models are
+    # always stage0..7, so a partial set would point at missing textures.
+    stages = {}
+    for name in blocks:
+        m = STAGE_RE.match(name)
+        if m:
+            stages.setdefault(m.group(1), {})[int(m.group(2))] = name
+    incomplete = []
+    for base, found in sorted(stages.items()):
+        if len(found) == CROP_STAGES:
+            add(base, 'crop', used=found.values())
+            continue
+        claimed.update(found.values())
+        missing = [str(n) for n in range(CROP_STAGES) if n not in found]
+        incomplete.append("{} (crop {} has no stage {})".format(
+                          ', '.join(found[n] for n in sorted(found)), base, ', '.join(missing)))
+
+    # fronts: machines and facing blocks.
+    for name in sorted(blocks - claimed):
+        if not name.endswith('_front'):
+            continue
+        base = name[:-len('_front')]
+        side = next(n for n in (base + '_side', base, name) if n in blocks)
+        top = base + '_top' if base + '_top' in blocks else side
+        textures = {}
+        if side != base + '_side':
+            textures['side'] = texture(side)
+        if top != base + '_top':
+            textures['top'] = texture(top)
+        used = (name, base + '_side', base + '_top', base + '_front_on', base)
+        if base + '_front_on' in blocks:
+            add(base, 'machine', textures, used=used)
+        else:
+            add(base, 'horizontal_facing', textures, used=used)
+
+    for name in sorted(blocks - claimed):
+        if name.endswith('_bottom'):
+            base = name[:-len('_bottom')]
+            if base + '_top' in blocks and (base.endswith('_door') or base in items):
+                add(base, 'door', used=(name, base + '_top'))
+        elif name.endswith('_bars'):
+            add(name, 'bars', used=(name,))
+        elif name.endswith('_pane_top'):
+            base = name[:-len('_top')]
+            add(base, 'pane', used=(name,))
+
+    # columns: a side texture and an end one.
+    for name in sorted(blocks - claimed):
+        for suffix in ('_top', '_end'):
+            if not name.endswith(suffix):
+                continue
+            base = name[:-len(suffix)]
+            if base not in blocks or base in claimed:
+                continue
+            textures = { 'end' : texture(name) } if suffix != '_top' else {}
+            rowtype = 'log' if base.endswith(LOG_SUFFIXES) else 'pillar'
+            add(base, rowtype, textures, used=(name, base))
+
+    unused = incomplete
+    for name in sorted(blocks - claimed):
+        if name.endswith(FACE_SUFFIXES):
+            unused.append(name)
+        else:
+            add(name, 'simple', used=(name,))
+
+    # items: bows, tools, armor, sprites; not door items or block items.
+    pulling = set()
+    for name in items:
+        m = PULLING_RE.match(name)
+        if m and m.group(1) in items:
+            pulling.add(name)
+            rows.setdefault(m.group(1), { 'blockname' : m.group(1), 'type' : 'bow',
+                                          'item_only' : True, 'textures' : {} })
+    for name in sorted(items - pulling):
+        if name in rows:
+            continue
+        if name.endswith(TOOL_SUFFIXES):
+            rowtype = 'tool'
+        elif name.endswith(ARMOR_SUFFIXES):
+            rowtype = 'armor'
+        else:
+            rowtype = 'inventory'
+        add(name, rowtype, item_only=True)
+    return [rows[name] for name in sorted(rows)], unused
@@ -0,0 +1,200 @@
+"""
+Incremental generation: remember what each generator invocation wrote, so
+running it again with nothing changed costs a few stat() calls, and tell
+make/ninja/Gradle which files it read and wrote.
+
+    build = incremental.Generation(args, base_dir, __file__, inputs=(args.manifest,))
+    if build.up_to_date():
+        return 0
+    ... generate, with writers from output.open_writer(args, ...) ...
+    return build.finish(status)
+
+A cache entry is kept per invocation - script, arguments (less --jobs,
+--force and the like, which don't change what is generated) and output
+directory, which is what gives the modid - in the mod_utils cache
+directory. It holds:
+
+    version - (mtime, size) of the script and of every mod_utils module,
+              templates included, when the files were generated
+    inputs  - (mtime, size) of the input files (manifests, batch files)
+    outputs - (mtime, size) of every file written
+
+and the invocation is up to date if all of those still match: editing a
+generated file, deleting it, touching a manifest or updating mod_utils all
+make the next run generate again. --force always generates. Reading a
+manifest from stdin can't be cached. With --zip the archive is the output,
+so any other run adding to the same archive makes the next one generate.
+
+--depfile FILE writes a Makefile-style dependency file (which ninja and
+Gradle's incremental tasks can read as well):
+
+    <outputs>: <script> <mod_utils modules> <inputs>
+
+It is written after a successful run or a cache hit, never after a failed
+run.
+"""
+
+import os
+import os.path
+import json
+
+from mod_utils import output
+
+CACHE_VERSION = 1
+# arguments that don't change what gets generated.
+IGNORED_ARGUMENTS = ('depfile', 'no_cache', 'force', 'jobs', 'quiet', 'generation')
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _stats(paths):
+    return { path : _stat(path) for path in paths }
+
+
+def source_files(script):
+    """ the script and the mod_utils modules it runs on. """
+    modules = sorted(os.path.join(PACKAGE_DIR, f) for f in os.listdir(PACKAGE_DIR)
+                     if f.endswith('.py'))
+    return [os.path.abspath(script)] + modules
+
+
+def _escape(path):
+    """ a path as a make target/prerequisite """
+    return path.replace('$', '$$').replace('#', '\\#').replace(' ', '\\ ')
+
+
+def write_depfile(depfile, outputs, inputs):
+    text = "{}: \\\n".format(' \\\n'.join(_escape(p) for p in outputs))
+    text += ' \\\n'.join("  " + _escape(p) for p in inputs) + '\n'
+    try:
+        with open(depfile, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return
+    except OSError:
+        pass
+    directory = os.path.dirname(os.path.abspath(depfile))
+    os.makedirs(directory, exist_ok=True)
+    with open(depfile, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+class _Recorder(object):
+    """ passes writes through to a writer, noting the files written. """
+
+    def __init__(self, writer, outputs):
+        self.writer = writer
+        self.base_dir = writer.base_dir
+        self._outputs = outputs
+        archive = getattr(writer, 'archive', None)
+        if archive is not None:
+            outputs.add(os.path.abspath(archive))
+
+    def write(self, filename, text):
+        if getattr(self.writer, 'archive', None) is None:
+            self._outputs.add(os.path.normpath(os.path.join(self.base_dir, filename)))
+        return self.writer.write(filename, text)
+
+    def __getattr__(self, name):
+        # counts, errors, summary(), close()...
+        return getattr(self.writer, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.writer.close()
+
+
+class Generation(object):
+    """ one run of a generator script; see the module docstring. """
+
+    def __init__(self, args, base_dir, script, inputs=()):
+        self.args = args
+        self.depfile = getattr(args, 'depfile', None)
+        self.inputs = set()
+        self.add_inputs(p for p in inputs if p != '-')
+        self.sources = source_files(script)
+        self.outputs = set()
+        self.cacheable = not getattr(args, 'no_cache', False) and '-' not in inputs
+        values = { k : v for k, v in sorted(vars(args).items()) if k not in IGNORED_ARGUMENTS }
+        key = json.dumps([os.path.basename(script), os.path.abspath(base_dir), values],
+                         sort_keys=True, default=str)
+        self.cache_file = output.cache_file('generations', key)
+        # open_writer() hands its writers to track().
+        args.generation = self
+
+    def add_inputs(self, paths):
+        """ more files the outputs depend on (spec files named in a
+        manifest, say); None is ignored.
+        """
+        self.inputs.update(os.path.abspath(p) for p in paths if p is not None)
+
+    def track(self, writer):
+        return _Recorder(writer, self.outputs)
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('cache_version') != CACHE_VERSION:
+            return None
+        return entry
+
+    def up_to_date(self):
+        """ True (after saying so) if the last run with these arguments
+        generated files that are all still as it left them, and nothing it
+        depended on has changed since.
+        """
+        if not self.cacheable or getattr(self.args, 'force', False):
+            return False
+        entry = self._load()
+        if entry is None:
+            return False
+        # the inputs recorded include any found while generating.
+        inputs = entry['inputs']
+        if entry['version'] != _stats(self.sources) or _stats(inputs) != inputs:
+            return False
+        outputs = entry['outputs']
+        if not outputs or _stats(outputs) != outputs:
+            return False
+        if self.depfile:
+            write_depfile(self.depfile, sorted(outputs), self.sources + sorted(inputs))
+        print("Up to date: {} files unchanged since the last run".format(len(outputs)))
+        return True
+
+    def finish(self, status):
+        """ record a successful run (status 0) for next time and write the
+        depfile; returns status.
+        """
+        if status:
+            return status
+        outputs = sorted(self.outputs)
+        stats = _stats(outputs)
+        if any(st is None for st in stats.values()):
+            return status
+        inputs = sorted(self.inputs)
+        if self.depfile:
+            write_depfile(self.depfile, outputs, self.sources + inputs)
+        if not self.cacheable:
+            return status
+        entry = { 'cache_version' : CACHE_VERSION, 'version' : _stats(self.sources),
+                  'inputs' : _stats(inputs), 'outputs' : stats }
+        tmp = "{}.{}.tmp".format(self.cache_file, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(tmp, 'w') as f:
+                json.dump(entry, f, separators=(',', ':'))
+            os.replace(tmp, self.cache_file)
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return status
@@ -0,0 +1,83 @@
+"""
+Convert old (1.12) .lang files to JSON lang files, one line at a time.
+
+    with open(path, encoding='utf-8-sig') as f:
+        entries = lang.LangEntries(f, modid=None)
+        chunks = template.stream_json(None, entries)
+        ...
+        entries.collisions, entries.bad_lines
+
+Keys get the same camelCase => snake_case treatment fixCamelCaseResources.pl
+gave them: the name in '<prefix>.<name>.name' keys and in
+'itemGroup.<name>' keys. With a modid, keys are also renamed to the 1.13+
+scheme: tile.<name>.name => block.<modid>.<name>, item.<name>.name =>
+item.<modid>.<name>.
+
+Only the keys are remembered (to find the ones that end up the same after
+snake_casing; the first is kept), never the values, so memory doesn't
+grow with the size of the translations.
+"""
+
+import re
+
+_UPPER = re.compile(r'[A-Z]')
+
+
+def snake_case(name):
+    """ copperBlock => copper_block (each capital becomes _ + lowercase). """
+    return _UPPER.sub(lambda m: '_' + m.group(0).lower(), name)
+
+
+def convert_key(key, modid=None):
+    parts = key.split('.')
+    if parts[0] == 'itemGroup' and len(parts) == 2:
+        return 'itemGroup.' + snake_case(parts[1])
+    if len(parts) < 3 or parts[-1] != 'name':
+        return key
+    parts[-2] = snake_case(parts[-2])
+    if modid is None or parts[0] not in ('tile', 'item'):
+        return '.'.join(parts)
+    names = parts[1:-1]
+    if names[0] != modid:
+        names.insert(0, modid)
+    return '.'.join(['block' if parts[0] == 'tile' else 'item'] + names)
+
+
+class LangEntries(object):
+    """ iterates over (key, value) for the lines of a .lang file, converting
+    keys, skipping comments, blank lines and lines that were already seen
+    under the same converted key. Afterwards:
+        count      - entries yielded
+        collisions - [(converted key, first original key and line, this
+                      original key and line)]
+        bad_lines  - line numbers without a key=value
+    """
+
+    def __init__(self, f, modid=None):
+        self.f = f
+        self.modid = modid
+        self.count = 0
+        self.collisions = []
+        self.bad_lines = []
+
+    def __iter__(self):
+        # converted key => (original key, line number)
+        seen = {}
+        for lineno, line in enumerate(self.f, 1):
+            line = line.rstrip('\r\n')
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#') or stripped.startswith('//'):
+                continue
+            key, sep, value = line.partition('=')
+            key = key.strip()
+            if not sep or not key:
+                self.bad_lines.append(lineno)
+                continue
+            new = convert_key(key, self.modid)
+            first = seen.get(new)
+            if first is not None:
+                self.collisions.append((new, first, (key, lineno)))
+                continue
+            seen[new] = (key, lineno)
+            self.count += 1
+            yield new, value
@@ -0,0 +1,23 @@
+"""
+Standard "drop myself on harvest" block loot tables, as made by
+make_loot_drops.py.
+
+    text = loot.loot_table('foo', 'copper_block')
+"""
+
+from mod_utils.template import Template, Slot
+
+LOOT_TABLE_TEMPLATE = Template({ "type": "minecraft:block",
+        "pools" : [ { "name" : Slot('pool_name'), "rolls" : 1,
+            "entries" : [ { "type": "minecraft:item",
+                            "name" : Slot('name')
+                            } ],
+            "conditions" : [ { "condition" : "minecraft:survives_explosion"}]
+            } ]
+        }, sort_keys=True)
+
+
+def loot_table(modid, block_name):
+    """ the 'drop myself' loot table json text for block_name. """
+    return LOOT_TABLE_TEMPLATE.render(pool_name="{}:droppool".format(modid),
+                name="{}:{}".format(modid, block_name))
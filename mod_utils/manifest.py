@@ -0,0 +1,190 @@
+"""
+Read generation manifests for the batch modes of the generator scripts.
+
+A manifest is a list of rows, each row a dict of column => value. It may be
+written as:
+
+    JSON - a list of objects, or an object holding one such list
+           (e.g. { "blocks" : [ { "blockname" : "foo", "type" : "simple" } ] })
+    TOML - an array of tables (e.g. [[blocks]] blockname = "foo" ...)
+    CSV  - a header line naming the columns, then one row per line.
+           Blank lines and lines starting with '#' are ignored.
+
+A filename of '-' reads the manifest from stdin.
+"""
+
+import sys
+import os.path
+import io
+import csv
+import json
+
+FORMATS = ('json', 'toml', 'csv')
+
+
+def guess_format(filename, text):
+    """ guess manifest format from the file extension, or the content if
+    there is no useful extension (e.g. stdin).
+    """
+    ext = os.path.splitext(filename)[1].lower().lstrip('.')
+    if ext in FORMATS:
+        return ext
+    stripped = text.lstrip()
+    if stripped.startswith('[') and not stripped.startswith('[['):
+        return 'json'
+    if stripped.startswith('{'):
+        return 'json'
+    if stripped.startswith('[['):
+        return 'toml'
+    return 'csv'
+
+
+def _rows_from(data, key):
+    """ find the list of rows in a parsed JSON/TOML document. """
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        if key is not None and key in data:
+            return data[key]
+        lists = [v for v in data.values() if isinstance(v, list)]
+        if len(lists) == 1:
+            return lists[0]
+    raise ValueError("manifest must be a list of rows, or hold a single '{}' list".format(key))
+
+
+def _load_toml(text):
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ValueError("TOML manifests need python 3.11+ or the tomli package")
+    return tomllib.loads(text)
+
+
+def parse_manifest(text, fmt, key=None):
+    """ parse manifest text in the given format; returns a list of dicts. """
+    if fmt == 'json':
+        rows = _rows_from(json.loads(text), key)
+    elif fmt == 'toml':
+        rows = _rows_from(_load_toml(text), key)
+    elif fmt == 'csv':
+        lines = [ln for ln in io.StringIO(text)
+                 if ln.strip() and not ln.lstrip().startswith('#')]
+        rows = []
+        for row in csv.DictReader(lines, skipinitialspace=True):
+            rows.append({ k.strip() : (v.strip() if v is not None else v)
+                          for k, v in row.items() if k is not None })
+    else:
+        raise ValueError("unknown manifest format {}".format(fmt))
+    for row in rows:
+        if not isinstance(row, dict):
+            raise ValueError("manifest row is not a table/object: {!r}".format(row))
+    return rows
+
+
+def read_manifest(filename, fmt=None, key=None):
+    """ read a manifest file ('-' for stdin); returns a list of dicts. """
+    if filename == '-':
+        text = sys.stdin.read()
+    else:
+        with open(filename, 'r', encoding='utf-8') as f:
+            text = f.read()
+    if fmt is None:
+        fmt = guess_format(filename, text)
+    return parse_manifest(text, fmt, key)
+
+
+def read_document(filename, fmt=None):
+    """ read a whole JSON or TOML document (e.g. a property spec) rather than
+    a list of rows; '-' for stdin.
+    """
+    if filename == '-':
+        text = sys.stdin.read()
+    else:
+        with open(filename, 'r', encoding='utf-8') as f:
+            text = f.read()
+    if fmt is None:
+        ext = os.path.splitext(filename)[1].lower().lstrip('.')
+        if ext in ('json', 'toml'):
+            fmt = ext
+        else:
+            fmt = 'json' if text.lstrip().startswith('{') else 'toml'
+    if fmt == 'json':
+        return json.loads(text)
+    if fmt == 'toml':
+        return _load_toml(text)
+    raise ValueError("{} documents must be JSON or TOML".format(filename))
+
+
+def as_bool(value, default=False):
+    """ manifest flag value: JSON/TOML booleans, or CSV text like 'yes'/'1'. """
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    return str(value).strip().lower() in ('1', 'y', 'yes', 'true', 'on')
+
+
+def as_list(value):
+    """ manifest list value: JSON/TOML lists, or ';'-separated CSV text. """
+    if value is None or value == '':
+        return []
+    if isinstance(value, list):
+        return value
+    return [v.strip() for v in str(value).split(';') if v.strip()]
+
+
+def as_table(value):
+    """ manifest table value: JSON/TOML tables, or ';'-separated 'key=value'
+    CSV text.
+    """
+    if value is None or value == '':
+        return {}
+    if isinstance(value, dict):
+        return value
+    table = {}
+    for item in as_list(value):
+        k, sep, v = item.partition('=')
+        if not sep:
+            raise ValueError("expected key=value, not {!r}".format(item))
+        table[k.strip()] = v.strip()
+    return table
+
+
+def write_csv(rows, columns, f):
+    """ write rows (dicts) to file f as a CSV manifest; tables are written
+    as 'key=value;...' text, as as_table() reads them.
+    """
+    writer = csv.writer(f, lineterminator='\n')
+    writer.writerow(columns)
+    for row in rows:
+        values = []
+        for c in columns:
+            v = row.get(c)
+            if isinstance(v, dict):
+                v = ';'.join("{}={}".format(k, x) for k, x in v.items())
+            elif isinstance(v, bool):
+                v = 'yes' if v else ''
+            values.append('' if v is None else v)
+        writer.writerow(values)
+
+
+def with_defaults(row, defaults):
+    """ a copy of defaults, overridden by the row's non-empty values. Values
+    are converted to the type of the default (bool flags via as_bool).
+    """
+    merged = dict(defaults)
+    for k, v in row.items():
+        if v is None or v == '':
+            continue
+        default = defaults.get(k)
+        if isinstance(default, bool):
+            v = as_bool(v, default)
+        elif isinstance(default, str):
+            v = str(v).strip()
+        merged[k] = v
+    return merged
@@ -0,0 +1,203 @@
+"""
+Tree-wide camelCase => snake_case ID migration: rename the files under
+assets/ and data/ whose names have capitals in them (as
+fixCamelCaseFiles.pl does for one directory), and rewrite every reference
+to those names in the tree's JSON files.
+
+    plan = migrate.rename_plan(resources_dir)
+    matcher = migrate.Matcher(plan.names)
+    text, count = migrate.rewrite_json(text, matcher)
+
+The names are matched with one Aho-Corasick automaton over all the old
+names, so each JSON string is read once however many names are being
+migrated; strings without a capital in them can't hold an old name and are
+skipped without running it. A name only matches as a whole identifier
+('fooBar' in "mod:block/fooBar" or "block.mod.fooBar", not in
+"fooBarTop"), and only inside JSON strings (keys and values), never in
+the rest of the file, which is left exactly as it was. In lang files only
+the keys are rewritten: their values are translated text, not IDs.
+
+A name whose new form is already used by another file (fooBar.png with
+foo_bar.json somewhere else, say) is a collision: it isn't migrated at
+all, since after renaming the two could no longer be told apart in lang
+keys and the like.
+"""
+
+import os
+import os.path
+import re
+
+from mod_utils.lang import snake_case
+
+# folders under assets/ and data/ that get no renames: .lang/.json locale
+# names aren't IDs.
+SKIP_FOLDERS = ('lang',)
+NAME_RE = re.compile(r'^\w+$')
+CAPITAL_RE = re.compile(r'[A-Z]')
+# a JSON string literal, quotes included.
+STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+# what follows a string that is an object key.
+KEY_END_RE = re.compile(r'\s*:')
+
+
+def _is_ident(c):
+    return c.isalnum() or c == '_'
+
+
+class Matcher(object):
+    """ Aho-Corasick automaton over a { old : new } mapping; replace()
+    swaps every whole-identifier occurrence of an old string, taking the
+    longest where several start at the same place.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+        # state => { char : state }; state 0 is the root.
+        self.goto = [{}]
+        self.fail = [0]
+        # state => lengths of the patterns ending there (own and via fail).
+        self.out = [()]
+        for word in mapping:
+            state = 0
+            for c in word:
+                nxt = self.goto[state].get(c)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][c] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] = (len(word),)
+        # failure links, breadth first.
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for c, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(c, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text):
+        """ [(start, end)] of the whole-identifier matches in text, left to
+        right, not overlapping.
+        """
+        found = []
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, c in enumerate(text):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            for length in out[state]:
+                start = i + 1 - length
+                if start > 0 and _is_ident(text[start - 1]):
+                    continue
+                if i + 1 < len(text) and _is_ident(text[i + 1]):
+                    continue
+                found.append((start, i + 1))
+        # the longest match at each place, then skip anything overlapping it.
+        found.sort(key=lambda m: (m[0], -m[1]))
+        matches = []
+        end = 0
+        for m in found:
+            if m[0] >= end:
+                matches.append(m)
+                end = m[1]
+        return matches
+
+    def replace(self, text):
+        """ (new text, number of replacements). """
+        matches = self.find(text)
+        if not matches:
+            return text, 0
+        parts = []
+        pos = 0
+        for start, end in matches:
+            parts.append(text[pos:start])
+            parts.append(self.mapping[text[start:end]])
+            pos = end
+        parts.append(text[pos:])
+        return ''.join(parts), len(matches)
+
+
+def is_lang_file(path):
+    """ whether path is a locale file, in a lang/ folder. """
+    return os.path.basename(os.path.dirname(os.path.abspath(path))) in SKIP_FOLDERS
+
+
+def rewrite_json(text, matcher, keys_only=False):
+    """ (text with old names in its strings replaced, replacements); with
+    keys_only, only in object keys (for lang files).
+    """
+    count = 0
+
+    def sub(m):
+        nonlocal count
+        s = m.group(0)
+        if not CAPITAL_RE.search(s):
+            return s
+        if keys_only and not KEY_END_RE.match(text, m.end()):
+            return s
+        s, n = matcher.replace(s)
+        count += n
+        return s
+    if not CAPITAL_RE.search(text):
+        return text, 0
+    text = STRING_RE.sub(sub, text)
+    return text, count
+
+
+class RenamePlan(object):
+    """ what migrating a resource tree does:
+        renames    - [(directory, old filename, new filename)]
+        names      - { old name : new name } for references
+        collisions - [(old name, new name, [paths of the old name])]
+    """
+
+    def __init__(self):
+        self.renames = []
+        self.names = {}
+        self.collisions = []
+
+
+def rename_plan(resources_dir, roots=('assets', 'data')):
+    """ the RenamePlan for resources_dir: every file under assets/ and
+    data/ (but not lang/) named with capitals, e.g. fooBar.png.mcmeta =>
+    foo_bar.png.mcmeta.
+    """
+    # name => [(directory, filename)]
+    candidates = {}
+    existing = set()
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(resources_dir, root)):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_FOLDERS)
+            for filename in sorted(filenames):
+                if filename.startswith('.'):
+                    continue
+                name = filename.split('.', 1)[0]
+                existing.add(name)
+                if CAPITAL_RE.search(name) and NAME_RE.match(name):
+                    candidates.setdefault(name, []).append((dirpath, filename))
+
+    plan = RenamePlan()
+    for name in sorted(candidates):
+        new = snake_case(name)
+        files = candidates[name]
+        if new in existing:
+            plan.collisions.append((name, new, [os.path.join(d, f) for d, f in files]))
+            continue
+        plan.names[name] = new
+        plan.renames.extend((d, f, new + f[len(name):]) for d, f in files)
+    return plan
+
+
+def json_files(resources_dir, roots=('assets', 'data')):
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(resources_dir, root)):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith('.json'):
+                    yield os.path.join(dirpath, filename)
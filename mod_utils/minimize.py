@@ -0,0 +1,254 @@
+"""
+Blockstate minimizer: work out which properties a variants map really
+depends on, and rewrite it in the smallest equivalent form.
+
+    tree, info = minimize.optimize(json.load(f))
+
+Candidate forms, besides the original:
+
+    wildcard  - variants keyed only by the properties that change the
+                model/rotation; a key that leaves a property out matches
+                all its values.
+    multipart - one part per distinct model/rotation, its 'when' covering
+                the states that use it ('a|b' values, and 'OR' lists where
+                one condition won't do); exactly one part applies to
+                each state.
+
+Each is checked state by state against the original before it's used.
+Only complete variants maps (every combination of the property values
+that appear in the keys) are rewritten.
+"""
+
+import json
+
+from mod_utils import template
+
+
+def parse_key(key):
+    """ 'facing=east,half=top' => {'facing': 'east', 'half': 'top'}; None if
+    key isn't a property list ('' is no properties).
+    """
+    state = {}
+    if key == '':
+        return state
+    for item in key.split(','):
+        name, sep, value = item.partition('=')
+        if not sep or not name:
+            return None
+        state[name] = value
+    return state
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+
+def variant_table(variants):
+    """ (properties, table, values) for a variants map: properties is
+    [(name, [values])] in key order, table maps each state (a tuple of
+    values in that order) to a canonical value, and values maps canonical
+    values back to the originals. None if the map isn't complete.
+    """
+    states = []
+    names = []
+    domains = {}
+    for key, value in variants.items():
+        state = parse_key(key)
+        if state is None:
+            return None
+        for name, v in state.items():
+            if name not in domains:
+                names.append(name)
+                domains[name] = []
+            if v not in domains[name]:
+                domains[name].append(v)
+        states.append((state, value))
+    properties = [(name, domains[name]) for name in names]
+    table = {}
+    values = {}
+    for state, value in states:
+        if len(state) != len(names):
+            return None
+        canon = _canonical(value)
+        values.setdefault(canon, value)
+        table[tuple(state[name] for name in names)] = canon
+    size = 1
+    for name, domain in properties:
+        size *= len(domain)
+    if len(table) != size:
+        return None
+    return properties, table, values
+
+
+def relevant_properties(properties, table):
+    """ indices of the properties the value depends on; a property is
+    dropped when every group of states differing only in it (and the
+    properties dropped already) shares one value.
+    """
+    keep = list(range(len(properties)))
+    for i in range(len(properties)):
+        trial = [k for k in keep if k != i]
+        seen = {}
+        ok = True
+        for state, value in table.items():
+            sub = tuple(state[k] for k in trial)
+            if seen.setdefault(sub, value) != value:
+                ok = False
+                break
+        if ok:
+            keep = trial
+    return keep
+
+
+def wildcard_variants(properties, table, values, keep):
+    variants = {}
+    for state, value in table.items():
+        key = ','.join("{}={}".format(properties[k][0], state[k]) for k in keep)
+        if key not in variants:
+            variants[key] = values[value]
+    return { "variants" : variants }
+
+
+def _cubes(points, dims):
+    """ cover points (tuples) with disjoint products of value sets, merging
+    along one dimension at a time.
+    """
+    cubes = [ tuple(frozenset((v,)) for v in p) for p in points ]
+    for d in range(dims):
+        merged = {}
+        order = []
+        for cube in cubes:
+            rest = cube[:d] + cube[d + 1:]
+            if rest not in merged:
+                merged[rest] = set()
+                order.append(rest)
+            merged[rest] |= cube[d]
+        cubes = [ rest[:d] + (frozenset(merged[rest]),) + rest[d:] for rest in order ]
+    return cubes
+
+
+def multipart(properties, table, values, keep):
+    groups = {}
+    for state, value in table.items():
+        groups.setdefault(value, []).append(tuple(state[k] for k in keep))
+    parts = []
+    for value, points in groups.items():
+        conditions = []
+        for cube in _cubes(points, len(keep)):
+            when = {}
+            for k, vals in zip(keep, cube):
+                name, domain = properties[k]
+                if len(vals) < len(domain):
+                    when[name] = '|'.join(v for v in domain if v in vals)
+            conditions.append(when)
+        part = {}
+        if len(conditions) > 1:
+            part["when"] = { "OR" : conditions }
+        elif conditions[0]:
+            part["when"] = conditions[0]
+        part["apply"] = values[value]
+        parts.append(part)
+    return { "multipart" : parts }
+
+
+def _matches(when, state):
+    if 'OR' in when:
+        return any(_matches(w, state) for w in when['OR'])
+    return all(state.get(name) in str(v).split('|') for name, v in when.items())
+
+
+def _mentioned(tree):
+    """ the property names a blockstate's keys or conditions use. """
+    names = set()
+    if 'variants' in tree:
+        for key in tree['variants']:
+            names.update(parse_key(key) or ())
+        return names
+
+    def walk(when):
+        for name, v in when.items():
+            if name == 'OR':
+                for w in v:
+                    walk(w)
+            else:
+                names.add(name)
+    for part in tree['multipart']:
+        walk(part.get('when', {}))
+    return names
+
+
+def equivalent(properties, table, tree):
+    """ whether tree gives every state in table the same model/rotation.
+    Checked over the combinations of the properties tree mentions, which
+    must each have a single value in table.
+    """
+    names = [name for name, domain in properties]
+    mentioned = _mentioned(tree)
+    if not mentioned <= set(names):
+        return False
+    idx = [i for i, name in enumerate(names) if name in mentioned]
+    expected = {}
+    for state, value in table.items():
+        sub = tuple(state[i] for i in idx)
+        if expected.setdefault(sub, value) != value:
+            return False
+    sub_names = [names[i] for i in idx]
+    if 'variants' in tree:
+        # variants keyed by their property names, then values.
+        keyed = {}
+        for key, v in tree['variants'].items():
+            state = parse_key(key)
+            pnames = tuple(sorted(state))
+            keyed.setdefault(pnames, {})[tuple(state[n] for n in pnames)] = _canonical(v)
+        for sub, value in expected.items():
+            d = dict(zip(sub_names, sub))
+            found = []
+            for pnames, entries in keyed.items():
+                v = entries.get(tuple(d[n] for n in pnames))
+                if v is not None:
+                    found.append(v)
+            if found != [value]:
+                return False
+        return True
+    parts = [ (p.get('when', {}), _canonical(p['apply'])) for p in tree['multipart'] ]
+    for sub, value in expected.items():
+        d = dict(zip(sub_names, sub))
+        found = [v for when, v in parts if _matches(when, d)]
+        if found != [value]:
+            return False
+    return True
+
+
+def optimize(tree, size=None):
+    """ the smallest equivalent form of a blockstate in the active output
+    profile: (new tree, or None to leave it as it is; info dict with
+    'form', 'entries', 'new_entries', 'size', 'new_size'). size is the
+    current size, if known (e.g. of the file); otherwise tree is rendered
+    to find it.
+    """
+    info = { 'form' : None, 'entries' : 0, 'new_entries' : 0, 'size' : 0, 'new_size' : 0 }
+    if not isinstance(tree, dict) or not isinstance(tree.get('variants'), dict) \
+            or len(tree) != 1:
+        return None, info
+    info['entries'] = info['new_entries'] = len(tree['variants'])
+    if size is None:
+        size = len(template.dumps(tree).encode('utf-8'))
+    info['size'] = info['new_size'] = size
+    found = variant_table(tree['variants'])
+    if found is None:
+        return None, info
+    properties, table, values = found
+    keep = relevant_properties(properties, table)
+    best = None
+    for form, build in (('wildcard', wildcard_variants), ('multipart', multipart)):
+        if form == 'multipart' and best is not None and len(values) == info['new_entries']:
+            # a part per model/rotation, plus conditions: no smaller.
+            break
+        candidate = build(properties, table, values, keep)
+        size = len(template.dumps(candidate).encode('utf-8'))
+        if size < info['new_size'] and equivalent(properties, table, candidate):
+            best = candidate
+            info['form'] = form
+            info['new_size'] = size
+            info['new_entries'] = len(candidate.get('variants') or candidate.get('multipart'))
+    return best, info
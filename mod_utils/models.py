@@ -0,0 +1,255 @@
+"""
+Block and item models for the standard model types, as used by
+gen_model_jsons.py.
+
+    for name, text in models.block_models('foo', 'copper_slab', 'slab'): ...
+    text = models.item_model('foo', 'copper_slab', 'slab')
+
+Each model type is a ModelType in MODEL_REGISTRY, declaring its block
+models and item models as (model name, template, texture slots); adding a
+type is a registry entry, not more code. The model names match the ones
+the blockstates from gen_blockstate_jsons.py refer to.
+"""
+
+from mod_utils.template import Template, Slot
+
+# TEMPLATES
+# items
+ITEM_BLOCK = Template({ "parent" : Slot('parent') })
+ITEM_GENERATED = Template({ "parent": "minecraft:item/generated", "textures": {"layer0": Slot('texture') } })
+ITEM_HANDHELD = Template({ "parent": "minecraft:item/handheld", "textures": { "layer0": Slot('texture') } })
+ITEM_BOW = Template({
+    "parent": "minecraft:item/bow",
+    "textures": { "layer0": Slot('texture') },
+    "overrides": [
+        { "predicate": { "pulling": 1 }, "model": Slot('pulling_0') },
+        { "predicate": { "pulling": 1, "pull": 0.65 }, "model": Slot('pulling_1') },
+        { "predicate": { "pulling": 1, "pull": 0.9 }, "model": Slot('pulling_2') }
+    ]
+})
+ITEM_BOW_PULLING = Template({ "parent": Slot('parent'), "textures": { "layer0": Slot('texture') } })
+# blocks
+BLOCK_BLOCK = Template({ "parent" : "block/cube_all", "textures" : { "all" : Slot('texture') }})
+BLOCK_PLATE = Template({
+    "parent" : "minecraft:block/pressure_plate_up",
+    "textures" : { "texture" : Slot('texture') }
+})
+BLOCK_PLATE_DOWN = Template({
+    "parent" : "minecraft:block/pressure_plate_down",
+    "textures" : { "texture" : Slot('texture') }
+    })
+BLOCK_SLAB = Template({
+    "parent": "minecraft:block/slab",
+    "textures": { "bottom": Slot('texture'), "top": Slot('texture'), "side": Slot('texture') }
+})
+BLOCK_SLAB_TOP = Template({
+    "parent": "minecraft:block/slab_top",
+    "textures": { "bottom": Slot('texture'), "top": Slot('texture'), "side": Slot('texture') }
+})
+BLOCK_CROP = Template({ "parent": "minecraft:block/crop", "textures": { "crop": Slot('texture') } })
+BLOCK_ORIENTABLE = Template({
+    "parent": "minecraft:block/orientable",
+    "textures": { "top": Slot('top'), "front": Slot('front'), "side": Slot('side') }
+})
+BLOCK_COLUMN = Template({
+    "parent": "minecraft:block/cube_column",
+    "textures": { "end": Slot('end'), "side": Slot('side') }
+})
+BLOCK_COLUMN_HORIZONTAL = Template({
+    "parent": "minecraft:block/cube_column_horizontal",
+    "textures": { "end": Slot('end'), "side": Slot('side') }
+})
+
+
+def _parented(parent, *textures):
+    """ a block model template: parent, and each texture set to one slot. """
+    return Template({ "parent" : parent,
+                      "textures" : { name : Slot('texture') for name in textures } })
+
+
+# parts of stairs, iron bars, glass panes and doors.
+BLOCK_STAIRS = { part : _parented("minecraft:block/" + part, 'bottom', 'top', 'side')
+                 for part in ('stairs', 'inner_stairs', 'outer_stairs') }
+BLOCK_BARS = { part : _parented("minecraft:block/iron_bars_" + part, 'particle', 'bars', 'edge')
+               for part in ('post_ends', 'post', 'cap', 'cap_alt', 'side', 'side_alt') }
+BLOCK_PANE = { part : Template({ "parent" : "minecraft:block/template_glass_pane_" + part,
+                                 "textures" : { "pane" : Slot('pane'), "edge" : Slot('edge') }
+                                 if 'noside' not in part else { "pane" : Slot('pane') } })
+               for part in ('post', 'side', 'side_alt', 'noside', 'noside_alt') }
+BLOCK_DOOR = Template({
+    "parent": Slot('parent'),
+    "textures": { "bottom": Slot('bottom'), "top": Slot('top') }
+})
+
+
+class ModelType(object):
+    """ how to make the models of one model type. blocks and items are
+    lists of (model name, template, slots); model names and slot values are
+    format strings, given
+        {modid}
+        {name}    - the model name asked for
+        {base}    - name less the type's suffix (e.g. copper for copper_slab)
+        {texture} - base, made plural if it ends in 'brick' and the type
+                    uses 'bricks' textures (copper_brick_slab uses
+                    copper_bricks).
+    A textures dict given when rendering overrides slots by name.
+    """
+
+    def __init__(self, blocks=(), items=(), suffix=None, bricks=False):
+        self.blocks = tuple(blocks)
+        self.items = tuple(items)
+        self.suffix = suffix
+        self.bricks = bricks
+
+    def names(self, modid, name):
+        base = name
+        if self.suffix and base.endswith(self.suffix):
+            base = base[:-len(self.suffix)]
+        texture = base
+        if self.bricks and texture.endswith('brick'):
+            texture += 's'
+        return { 'modid' : modid, 'name' : name, 'base' : base, 'texture' : texture }
+
+    @staticmethod
+    def _render(models, names, textures=None):
+        textures = textures or {}
+        return [ (model.format(**names),
+                  template.render(**{ slot : textures.get(slot) or value.format(**names)
+                                      for slot, value in slots.items() }))
+                 for model, template, slots in models ]
+
+    def block_models(self, modid, name, textures=None):
+        return self._render(self.blocks, self.names(modid, name), textures)
+
+    def item_models(self, modid, name, textures=None):
+        return self._render(self.items, self.names(modid, name), textures)
+
+    def slots(self):
+        """ the names of the slots the models have, for texture overrides. """
+        names = []
+        for model, template, slots in self.blocks + self.items:
+            names.extend(s for s in slots if s not in names)
+        return names
+
+
+BLOCK_TEXTURE = "{modid}:block/{name}"
+ITEM_TEXTURE = "{modid}:item/{name}"
+# item models: the block model as parent, or an inventory sprite.
+BLOCK_ITEM = [ ("{name}", ITEM_BLOCK, { 'parent' : BLOCK_TEXTURE }) ]
+GENERATED_ITEM = [ ("{name}", ITEM_GENERATED, { 'texture' : ITEM_TEXTURE }) ]
+# crops grow through age=0..7.
+CROP_STAGES = 8
+
+
+def _orientable(model, front):
+    return (model, BLOCK_ORIENTABLE, { 'front' : "{modid}:block/" + front,
+                                       'side' : "{modid}:block/{name}_side",
+                                       'top' : "{modid}:block/{name}_top" })
+
+
+def _door(model, parent):
+    return (model, BLOCK_DOOR, { 'parent' : "minecraft:block/" + parent,
+                                 'bottom' : "{modid}:block/{name}_bottom",
+                                 'top' : "{modid}:block/{name}_top" })
+
+
+# REGISTRY: model type => ModelType, in gen_model_jsons.py --type order.
+MODEL_REGISTRY = {
+    'block' : ModelType(
+        [ ("{name}", BLOCK_BLOCK, { 'texture' : BLOCK_TEXTURE }) ], BLOCK_ITEM),
+    'crop' : ModelType(
+        [ ("{{name}}_stage{}".format(n), BLOCK_CROP,
+           { 'texture' : "{{modid}}:block/{{name}}_stage{}".format(n) })
+          for n in range(CROP_STAGES) ]),
+    'facing' : ModelType([ _orientable("{name}", "{name}_front") ], BLOCK_ITEM),
+    'bars' : ModelType(
+        [ ("{{name}}_{}".format(part), BLOCK_BARS[part], { 'texture' : BLOCK_TEXTURE })
+          for part in BLOCK_BARS ],
+        [ ("{name}", ITEM_GENERATED, { 'texture' : BLOCK_TEXTURE }) ]),
+    'door' : ModelType(
+        [ _door("{name}_bottom", "door_bottom"), _door("{name}_bottom_hinge", "door_bottom_rh"),
+          _door("{name}_top", "door_top"), _door("{name}_top_hinge", "door_top_rh") ],
+        GENERATED_ITEM),
+    'pane' : ModelType(
+        [ ("{{name}}_{}".format(part), BLOCK_PANE[part],
+           { 'pane' : "{modid}:block/{base}", 'edge' : "{modid}:block/{name}_top" })
+          for part in BLOCK_PANE ],
+        [ ("{name}", ITEM_GENERATED, { 'texture' : "{modid}:block/{base}" }) ],
+        suffix='_pane'),
+    'stairs' : ModelType(
+        [ ("{{base}}_{}".format(part), BLOCK_STAIRS[part], { 'texture' : "{modid}:block/{texture}" })
+          for part in ('inner_stairs', 'outer_stairs', 'stairs') ],
+        [ ("{name}", ITEM_BLOCK, { 'parent' : "{modid}:block/{base}_stairs" }) ],
+        suffix='_stairs', bricks=True),
+    # the 'slab_top' model file, then the default 'slab' model.
+    'slab' : ModelType(
+        [ ("{name}_top", BLOCK_SLAB_TOP, { 'texture' : "{modid}:block/{texture}" }),
+          ("{name}", BLOCK_SLAB, { 'texture' : "{modid}:block/{texture}" }) ],
+        BLOCK_ITEM, suffix='_slab', bricks=True),
+    # the 'down' model file, then the 'up' model as default.
+    'pressure_plate' : ModelType(
+        [ ("{name}_down", BLOCK_PLATE_DOWN, { 'texture' : BLOCK_TEXTURE }),
+          ("{name}", BLOCK_PLATE, { 'texture' : BLOCK_TEXTURE }) ], BLOCK_ITEM),
+    'pillar' : ModelType(
+        [ ("{name}", BLOCK_COLUMN, { 'end' : "{modid}:block/{name}_top", 'side' : BLOCK_TEXTURE }) ],
+        BLOCK_ITEM),
+    'log' : ModelType(
+        [ ("{name}", BLOCK_COLUMN, { 'end' : "{modid}:block/{name}_top", 'side' : BLOCK_TEXTURE }),
+          ("{name}_horizontal", BLOCK_COLUMN_HORIZONTAL,
+           { 'end' : "{modid}:block/{name}_top", 'side' : BLOCK_TEXTURE }) ],
+        BLOCK_ITEM),
+    'machine' : ModelType(
+        [ _orientable("{name}", "{name}_front"), _orientable("{name}_on", "{name}_front_on") ],
+        BLOCK_ITEM),
+    # item model for a block whose block models are made some other way.
+    'blockitem' : ModelType((), BLOCK_ITEM),
+    'bow' : ModelType((), [ ("{name}", ITEM_BOW, {
+            'texture' : ITEM_TEXTURE,
+            'pulling_0' : "{modid}:item/{name}_pulling_0",
+            'pulling_1' : "{modid}:item/{name}_pulling_1",
+            'pulling_2' : "{modid}:item/{name}_pulling_2" }) ]
+        + [ ("{{name}}_pulling_{}".format(n), ITEM_BOW_PULLING,
+             { 'parent' : ITEM_TEXTURE, 'texture' : "{{modid}}:item/{{name}}_pulling_{}".format(n) })
+            for n in range(3) ]),
+    'armor' : ModelType((), GENERATED_ITEM),
+    'tool' : ModelType((), [ ("{name}", ITEM_HANDHELD, { 'texture' : ITEM_TEXTURE }) ]),
+    'inventory' : ModelType((), GENERATED_ITEM),
+}
+
+MODEL_TYPES = tuple(MODEL_REGISTRY)
+
+# blockstate type => model type, where they differ; 'other' blocks have
+# no standard models.
+MODEL_TYPE_FOR_BLOCKSTATE = { 'simple' : 'block', 'horizontal_facing' : 'facing' }
+
+
+def model_type(modeltype):
+    """ the ModelType for a model type, or raise NotImplementedError. """
+    try:
+        return MODEL_REGISTRY[modeltype]
+    except KeyError:
+        raise NotImplementedError("{} type not yet implemented, sorry.".format(modeltype))
+
+
+def block_models(modid, modelname, modeltype, textures=None):
+    """ construct the block models; returns a list of (model name, json
+    text), or raises NotImplementedError. textures overrides slot values
+    (e.g. { 'end' : 'foo:block/copper_pillar_end' }).
+    """
+    return model_type(modeltype).block_models(modid, modelname, textures)
+
+
+def item_models(modid, modelname, modeltype, textures=None):
+    """ construct the item models (a bow has its pulling models too);
+    returns a list of (model name, json text), or raises
+    NotImplementedError.
+    """
+    return model_type(modeltype).item_models(modid, modelname, textures)
+
+
+def item_model(modid, modelname, modeltype):
+    """ construct the item model json text, or raise NotImplementedError. """
+    items = item_models(modid, modelname, modeltype)
+    if not items:
+        raise NotImplementedError("{} blocks have no item model.".format(modeltype))
+    return items[0][1]
@@ -0,0 +1,358 @@
+"""
+Write generated files, skipping the ones whose content hasn't changed.
+
+Rewriting every output file on every run bumps mtimes on files that are
+really the same, and Gradle then redoes processResources and the jar. An
+OutputWriter instead compares the rendered bytes against what is on disk
+and leaves the file alone if nothing changed. A hash index (kept in the
+user's cache directory, not in the resources tree) remembers the
+(mtime, size, digest) of each file we wrote, so an unchanged file is
+usually detected from a stat() alone without reading it back.
+
+Each write is counted as
+    written   - new or changed content, file (re)written
+    skipped   - unchanged according to the hash index; not even read
+    unchanged - read back and found identical
+
+Missing subdirectories (fusion_furnace/, crushing/...) are created on the
+first write into them; concurrent writers racing to do so is fine.
+
+With --jobs N, writes go through a ParallelWriter instead: a bounded pool
+of N threads doing the open/write/close calls, which is what costs on
+network-mounted workspaces. Write errors are collected and reported at the
+end rather than stopping the run.
+"""
+
+import os
+import os.path
+import json
+import hashlib
+import filecmp
+import sys
+import threading
+import queue
+import argparse
+
+from mod_utils import template
+
+INDEX_VERSION = 1
+
+
+def cache_dir():
+    """ $MOD_UTILS_CACHE, else $XDG_CACHE_HOME/mod_utils, else ~/.cache/mod_utils """
+    path = os.environ.get('MOD_UTILS_CACHE')
+    if not path:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        path = os.path.join(base, 'mod_utils')
+    return path
+
+
+def cache_file(kind, key):
+    """ path of a cache file for kind (e.g. 'hashes') and key (e.g. a directory) """
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir(), kind, "{}.json".format(digest))
+
+
+class _ProfileAction(argparse.Action):
+    """ --profile takes effect as soon as it is parsed, since some scripts
+    render everything before opening their writer.
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        template.set_profile(values)
+        setattr(namespace, self.dest, values)
+
+
+def add_output_arguments(parser, generation=True):
+    """ add the output options shared by all the generator scripts; those
+    for incremental.Generation (--depfile, --no-cache) only if generation.
+    """
+    group = parser.add_argument_group("output options")
+    group.add_argument("--force", action="store_true",
+            help="rewrite output files even if their content is unchanged")
+    group.add_argument("--zip", metavar="ARCHIVE",
+            help="add output to this datapack/resource pack zip instead of writing files")
+    group.add_argument("--profile", choices=template.PROFILES, default='pretty',
+            action=_ProfileAction,
+            help="JSON output style: pretty (default), minified or canonical (sorted keys)")
+    group.add_argument("--jobs", "-j", type=int, metavar="N",
+            help="write files with a pool of N threads")
+    if not generation:
+        return group
+    group.add_argument("--depfile", metavar="FILE",
+            help="write a Makefile-style dependency file listing the files written and read")
+    group.add_argument("--no-cache", action="store_true",
+            help="generate even if the last run with the same arguments is still up to date")
+    return group
+
+
+def open_writer(args, base_dir):
+    """ the writer the output options in args ask for: an OutputWriter for
+    base_dir, or a ZipWriter adding base_dir's files to the --zip archive.
+    """
+    archive = getattr(args, 'zip', None)
+    if archive:
+        from mod_utils.archive import ZipWriter
+        writer = ZipWriter(archive, base_dir)
+    else:
+        writer = OutputWriter(base_dir, force=getattr(args, 'force', False))
+        jobs = getattr(args, 'jobs', None)
+        if jobs is not None and jobs > 1:
+            writer = ParallelWriter(writer, jobs)
+    # an incremental.Generation notes what is written.
+    generation = getattr(args, 'generation', None)
+    if generation is not None:
+        return generation.track(writer)
+    return writer
+
+
+def report_errors(out):
+    """ print the errors a writer collected to stderr; returns how many. """
+    errors = getattr(out, 'errors', ())
+    for filename, e in errors:
+        print("Error: cannot write {}: {}".format(filename, e), file=sys.stderr)
+    return len(errors)
+
+
+def digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class OutputWriter(object):
+    """ writes files under base_dir, skipping unchanged content. Safe to
+    share between threads.
+    """
+
+    def __init__(self, base_dir, force=False, use_index=True):
+        self.base_dir = os.path.abspath(base_dir)
+        self.force = force
+        self.counts = { 'written' : 0, 'skipped' : 0, 'unchanged' : 0 }
+        self.index_file = cache_file('hashes', self.base_dir) if use_index else None
+        self._index = None
+        self._updates = {}
+        self._lock = threading.Lock()
+
+    def _key(self, filename):
+        return os.path.relpath(os.path.join(self.base_dir, filename), self.base_dir)
+
+    @property
+    def index(self):
+        with self._lock:
+            if self._index is None:
+                self._index = self._load_index()
+            return self._index
+
+    def _load_index(self):
+        if self.index_file is None:
+            return {}
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != INDEX_VERSION:
+            return {}
+        return data.get('files', {})
+
+    def _remember(self, key, st, hexdigest):
+        entry = [st.st_mtime_ns, st.st_size, hexdigest]
+        index = self.index
+        with self._lock:
+            index[key] = entry
+            self._updates[key] = entry
+
+    def _status(self, path, key, size, hexdigest, same):
+        """ 'skipped' if the index knows path already holds content with this
+        digest, 'unchanged' if same() finds it does, else 'written'.
+        """
+        if self.force:
+            return 'written'
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 'written'
+        if st.st_size != size:
+            return 'written'
+        entry = self.index.get(key)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            return 'skipped' if entry[2] == hexdigest else 'written'
+        if same():
+            self._remember(key, st, hexdigest)
+            return 'unchanged'
+        return 'written'
+
+    def write(self, filename, text):
+        """ write text (str or bytes) to filename, relative to base_dir,
+        unless the file already holds exactly that. text may also be an
+        iterable of str/bytes chunks, which is streamed to disk rather than
+        held in memory. Returns 'written', 'skipped' or 'unchanged'.
+        """
+        if not isinstance(text, (str, bytes)):
+            return self._write_stream(filename, text)
+        data = text.encode('utf-8') if isinstance(text, str) else text
+        path = os.path.join(self.base_dir, filename)
+        key = self._key(filename)
+        hexdigest = digest(data)
+
+        def same():
+            with open(path, 'rb') as f:
+                return f.read() == data
+        status = self._status(path, key, len(data), hexdigest, same)
+        if status == 'written':
+            try:
+                f = open(path, 'wb')
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                f = open(path, 'wb')
+            with f:
+                f.write(data)
+            self._remember(key, os.stat(path), hexdigest)
+        with self._lock:
+            self.counts[status] += 1
+        return status
+
+    def _write_stream(self, filename, chunks):
+        """ write(), for an iterable of chunks: they go to a temporary file,
+        which replaces filename unless that already held the same content.
+        """
+        path = os.path.join(self.base_dir, filename)
+        key = self._key(filename)
+        tmp = "{}.{}.{}.tmp".format(path, os.getpid(), threading.get_ident())
+        try:
+            f = open(tmp, 'wb')
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = open(tmp, 'wb')
+        sha = hashlib.sha1()
+        size = 0
+        try:
+            with f:
+                for chunk in chunks:
+                    data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+                    sha.update(data)
+                    size += len(data)
+                    f.write(data)
+            hexdigest = sha.hexdigest()
+            status = self._status(path, key, size, hexdigest,
+                                  lambda: filecmp.cmp(tmp, path, shallow=False))
+            if status == 'written':
+                os.replace(tmp, path)
+                self._remember(key, os.stat(path), hexdigest)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        with self._lock:
+            self.counts[status] += 1
+        return status
+
+    def close(self):
+        """ save our index updates, merged into whatever is on disk now (other
+        processes may have written to the same directory meanwhile).
+        """
+        with self._lock:
+            updates = self._updates
+            self._updates = {}
+        if self.index_file is None or not updates:
+            return
+        index = self._load_index()
+        index.update(updates)
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        tmp = "{}.{}.{}.tmp".format(self.index_file, os.getpid(), threading.get_ident())
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({ 'version' : INDEX_VERSION, 'base' : self.base_dir,
+                            'files' : index }, f, separators=(',', ':'))
+            os.replace(tmp, self.index_file)
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def summary(self):
+        return "{written} written, {skipped} skipped, {unchanged} unchanged".format(**self.counts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParallelWriter(object):
+    """ hands writes to a pool of threads writing through another writer
+    (an OutputWriter). Each file always goes to the same worker, in the
+    order submitted, so a file written twice ends up with the last text.
+    At most backlog writes are queued at once; write() blocks beyond that.
+    """
+
+    def __init__(self, writer, jobs, backlog=None):
+        self.writer = writer
+        self.base_dir = writer.base_dir
+        self.jobs = jobs
+        self.errors = []
+        self._lock = threading.Lock()
+        # several threads may make the first write at once.
+        self._pool_lock = threading.Lock()
+        self._slots = threading.Semaphore(backlog or jobs * 32)
+        self._lanes = []
+        self._threads = []
+
+    def _start(self):
+        self._lanes = [ queue.Queue() for i in range(self.jobs) ]
+        self._threads = [ threading.Thread(target=self._work, args=(lane,), daemon=True)
+                          for lane in self._lanes ]
+        for t in self._threads:
+            t.start()
+
+    @property
+    def counts(self):
+        return self.writer.counts
+
+    def _work(self, lane):
+        while True:
+            item = lane.get()
+            if item is None:
+                return
+            filename, text = item
+            try:
+                self.writer.write(filename, text)
+            except Exception as e:
+                with self._lock:
+                    self.errors.append((filename, e))
+            finally:
+                self._slots.release()
+
+    def write(self, filename, text):
+        """ queue text to be written to filename; returns 'queued'. """
+        with self._pool_lock:
+            if not self._threads:
+                self._start()
+            lanes = self._lanes
+        self._slots.acquire()
+        key = os.path.normpath(os.path.join(self.base_dir, filename))
+        lanes[hash(key) % self.jobs].put((filename, text))
+        return 'queued'
+
+    def close(self):
+        """ wait for all queued writes, then close the underlying writer.
+        Writing again afterwards starts a new pool.
+        """
+        with self._pool_lock:
+            lanes, threads = self._lanes, self._threads
+            self._lanes, self._threads = [], []
+        for lane in lanes:
+            lane.put(None)
+        for t in threads:
+            t.join()
+        self.writer.close()
+
+    def summary(self):
+        text = self.writer.summary()
+        if self.errors:
+            text += ", {} errors".format(len(self.errors))
+        return text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
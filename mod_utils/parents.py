@@ -0,0 +1,115 @@
+"""
+Model parent-chain resolution: the textures a model ends up with once its
+parents' are merged in, and the texture variables its elements need, to
+find the ones left unresolved (a slab whose 'side' is never set renders
+as the missing texture).
+
+    resolver = ModelResolver(mod_models, vanilla, namespaces)
+    unresolved, chain = resolver.unresolved('foo:item/copper_slab')
+
+mod_models maps model ids to (parent, textures, face variables) entries as
+made by vanilla.model_entry(); minecraft models come from a VanillaModels
+(or are taken on trust without one), as do models in namespaces not in
+namespaces. Each model is resolved once, however many children it has.
+"""
+
+from mod_utils.vanilla import model_entry
+
+# builtin/generated makes item models out of layer0, layer1...
+BUILTINS = { 'builtin/generated' : (None, {}, ['layer0']) }
+UNKNOWN = object()
+
+
+class Resolved(object):
+    """ a model with its parents merged in: textures, face variables of the
+    elements it uses (None if none), the chain of model ids, and an error
+    (missing parent, cycle) if it couldn't be followed to the end.
+    """
+    __slots__ = ('textures', 'faces', 'chain', 'error', 'known')
+
+    def __init__(self, textures, faces, chain, error=None, known=True):
+        self.textures = textures
+        self.faces = faces
+        self.chain = chain
+        self.error = error
+        self.known = known
+
+
+def namespaced(ref):
+    if ref.startswith('builtin/') or ':' in ref:
+        return ref
+    return 'minecraft:' + ref
+
+
+class ModelResolver(object):
+
+    def __init__(self, mod_models, vanilla=None, namespaces=()):
+        self.mod_models = mod_models
+        self.vanilla = vanilla
+        self.namespaces = set(namespaces)
+        self._resolved = {}
+        self._active = set()
+
+    def entry(self, model_id):
+        """ (parent, textures, face variables); None if missing, UNKNOWN if
+        it can't be looked up.
+        """
+        if model_id in BUILTINS:
+            return BUILTINS[model_id]
+        if model_id.startswith('builtin/'):
+            return model_entry({})
+        if model_id in self.mod_models:
+            return self.mod_models[model_id]
+        ns, path = model_id.split(':', 1)
+        if ns == 'minecraft' and self.vanilla is not None:
+            return self.vanilla.get(path)
+        if ns in self.namespaces:
+            return None
+        return UNKNOWN
+
+    def resolve(self, model_id):
+        """ the Resolved model, memoized. """
+        done = self._resolved.get(model_id)
+        if done is not None:
+            return done
+        if model_id in self._active:
+            return Resolved({}, None, [model_id], error="parent cycle at {}".format(model_id))
+        entry = self.entry(model_id)
+        if entry is UNKNOWN:
+            result = Resolved({}, None, [model_id], known=False)
+        elif entry is None:
+            result = Resolved({}, None, [model_id], error="no model {}".format(model_id))
+        else:
+            parent, textures, faces = entry
+            if parent is None:
+                result = Resolved(dict(textures), faces, [model_id])
+            else:
+                self._active.add(model_id)
+                try:
+                    up = self.resolve(namespaced(parent))
+                finally:
+                    self._active.discard(model_id)
+                merged = dict(up.textures)
+                merged.update(textures)
+                result = Resolved(merged, faces if faces is not None else up.faces,
+                                  [model_id] + up.chain, up.error, up.known)
+        self._resolved[model_id] = result
+        return result
+
+    def unresolved(self, model_id):
+        """ (sorted texture variables the model's elements use that its
+        textures never set, the Resolved model).
+        """
+        model = self.resolve(model_id)
+        if model.faces is None or not model.known or model.error:
+            return [], model
+        missing = []
+        for name in model.faces:
+            seen = set()
+            value = model.textures.get(name)
+            while isinstance(value, str) and value.startswith('#') and value not in seen:
+                seen.add(value)
+                value = model.textures.get(value[1:])
+            if not isinstance(value, str) or value.startswith('#'):
+                missing.append(name)
+        return missing, model
@@ -0,0 +1,99 @@
+"""
+Run a set of generation stages as a dependency graph.
+
+Each Stage has a name, a function and the names of the stages it needs.
+run_stages() starts every stage as soon as the stages it depends on have
+finished, running independent stages concurrently in a thread pool. A
+stage function is called with a dict of its dependencies' results.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Stage(object):
+
+    def __init__(self, name, func, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+
+    def __repr__(self):
+        return "Stage({!r}, deps={!r})".format(self.name, self.deps)
+
+
+class StageError(Exception):
+    """ one or more stages failed; errors maps stage name => exception. """
+
+    def __init__(self, errors):
+        self.errors = errors
+        Exception.__init__(self, "; ".join("{}: {}".format(name, e)
+                                           for name, e in errors.items()))
+
+
+def check_graph(stages):
+    """ make sure every dependency exists and there are no cycles. """
+    by_name = { s.name : s for s in stages }
+    for s in stages:
+        for d in s.deps:
+            if d not in by_name:
+                raise ValueError("stage {} needs unknown stage {}".format(s.name, d))
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError("stage dependency cycle: {}".format(' -> '.join(path + [name])))
+        state[name] = 'visiting'
+        for d in by_name[name].deps:
+            visit(d, path + [name])
+        state[name] = 'done'
+
+    for s in stages:
+        visit(s.name, [])
+
+
+def run_stages(stages, jobs=None, report=None):
+    """ run stages in dependency order, independent ones concurrently.
+    report(name, seconds, result) is called as each stage finishes. Returns
+    { name : result }; raises StageError if any stage failed (stages that
+    depend on a failed stage are not run).
+    """
+    check_graph(stages)
+    results = {}
+    errors = {}
+    pending = list(stages)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for s in list(pending):
+                if any(d in errors for d in s.deps):
+                    pending.remove(s)
+                    errors[s.name] = StageError({ d : errors[d] for d in s.deps if d in errors })
+                elif all(d in results for d in s.deps):
+                    pending.remove(s)
+                    deps = { d : results[d] for d in s.deps }
+                    running[pool.submit(_timed, s.func, deps)] = s
+            if not running:
+                continue
+            done, not_done = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                s = running.pop(future)
+                try:
+                    seconds, result = future.result()
+                except Exception as e:
+                    errors[s.name] = e
+                    continue
+                results[s.name] = result
+                if report is not None:
+                    report(s.name, seconds, result)
+    if errors:
+        raise StageError(errors)
+    return results
+
+
+def _timed(func, deps):
+    start = time.perf_counter()
+    result = func(deps)
+    return time.perf_counter() - start, result
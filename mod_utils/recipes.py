@@ -0,0 +1,130 @@
+"""
+Crafting, cooking and fusion furnace recipes, as made by
+make_custom_recipes.py.
+
+    text = recipes.shaped_recipe(["SSS", " T ", " T "],
+                { "S" : "foo:copper_ingot", "T" : "forge:rods/wooden" },
+                "foo:copper_pickaxe")
+
+Ingredient ids containing a '/' are tags (forge:rods/wooden), others items.
+"""
+
+from mod_utils.template import Template, Slot, OMIT
+
+SHAPED_TEMPLATE = Template({ 
+    "type" : "minecraft:crafting_shaped",
+    "conditions" : Slot('conditions', optional=True), 
+    "pattern" : Slot('pattern'),
+    "key" : Slot('key'),
+    "result" : Slot('result')
+})
+
+SHAPELESS_TEMPLATE = Template({ 
+    "type" : "minecraft:crafting_shapeless",
+    "conditions" : Slot('conditions', optional=True), 
+    "ingredients" : [ Slot('ingredient') ],
+    "result" : Slot('result')
+})
+
+# also used for blasting, smoking and campfire_cooking.
+SMELTING_TEMPLATE = Template({
+    "type" : Slot('type'),
+    "conditions" : Slot('conditions', optional=True), 
+    "ingredient" : Slot('ingredient'),
+    "result" : Slot('result'),
+    "experience" : Slot('experience'),
+    "cookingtime": Slot('cookingtime')
+})
+
+# used for fusion_furnace alloy recipes.
+FUSION_TEMPLATE = Template({
+    "type" : "fusion:alloying",
+    "conditions" : Slot('conditions', optional=True),
+    "output" : Slot('output'),
+    "inputs" : [ { "item" : Slot('input0') }, {"item" : Slot('input1')} ],
+    "catalyst" : Slot('catalyst'),
+    "experience" : Slot('experience'),
+    "cookingtime" : 600
+})
+
+# smelting-type recipes: recipe type => (json type, cookingtime)
+COOKING_TYPES = {
+    'smelting' : ("minecraft:smelting", 200),
+    'smoking' : ("minecraft:smoking", 100),
+    'blasting' : ("minecraft:blasting", 100),
+    'campfire' : ("minecraft:campfire_cooking", 600)
+}
+
+
+def flag_conditions(modid, flag):
+    """ the usual '<modid>:flag' recipe condition. """
+    return [ { "type" : "{}:flag".format(modid), "flag" : flag } ]
+
+
+def ingredient(value):
+    """ an ingredient dict for an item or tag id (or an ingredient dict). """
+    if isinstance(value, dict):
+        return value
+    if "/" in value:
+        return { "tag" : value }
+    return { "item" : value }
+
+
+def result_item(result, count=1):
+    result_item = { "item" : result }
+    if count > 1:
+        result_item["count"] = count
+    return result_item
+
+
+def recipe_filename(result, recipe_type, filename=None):
+    """ default recipe filename: the result's name, with a suffix for
+    cooking recipes; fusion recipes go in fusion_furnace/.
+    """
+    if filename is None:
+        # clean up any ':'
+        filename = result.split(':')[-1]
+        if recipe_type in COOKING_TYPES:
+            filename = "{}_from_{}".format(filename, recipe_type)
+    if recipe_type == 'fusion':
+        return "./fusion_furnace/{}.json".format(filename)
+    return "{}.json".format(filename)
+
+
+def shaped_recipe(pattern, key, result, count=1, conditions=None):
+    """ pattern is a list of rows; key maps each pattern character to an
+    item/tag id.
+    """
+    return SHAPED_TEMPLATE.render(conditions=OMIT if conditions is None else conditions,
+                pattern=list(pattern),
+                key={ k : ingredient(v) for k, v in key.items() },
+                result=result_item(result, count))
+
+
+def shapeless_recipe(item, result, count=1, item_count=1, conditions=None):
+    """ item_count of item => count of result. """
+    ingredient = { "item" : item }
+    if item_count > 1:
+        ingredient["count"] = item_count
+    return SHAPELESS_TEMPLATE.render(conditions=OMIT if conditions is None else conditions,
+                ingredient=ingredient, result=result_item(result, count))
+
+
+def cooking_recipe(cooking_type, item, result, experience=None, conditions=None):
+    """ cooking_type is one of COOKING_TYPES (smelting, blasting...). """
+    (recipe_type, cookingtime) = COOKING_TYPES[cooking_type]
+    return SMELTING_TEMPLATE.render(type=recipe_type,
+                conditions=OMIT if conditions is None else conditions,
+                ingredient=ingredient(item), result=result,
+                experience=experience, cookingtime=cookingtime)
+
+
+def fusion_recipe(inputs, catalyst, result, count=1, experience=None, conditions=None):
+    """ fusion furnace alloying of the 2 inputs, with a catalyst. """
+    if catalyst == 'minecraft:coals':
+        catalyst = { "tag" : catalyst }
+    else:
+        catalyst = { "item" : catalyst }
+    return FUSION_TEMPLATE.render(conditions=OMIT if conditions is None else conditions,
+                output=result_item(result, count), input0=inputs[0], input1=inputs[1],
+                catalyst=catalyst, experience=experience)
@@ -0,0 +1,426 @@
+"""
+Replay shell scripts of generator calls in one process.
+
+    steps = replay.parse_script(path, cwd)
+    status = replay.run_steps(steps)
+
+A mod's scripts/ usually hold lines like
+
+    TESTDIR=./data/test/recipes
+    mkdir -p $TESTDIR
+    cd $TESTDIR
+    make_custom_recipes.py -t shapeless -i "foo:bar_block" -n 1 bar_ingot 9
+    python3 ~/mod_utils/gen_blockstate_jsons.py -t slab copper_slab
+
+parse_script() reads such a script into steps (a line may hold several
+commands separated by ';'), following the working directory through cd
+(and 'cd -') and expanding variables set in the
+script ($VAR, ${VAR}, and `pwd`/$(pwd)) or in the environment; quoting
+is as in sh. Generator calls - the scripts mod_utils_server.py serves,
+by name or path, optionally after python3 or mod_utils_client.py - become
+calls of the script's main() in this process, so each line costs what
+generating its files costs, not a python start-up and imports. mkdir
+(-p), echo, set -e and exit are done here too.
+
+Anything else (other commands, pipes, redirections, &&...) is a 'shell'
+step: an error by default, or with fallback=True passed to
+/bin/sh in the tracked directory with the script's variables exported.
+Compound commands - for/while/until loops, if, case, { } groups and
+function definitions - are never taken apart, since their bodies can't
+run as plain lines: parse_script() raises ReplayError for them, unless
+fallback=True, when the whole block, to its done/fi/esac/}, is one
+'shell' step. Shell steps get the script's arguments as $1, $2..., and
+the functions it has defined so far.
+Like sh, a failing call doesn't stop the script unless it did 'set -e'.
+"""
+
+import sys
+import os
+import os.path
+import io
+import re
+import shlex
+import subprocess
+import importlib
+import contextlib
+
+from mod_utils import daemon, template
+
+# tokens shlex gives for shell operators we don't follow.
+OPERATORS = set(';|&<>()') | { '&&', '||', ';;', '>>', '<<', '>&', '<&', '|&', '&>' }
+INTERPRETERS = ('python', 'python3')
+ASSIGNMENT_RE = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$')
+# compound commands, and the word that ends each.
+COMPOUND = { 'for' : 'done', 'while' : 'done', 'until' : 'done', 'if' : 'fi',
+             'case' : 'esac', '{' : '}', 'select' : 'done' }
+# words that only make sense inside one.
+COMPOUND_WORDS = { 'then', 'do', 'else', 'elif', 'done', 'fi', 'esac', '}' }
+FUNCTION_RE = re.compile(r'^(?:function\s+[A-Za-z_][\w-]*|[A-Za-z_][\w-]*\s*\(\s*\))')
+VARIABLE_RE = re.compile(r'\$(?:\{([A-Za-z_][A-Za-z0-9_]*|[0-9])\}|([A-Za-z_][A-Za-z0-9_]*|[0-9])|\(pwd\))|`pwd`')
+
+
+class ReplayError(Exception):
+    """ a script line that can't be replayed. """
+
+    def __init__(self, lineno, message):
+        Exception.__init__(self, "line {}: {}".format(lineno, message))
+        self.lineno = lineno
+
+
+class Step(object):
+    """ one thing to do: kind is 'call' (script, argv), 'mkdir' (argv are
+    directories; parents=True for -p), 'echo', 'set_e', 'exit' (argv[0] the
+    status) or 'shell' (text, run by /bin/sh with argv as $0, $1...,
+    after the script's functions). cwd is where it runs.
+    """
+
+    def __init__(self, lineno, kind, cwd, argv=(), script=None, text=None, env=None):
+        self.lineno = lineno
+        self.kind = kind
+        self.cwd = cwd
+        self.argv = list(argv)
+        self.script = script
+        self.text = text
+        self.env = env
+        self.parents = False
+        self.functions = []
+
+    def __repr__(self):
+        return "<Step {} {} {} {}>".format(self.lineno, self.kind, self.script or '', self.argv)
+
+
+def logical_lines(f):
+    """ (line number, line) with backslash-continued lines joined. """
+    start = None
+    parts = []
+    for lineno, line in enumerate(f, 1):
+        line = line.rstrip('\r\n')
+        if start is None:
+            start = lineno
+        if line.endswith('\\') and not line.endswith('\\\\'):
+            parts.append(line[:-1])
+            continue
+        parts.append(line)
+        yield start, ''.join(parts)
+        start = None
+        parts = []
+    if parts:
+        yield start, ''.join(parts)
+
+
+def expand(text, variables, cwd):
+    """ text with $VAR, ${VAR}, `pwd` and $(pwd) replaced, except inside
+    single quotes, and any # comment removed. Values are quoted so shlex
+    keeps each one a single word (unless the reference itself was inside
+    double quotes).
+    """
+    out = []
+    pos = 0
+    quote = None
+    while pos < len(text):
+        c = text[pos]
+        if c == '\\' and quote != "'":
+            out.append(text[pos:pos + 2])
+            pos += 2
+            continue
+        if c == '#' and quote is None and (pos == 0 or text[pos - 1].isspace()):
+            break
+        if c in '\'"':
+            if quote is None:
+                quote = c
+            elif quote == c:
+                quote = None
+        elif c in '$`' and quote != "'":
+            m = VARIABLE_RE.match(text, pos)
+            if m:
+                name = m.group(1) or m.group(2)
+                if name is None:
+                    value = cwd
+                else:
+                    value = variables.get(name, os.environ.get(name, ''))
+                out.append(value if quote == '"' else shlex.quote(value))
+                pos = m.end()
+                continue
+            if c == '`' or text.startswith('$(', pos):
+                raise ValueError("command substitution other than `pwd` isn't supported")
+        out.append(c)
+        pos += 1
+    return ''.join(out)
+
+
+def split_list(text):
+    """ text split at the ';'s between commands (not quoted ones). """
+    commands = []
+    start = 0
+    quote = None
+    pos = 0
+    while pos < len(text):
+        c = text[pos]
+        if c == '\\' and quote != "'":
+            pos += 2
+            continue
+        if c == '#' and quote is None and (pos == 0 or text[pos - 1].isspace()):
+            break
+        if c in '\'"':
+            if quote is None:
+                quote = c
+            elif quote == c:
+                quote = None
+        elif c == ';' and quote is None and not text.startswith(';;', pos):
+            commands.append(text[start:pos])
+            start = pos + 1
+        pos += 1
+    commands.append(text[start:])
+    return [command.strip() for command in commands if command.strip()]
+
+
+def compound_words(line):
+    """ (first words of line's commands that open a compound command or
+    belong to one, change in nesting depth, whether it ends with a function
+    header whose { is still to come).
+    """
+    found = []
+    depth = 0
+    header = False
+    for command in split_list(line):
+        words = command.split()
+        if FUNCTION_RE.match(command):
+            found.append('function')
+            opened = words.count('{')
+            depth += opened
+            header = not opened
+            continue
+        header = False
+        if words[0] in COMPOUND:
+            depth += 1
+        elif words[0] in COMPOUND.values():
+            depth -= 1
+        if words[0] in COMPOUND or words[0] in COMPOUND_WORDS:
+            found.append(words[0])
+    return found, depth, header
+
+
+def split_command(text):
+    """ the words of a command line; ValueError for bad quoting, None if it
+    uses shell operators.
+    """
+    lexer = shlex.shlex(text, posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    # expand() took the comments out; a '#' inside a word is just a '#'.
+    lexer.commenters = ''
+    words = list(lexer)
+    if any(w in OPERATORS for w in words):
+        return None
+    return words
+
+
+def generator_call(words):
+    """ (script name, argv) if words run a generator script, else None. """
+    words = list(words)
+    if words and os.path.basename(words[0]).startswith(INTERPRETERS):
+        words.pop(0)
+        if words and words[0].startswith('-'):
+            return None
+    if words and os.path.basename(words[0]) == 'mod_utils_client.py':
+        words.pop(0)
+    if not words:
+        return None
+    script = daemon.script_name(words[0]) if words[0].endswith('.py') else None
+    if script is None:
+        return None
+    return script, words[1:]
+
+
+def exported(variables):
+    """ the script's variables, less $0..$9, for a shell step's environment. """
+    return { k : v for k, v in variables.items() if not k.isdigit() }
+
+
+def shell_step(lineno, cwd, text, variables, functions):
+    """ a 'shell' step, with the script's arguments and functions. """
+    arguments = [variables[str(n)] for n in range(10) if str(n) in variables]
+    step = Step(lineno, 'shell', cwd, arguments, text=text, env=exported(variables))
+    step.functions = list(functions)
+    return step
+
+
+def parse_script(path, cwd=None, args=(), fallback=False):
+    """ the steps of the shell script at path, started in cwd (default:
+    the current directory) with args as $1, $2... Raises ReplayError for a
+    line that can't be understood at all (bad quoting, unsupported
+    substitutions), and for compound commands unless fallback is set.
+    """
+    cwd = os.path.abspath(cwd or os.getcwd())
+    previous = cwd
+    variables = { str(n) : arg for n, arg in enumerate([path] + list(args)) if n < 10 }
+    steps = []
+    functions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = list(logical_lines(f))
+    i = 0
+    while i < len(lines):
+        lineno, line = lines[i]
+        i += 1
+        found, depth, header = compound_words(line)
+        if found:
+            if found[0] in COMPOUND_WORDS:
+                raise ReplayError(lineno, "unexpected '{}'".format(found[0]))
+            block = [line]
+            while (depth > 0 or header) and i < len(lines):
+                _, change, header = compound_words(lines[i][1])
+                block.append(lines[i][1])
+                depth += change
+                i += 1
+            if depth > 0 or header:
+                raise ReplayError(lineno, "'{}' is never closed".format(found[0]))
+            if not fallback:
+                raise ReplayError(lineno, "'{}' blocks can't be replayed; use --fallback to "
+                                  "run them with /bin/sh".format(found[0]))
+            if found == ['function']:
+                # only defined: shell steps after this get it.
+                functions.append('\n'.join(block))
+                continue
+            steps.append(shell_step(lineno, cwd, '\n'.join(block), variables, functions))
+            continue
+        for stripped in split_list(line):
+            try:
+                words = split_command(expand(stripped, variables, cwd))
+            except ValueError as e:
+                raise ReplayError(lineno, e)
+            if words and words[0] == 'export' and len(words) > 1:
+                words = words[1:]
+            assignments = [ASSIGNMENT_RE.match(w) for w in words or ()]
+            if words and all(assignments):
+                variables.update(m.groups() for m in assignments)
+                continue
+
+            if words == []:
+                continue
+            if words is None:
+                steps.append(shell_step(lineno, cwd, stripped, variables, functions))
+                continue
+            command = words[0]
+            if command == 'cd':
+                target = words[1] if len(words) > 1 else os.path.expanduser('~')
+                if target == '-':
+                    target = previous
+                previous, cwd = cwd, os.path.normpath(os.path.join(cwd, os.path.expanduser(target)))
+                continue
+            if command == 'mkdir':
+                step = Step(lineno, 'mkdir', cwd, [w for w in words[1:] if not w.startswith('-')])
+                step.parents = '-p' in words[1:]
+                steps.append(step)
+                continue
+            if command == 'echo':
+                steps.append(Step(lineno, 'echo', cwd, words[1:]))
+                continue
+            if command == 'set':
+                if any(w.startswith('-') and 'e' in w for w in words[1:]):
+                    steps.append(Step(lineno, 'set_e', cwd))
+                continue
+            if command == 'exit':
+                steps.append(Step(lineno, 'exit', cwd, words[1:2] or ['0']))
+                continue
+            call = generator_call(words)
+            if call is not None:
+                steps.append(Step(lineno, 'call', cwd, call[1], script=call[0]))
+            else:
+                steps.append(shell_step(lineno, cwd, stripped, variables, functions))
+    return steps
+
+
+def _exit_status(e):
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def run_call(module, script, argv, cwd, quiet=False):
+    """ run a script's main() in cwd; returns its exit status. Unlike
+    daemon.run_script() this runs in our own process, so state main()
+    leaves behind (the JSON profile, the working directory) is put back.
+    """
+    profile = template.get_profile()
+    saved_argv = sys.argv
+    saved_cwd = os.getcwd()
+    sys.argv = [script] + list(argv)
+    sink = io.StringIO() if quiet else None
+    try:
+        os.chdir(cwd)
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            return main_status(module, argv)
+    except OSError as e:
+        print("Error: cannot cd to {}: {}".format(cwd, e), file=sys.stderr)
+        return 1
+    finally:
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+        template.set_profile(profile)
+
+
+def main_status(module, argv):
+    try:
+        return module.main(list(argv)) or 0
+    except SystemExit as e:
+        return _exit_status(e)
+    except Exception as e:
+        print("Error: {}: {}".format(type(e).__name__, e), file=sys.stderr)
+        return 1
+
+
+def run_steps(steps, fallback=False, quiet=False, report=None):
+    """ run the steps in order; returns the exit status the script would
+    have (the last step's, or the failing one's after set -e). report, if
+    given, is called as report(step, status) after each call or command.
+    """
+    modules = {}
+    errexit = False
+    status = 0
+    for step in steps:
+        if step.kind == 'set_e':
+            errexit = True
+            continue
+        if step.kind == 'exit':
+            try:
+                return int(step.argv[0])
+            except ValueError:
+                return 2
+        if step.kind == 'echo':
+            if not quiet:
+                print(' '.join(step.argv))
+            continue
+        if step.kind == 'mkdir':
+            status = 0
+            for d in step.argv:
+                try:
+                    path = os.path.join(step.cwd, d)
+                    if step.parents:
+                        os.makedirs(path, exist_ok=True)
+                    else:
+                        os.mkdir(path)
+                except OSError as e:
+                    print("mkdir: {}: {}".format(d, e), file=sys.stderr)
+                    status = 1
+        elif step.kind == 'call':
+            module = modules.get(step.script)
+            if module is None:
+                module = modules[step.script] = importlib.import_module(daemon.SCRIPTS[step.script])
+            status = run_call(module, step.script, step.argv, step.cwd, quiet)
+        elif fallback:
+            env = dict(os.environ)
+            env.update(step.env)
+            text = '\n'.join(step.functions + [step.text])
+            status = subprocess.run(['/bin/sh', '-c', text] + step.argv, cwd=step.cwd, env=env,
+                                    stdout=subprocess.DEVNULL if quiet else None).returncode
+        else:
+            print("Error: line {}: not a generator call: {}".format(step.lineno, step.text),
+                  file=sys.stderr)
+            status = 127
+        if report is not None:
+            report(step, status)
+        if status and errexit:
+            return status
+    return status
@@ -0,0 +1,82 @@
+"""
+Silent's Mechanisms crushing and alloy smelting recipes, as made by
+make_silents_recipes.py.
+
+Ingredients and results are given the way the script takes them: an id,
+'#'-prefixed for a tag, optionally followed by ',<count>' (or a ',<chance>'
+with a decimal point, for crusher secondary results).
+
+    text = silents.crushing_recipe('#forge:ores/copper',
+                ['foo:copper_chunk,2', 'foo:copper_dust,0.1'])
+"""
+
+from mod_utils.template import Template, Slot
+
+CRUSHING_TEMPLATE = Template({
+    "conditions" : [ { "modid" : "silents_mechanisms", 
+                       "type" : "forge:mod_loaded"}],
+    "type" : "silents_mechanisms:crushing",
+    "process_time" : Slot('process_time'),
+    "ingredient": Slot('ingredient'),
+    "results" : Slot('results')
+})
+
+ALLOY_TEMPLATE = Template({
+    "conditions" : [ { "modid" : "silents_mechanisms", 
+                       "type" : "forge:mod_loaded"}],
+    "type" : "silents_mechanisms:alloy_smelting",
+    "process_time" : Slot('process_time'),
+    "ingredients" : Slot('ingredients'),
+    "result": Slot('result')
+})
+
+
+def crushing_recipe(ingredient, results, process_time=300):
+    """ crusher recipe; only one ingredient, any number of results. """
+    if ingredient.startswith('#'):
+        ingredient = { "tag" : ingredient.lstrip('#') }
+    else:
+        ingredient = { "item" : ingredient }
+
+    # parse results list (all recognized)
+    result_list = []
+    for rr in results:
+        parts = rr.split(',')
+        if len(parts) > 1:
+            if '.' in parts[1]:
+                result = { "item" : parts[0], "chance" : float(parts[1]) }
+            else:
+                result = { "item" : parts[0], "count" : int(parts[1]) }
+
+        else:
+            result = { "item" : parts[0] }
+        result_list.append(result)
+
+    return CRUSHING_TEMPLATE.render(process_time=process_time,
+                ingredient=ingredient, results=result_list)
+
+
+def alloy_recipe(ingredients, result, process_time=300):
+    """ alloy smelter recipe; any number of ingredients, one result. """
+    ingredient_list = []
+    for ii in ingredients:
+        parts = ii.split(',')
+        if len(parts) > 1 and parts[0].startswith('#'):
+           ingredient = { "tag" : parts[0].lstrip('#'), "count" : int(parts[1]) }
+        elif len(parts) > 1:
+           ingredient = { "item" : parts[0], "count" : int(parts[1]) }
+        elif parts[0].startswith('#'):
+           ingredient = { "tag" : parts[0].lstrip('#') }
+        else:
+           ingredient = { "item" : parts[0] }
+        ingredient_list.append(ingredient)
+
+    # result
+    parts = result.split(',')
+    if len(parts) > 1:
+        result = { "item" : parts[0], "count" : int(parts[1]) }
+    else:
+        result = { "item" : parts[0], "count" : 1 }
+
+    return ALLOY_TEMPLATE.render(process_time=process_time,
+                ingredients=ingredient_list, result=result)
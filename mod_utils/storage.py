@@ -0,0 +1,152 @@
+"""
+Standard storage recipes for a material: block <=> item (ingot, gem...)
+<=> nugget, plus optional large and medium chunks. Used by
+make_storage_recipes.py and make_material.py.
+
+    for filename, text in storage.storage_recipes('foo', 'copper'): ...
+"""
+
+from mod_utils.template import Template, Slot, OMIT
+
+STORAGE = ('block', 'ingot', 'ingot_from_nuggets', 'nugget', 'large_chunk',
+           'nuggets_from_chunk', 'medium_chunk', 'medium_chunk2', 
+           'nuggets_from_medium')
+
+PATTERN_TEMPLATES = { 
+    'block' : ["SSS", "SSS", "SSS"],
+    'ingot' : "shapeless" ,
+    'ingot_from_nuggets' : ["###", "###", "###"],
+    'nugget' : "shapeless",
+    'large_chunk' : ["###","# #", "###"],
+    'nuggets_from_chunk' : "shapeless",
+    'medium_chunk' : ["##","##" ],
+    'medium_chunk2' : "shapeless",
+    'nuggets_from_medium' : "shapeless"
+}
+
+SHAPED_TEMPLATE = Template({ 
+    "type" : "minecraft:crafting_shaped",
+    "conditions" : Slot('conditions', optional=True), 
+    "pattern" : Slot('pattern'),
+    "key" : Slot('key'),
+    "result" : Slot('result')
+}, sort_keys=True)
+
+SHAPELESS_TEMPLATE = Template({ 
+    "type" : "minecraft:crafting_shapeless",
+    "conditions" : Slot('conditions', optional=True), 
+    "ingredients" : [ {"item" : Slot('ingredient') } ],
+    "result" : Slot('result')
+}, sort_keys=True)
+
+
+def storage_recipes(modid, material, item="ingot", block="block", nugget=True,
+                    large_chunk=False, medium_chunk=False, conditions=False):
+    """ build the storage recipes for material; returns a list of
+    (filename, recipe json text).
+    """
+    pattern_templates = dict(PATTERN_TEMPLATES)
+    mod_storage = list(STORAGE)
+    mod_storage[0] = block
+    mod_storage[1] = item
+    mod_storage[2] = "{}_from_nuggets".format(item)
+    for ii,v in enumerate(STORAGE):
+        if STORAGE[ii] != mod_storage[ii]:
+            pattern_templates[mod_storage[ii]] = pattern_templates[STORAGE[ii]]
+
+    #print(pattern_templates)
+
+    slist = ["{}_{}".format(material, a) for a in mod_storage] 
+    block_name = slist[0]
+    ingot_name = slist[1]
+    ingot2_name = slist[2]
+    nugget_name = slist[3]
+    slist[4] = "large_{}_chunk".format(material)
+    large_chunk_name = slist[4]
+    slist[6] = "medium_{}_chunk".format(material)
+    medium_chunk_name = slist[6]
+    slist[7] = "medium_{}_chunk2".format(material)
+    slist[8] = "{}_nuggets_from_medium".format(material)
+
+    item_list = slist[0:2]
+    if nugget:
+        item_list.extend(slist[2:4])
+    if large_chunk:
+        item_list.extend(slist[4:6])
+    if medium_chunk:
+        item_list.extend(slist[6:9])
+
+    ingredients = { a: None for a in mod_storage}
+    ingredients[mod_storage[0]] = ingot_name
+    ingredients[mod_storage[1]] = block_name
+    ingredients["ingot_from_nuggets"] = nugget_name
+    ingredients["nugget"] = ingot_name
+    ingredients["large_chunk"] = nugget_name
+    ingredients["nuggets_from_chunk"] = large_chunk_name
+    ingredients["medium_chunk"] = nugget_name
+    ingredients["medium_chunk2"] = large_chunk_name
+    ingredients["nuggets_from_medium"] = medium_chunk_name
+
+    # get my constants:
+    pattern_dict = {"S" : "material_item", "#" : "nugget" }
+    pattern_dict["S"] = "{}:{}_{}".format(modid, material, item)
+    pattern_dict["#"] = "{}:{}_{}".format(modid, material, "nugget")
+
+    if conditions:
+        conditions = [ { "type" : "{}:flag".format(modid),
+                         "flag" : "{}_tools_enabled".format(material) } ]
+    else:
+        conditions = OMIT
+
+    # cycle through items, select conditions, build recipe.
+    recipes = []
+    for storage_item in item_list:
+        filename = "{}.json".format(storage_item)
+        result_item = storage_item
+        if storage_item.startswith('large'):
+            type_of_item = 'large_chunk'
+        elif storage_item.startswith('medium'):
+            if storage_item.endswith('2'):
+                type_of_item = 'medium_chunk2'
+                result_item = "medium_{}_chunk".format(material) 
+            else:
+                type_of_item = 'medium_chunk'
+        elif storage_item.endswith('nuggets'):
+            type_of_item = 'ingot_from_nuggets'
+            result_item = "{}_{}".format(material, item)
+        elif storage_item.endswith('nuggets_from_chunk'):
+            type_of_item = 'nuggets_from_chunk'
+            result_item = "{}_{}".format(material, 'nugget')
+        elif storage_item.endswith('nuggets_from_medium'):
+            type_of_item = 'nuggets_from_medium'
+            result_item = "{}_{}".format(material, 'nugget')
+        else:
+            type_of_item = storage_item.rsplit("_",1)[1]
+
+        result = { "item" : "{}:{}".format(modid, result_item) }
+        if type_of_item == 'nuggets_from_chunk':
+            result["count"] = 8
+        elif type_of_item == 'nuggets_from_medium':
+            result["count"] = 4
+        elif type_of_item == 'medium_chunk2':
+            result["count"] = 2
+
+        # shapeless recipes
+        if pattern_templates[type_of_item] == 'shapeless':
+            result.setdefault("count", 9)
+            recipe = SHAPELESS_TEMPLATE.render(conditions=conditions,
+                        ingredient="{}:{}".format(modid, ingredients[type_of_item]),
+                        result=result)
+        # shaped recipes
+        else:
+            pattern = pattern_templates[type_of_item]
+            key = {}
+            if any('S' in a for a in pattern):
+                key["S"] = {"item" : pattern_dict["S"] }
+            if any('#' in a for a in pattern):
+                key["#"] = {"item" : pattern_dict["#"] }
+            recipe = SHAPED_TEMPLATE.render(conditions=conditions,
+                        pattern=pattern, key=key, result=result)
+        # end-else
+        recipes.append((filename, recipe))
+    return recipes
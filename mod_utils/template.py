@@ -0,0 +1,339 @@
+"""
+Compiled JSON templates.
+
+The scripts used to copy.deepcopy() a template dict, fill in the None
+placeholders, and json.dump() the whole tree for every file. Instead, a
+Template marks its placeholders with Slot objects and is serialized once, up
+front, into a list of literal text chunks with the slots between them.
+Rendering a file is then just encoding the slot values and joining the
+chunks, and gives exactly the text json.dump() would have written.
+
+    STAIRS_TEMPLATE = Template({ "variants" : { ... { "model" : Slot('stairs') } ... } })
+    text = STAIRS_TEMPLATE.render(stairs="foo:block/bar_stairs", ...)
+
+Slot values may be any JSON-able value; lists and dicts are indented to
+match their position in the template. An optional Slot whose value is OMIT
+(or not given) drops its key (or list element) from the output; each
+combination of omitted slots is compiled once, on first use.
+
+Output profiles: every Template renders in the active profile, chosen once
+per run with set_profile() (the generators' --profile option):
+
+    pretty    - json.dump(indent=4), with the template's own key order. The
+                default; diffs nicely in source control.
+    minified  - no whitespace at all, same key order. For release jars.
+    canonical - no whitespace, keys sorted everywhere, non-ASCII text as
+                UTF-8 rather than escaped; the same data always gives
+                the same bytes.
+
+The compact profiles encode slot values with orjson when it is installed,
+and with the stdlib json module otherwise.
+"""
+
+import json
+import re
+from json.encoder import encode_basestring, encode_basestring_ascii
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Slot(object):
+    """ placeholder for a per-file value in a Template. """
+    __slots__ = ('name', 'optional')
+
+    def __init__(self, name, optional=False):
+        self.name = name
+        self.optional = optional
+
+    def __repr__(self):
+        return "Slot({!r}{})".format(self.name, ', optional=True' if self.optional else '')
+
+
+# slot value meaning "leave this key out".
+OMIT = object()
+
+_CONSTANTS = { None : 'null', True : 'true', False : 'false' }
+_SENTINEL = '\x00{}\x00'
+_SENTINEL_RE = re.compile(r'"\\u0000(.*?)\\u0000"')
+
+# orjson formats floats differently from the stdlib (1e16 for 1e+16,
+# 0.00001 for 1e-05...); anything that may be a float goes to the stdlib.
+_FLOAT_RE = re.compile(r'[0-9][.eE]')
+
+PROFILES = ('pretty', 'minified', 'canonical')
+_profile = 'pretty'
+
+
+def set_profile(name):
+    """ choose the output profile all Templates render in. """
+    global _profile
+    if name not in PROFILES:
+        raise ValueError("unknown output profile {}".format(name))
+    _profile = name
+
+
+def get_profile():
+    return _profile
+
+
+class Template(object):
+    """ a JSON template, compiled on first use into text chunks and slots. """
+
+    def __init__(self, tree, sort_keys=False, indent=4, separators=None,
+                 ensure_ascii=True):
+        self.tree = tree
+        self.sort_keys = sort_keys
+        self.indent = indent
+        self.separators = separators
+        self.ensure_ascii = ensure_ascii
+        self.slots = {}
+        self._find_slots(tree)
+        self.optional = frozenset(n for n, s in self.slots.items() if s.optional)
+        self._compiled = {}
+        self._variants = {}
+        self._encoder = json.JSONEncoder(indent=indent, sort_keys=sort_keys,
+                                         separators=separators,
+                                         ensure_ascii=ensure_ascii)
+        self._item_sep = self._encoder.item_separator
+        self._key_sep = self._encoder.key_separator
+        if indent is not None and not isinstance(indent, str):
+            self._indent = ' ' * indent
+        else:
+            self._indent = indent
+        if ensure_ascii:
+            self._encode_str = encode_basestring_ascii
+        else:
+            self._encode_str = encode_basestring
+        self._orjson_option = None
+        if orjson is not None and indent is None and self._item_sep == ',' \
+                and self._key_sep == ':':
+            self._orjson_option = orjson.OPT_SORT_KEYS if sort_keys else 0
+
+    def _find_slots(self, node):
+        if isinstance(node, Slot):
+            self.slots[node.name] = node
+        elif isinstance(node, dict):
+            for v in node.values():
+                self._find_slots(v)
+        elif isinstance(node, list):
+            for v in node:
+                self._find_slots(v)
+
+    def dumps(self, value):
+        """ serialize a value with this template's json settings. """
+        if self._orjson_option is not None:
+            text = self._fast_dumps(value)
+            if text is not None:
+                return text
+        return self._encoder.encode(value)
+
+    def _fast_dumps(self, value):
+        """ compact orjson encoding, or None where it would not match the
+        stdlib (non-ASCII text we must escape, floats, keys or ints orjson
+        won't take...).
+        """
+        try:
+            text = orjson.dumps(value, option=self._orjson_option).decode('utf-8')
+        except TypeError:
+            return None
+        if self.ensure_ascii and not text.isascii():
+            return None
+        if _FLOAT_RE.search(text):
+            return None
+        return text
+
+    def variant(self, profile):
+        """ this template with the json settings of an output profile. """
+        if profile == 'pretty':
+            return self
+        template = self._variants.get(profile)
+        if template is None:
+            if profile == 'minified':
+                template = Template(self.tree, sort_keys=self.sort_keys, indent=None,
+                                    separators=(',', ':'), ensure_ascii=self.ensure_ascii)
+            elif profile == 'canonical':
+                template = Template(self.tree, sort_keys=True, indent=None,
+                                    separators=(',', ':'), ensure_ascii=False)
+            else:
+                raise ValueError("unknown output profile {}".format(profile))
+            self._variants[profile] = template
+        return template
+
+    def _substitute(self, node, values, omitted):
+        """ copy node, replacing slots by values; used by fill() and compile. """
+        if isinstance(node, dict):
+            return { k : self._substitute(v, values, omitted)
+                     for k, v in node.items()
+                     if not (isinstance(v, Slot) and v.name in omitted) }
+        if isinstance(node, list):
+            return [ self._substitute(v, values, omitted) for v in node
+                     if not (isinstance(v, Slot) and v.name in omitted) ]
+        if isinstance(node, Slot):
+            return values[node.name]
+        return node
+
+    def _omitted(self, values):
+        if not self.optional:
+            return frozenset()
+        return frozenset(n for n in self.optional
+                         if values.get(n, OMIT) is OMIT)
+
+    def compile(self, omitted=frozenset()):
+        """ serialize the template once, with sentinels where the slots are,
+        and split the text into literal chunks and (slot, indent) pairs.
+        """
+        compiled = self._compiled.get(omitted)
+        if compiled is not None:
+            return compiled
+        sentinels = { n : _SENTINEL.format(n) for n in self.slots }
+        text = self.dumps(self._substitute(self.tree, sentinels, omitted))
+        chunks = []
+        holes = []
+        pos = 0
+        for m in _SENTINEL_RE.finditer(text):
+            chunks.append(text[pos:m.start()])
+            line_start = text.rfind('\n', 0, m.start()) + 1
+            # the indent is whatever precedes a dict key (or the slot itself)
+            prefix = text[line_start:m.start()]
+            if '"' in prefix:
+                prefix = prefix[:prefix.index('"')]
+            holes.append((m.group(1), prefix))
+            pos = m.end()
+        chunks.append(text[pos:])
+        compiled = (chunks, holes)
+        self._compiled[omitted] = compiled
+        return compiled
+
+    def _encode(self, value, prefix):
+        if isinstance(value, str):
+            return self._encode_str(value)
+        if self._indent is None:
+            return self.dumps(value)
+        out = []
+        self._append(out, value, prefix)
+        return ''.join(out)
+
+    def _append(self, out, value, prefix):
+        """ pretty-print value into out exactly as json.dump(indent=...) does
+        when nested at the given prefix; the stdlib's indenting encoder is
+        pure python and slow to set up for small values.
+        """
+        t = type(value)
+        if t is str:
+            out.append(self._encode_str(value))
+        elif value is None or value is True or value is False:
+            out.append(_CONSTANTS[value])
+        elif t is int:
+            out.append(int.__repr__(value))
+        elif t is float and value - value == 0.0:
+            out.append(float.__repr__(value))
+        elif t is list or t is tuple:
+            if not value:
+                out.append('[]')
+                return
+            inner = prefix + self._indent
+            sep = self._item_sep + '\n' + inner
+            out.append('[\n' + inner)
+            first = True
+            for v in value:
+                if first:
+                    first = False
+                else:
+                    out.append(sep)
+                self._append(out, v, inner)
+            out.append('\n' + prefix + ']')
+        elif t is dict and all(type(k) is str for k in value):
+            if not value:
+                out.append('{}')
+                return
+            inner = prefix + self._indent
+            sep = self._item_sep + '\n' + inner
+            out.append('{\n' + inner)
+            first = True
+            items = sorted(value.items()) if self.sort_keys else value.items()
+            for k, v in items:
+                if first:
+                    first = False
+                else:
+                    out.append(sep)
+                out.append(self._encode_str(k))
+                out.append(self._key_sep)
+                self._append(out, v, inner)
+            out.append('\n' + prefix + '}')
+        else:
+            text = self._encoder.encode(value)
+            if prefix and '\n' in text:
+                text = text.replace('\n', '\n' + prefix)
+            out.append(text)
+
+    def render(self, **values):
+        """ return the JSON text for the given slot values. """
+        if _profile != 'pretty':
+            return self.variant(_profile)._render(values)
+        return self._render(values)
+
+    def _render(self, values):
+        chunks, holes = self.compile(self._omitted(values))
+        out = [chunks[0]]
+        encoded = {}
+        for (name, prefix), chunk in zip(holes, chunks[1:]):
+            key = (name, prefix)
+            text = encoded.get(key)
+            if text is None:
+                text = self._encode(values[name], prefix)
+                encoded[key] = text
+            out.append(text)
+            out.append(chunk)
+        return ''.join(out)
+
+    def fill(self, **values):
+        """ return a new dict/list tree with the slots filled in. """
+        return self._substitute(self.tree, values, self._omitted(values))
+
+
+_PLAIN = Template({})
+
+
+def dumps(value):
+    """ a whole value (no slots) as JSON text in the active profile. """
+    return _PLAIN.variant(_profile).dumps(value)
+
+
+def stream_json(section, entries, mapping=True):
+    """ text chunks of { section : { key : value ... } } (or of a list of
+    values, if not mapping), encoding one entry at a time in the active
+    output profile; entries are (key, value) pairs, or values. With
+    section None, chunks of the bare { key : value ... } object.
+    """
+    t = _PLAIN.variant(_profile)
+    pretty = t.indent is not None
+    opening, closing = ('{', '}') if mapping else ('[', ']')
+    if section is None:
+        indent = '\n    '
+        yield opening
+    else:
+        indent = '\n        '
+        if pretty:
+            yield '{\n    ' + t.dumps(section) + ': ' + opening
+        else:
+            yield '{' + t.dumps(section) + ':' + opening
+    first = True
+    for entry in entries:
+        if mapping:
+            key, value = entry
+            text = t.dumps(key) + (': ' if pretty else ':') + t.dumps(value)
+        else:
+            text = t.dumps(entry)
+        if pretty:
+            text = indent + text.replace('\n', indent)
+        yield text if first else ',' + text
+        first = False
+    if section is None:
+        yield closing if first or not pretty else '\n' + closing
+    elif pretty:
+        yield closing + '\n}' if first else '\n    ' + closing + '\n}'
+    else:
+        yield closing + '}'
@@ -0,0 +1,105 @@
+"""
+Standard tool and armor recipes for a material, and the vanilla smelting &
+blasting recipes that recycle them into nuggets. Used by
+make_tool_recipes.py and make_material.py.
+
+    for filename, text in tools.tool_recipes('foo', 'copper', armor=True): ...
+"""
+
+from mod_utils.template import Template, Slot, OMIT
+
+TOOLS = ('axe', 'hoe', 'pickaxe', 'shears', 'shovel', 'sword')
+ARMORS = ('boots', 'chestplate', 'helmet', 'leggings')
+
+PATTERN_TEMPLATES = { 
+    'axe' : [ "SS ", "ST ", " T " ], 
+    'hoe' : [ "SS ", " T ", " T " ], 
+    'pickaxe' : ["SSS", " T ", " T "],
+    'shears' : ["S ", " S"], 
+    'shovel' : [" S ", " T ", " T "],
+    'sword' : [ " S ", " S ", " T "],
+    'boots' : [ "S S", "S S"],
+    'chestplate' : ["S S", "SSS", "SSS"],
+    'helmet' : ["SSS", "S S"],
+    'leggings' : ["SSS", "S S", "S S"]
+}
+
+RECIPE_TEMPLATE = Template({ 
+    "conditions" : Slot('conditions', optional=True), 
+    "result" : { "item" : Slot('result') },
+    "pattern" : Slot('pattern'),
+    "type" : "minecraft:crafting_shaped",
+    "key" : Slot('key')
+}, sort_keys=True)
+
+VANILLA_RECYCLING_TEMPLATE = Template({ 
+    "type" : Slot('type'),
+    "ingredient" : Slot('ingredient'),
+    "result" : Slot('result'),
+    "experience" : 0.2,
+    "cookingtime" : Slot('cookingtime')
+}, sort_keys=True)
+
+
+def tool_items(prefix, armor=False, tools=True):
+    """ names of the tools (unless tools is False) and armor (if armor) for
+    material prefix.
+    """
+    item_list = ["{}_{}".format(prefix, a) for a in TOOLS] if tools else []
+    if armor:
+        item_list.extend(["{}_{}".format(prefix, a) for a in ARMORS])
+    return item_list
+
+
+def recycling_recipes(modid, prefix, armor=False, tools=True):
+    """ vanilla smelting & blasting recipes turning tools (and armor) back
+    into nuggets; returns a list of (filename, recipe json text), empty if
+    there are neither.
+    """
+    result = "{}:{}_nugget".format(modid, prefix)
+    ingredient = [ { "item" : "{}:{}".format(modid, item), "count" : 1 }
+                   for item in tool_items(prefix, armor, tools) ]
+    if not ingredient:
+        return []
+    return [
+        ("{}_nugget_from_smelting.json".format(prefix),
+         VANILLA_RECYCLING_TEMPLATE.render(type="minecraft:smelting",
+                ingredient=ingredient, result=result, cookingtime=200)),
+        ("{}_nugget_from_blasting.json".format(prefix),
+         VANILLA_RECYCLING_TEMPLATE.render(type="minecraft:blasting",
+                ingredient=ingredient, result=result, cookingtime=100)) ]
+
+
+def tool_pattern_keys(modid, prefix, item="ingot"):
+    return {
+        "S" : "{}:{}_{}".format(modid, prefix, item), 
+        "T" : "forge:rods/wooden" 
+    }
+
+
+def tool_recipes(modid, prefix, armor=False, conditions=False, item="ingot", tools=True):
+    """ shaped tool (unless tools is False) and armor (if armor) recipes for
+    material prefix; returns a list of (filename, recipe json text).
+    """
+    pattern_dict = tool_pattern_keys(modid, prefix, item)
+    if conditions:
+        conditions = [ { "type" : "{}:flag".format(modid),
+                         "flag" : "{}_tools_enabled".format(prefix) } ]
+    else:
+        conditions = OMIT
+
+    recipes = []
+    for tool in tool_items(prefix, armor, tools):
+        type_of_item = tool.rsplit("_",1)[1]
+        pattern = PATTERN_TEMPLATES[type_of_item]
+        # build recipe key
+        key = {}
+        if any('S' in a for a in pattern):
+            key["S"] = {"item" : pattern_dict["S"] }
+        if any('T' in a for a in pattern):
+            key["T"] = {"tag" : pattern_dict["T"] }
+
+        recipe = RECIPE_TEMPLATE.render(conditions=conditions,
+                    result="{}:{}".format(modid, tool), pattern=pattern, key=key)
+        recipes.append(("{}.json".format(tool), recipe))
+    return recipes
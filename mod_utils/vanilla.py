@@ -0,0 +1,137 @@
+"""
+Vanilla models, read straight out of a Minecraft client jar.
+
+    vanilla = VanillaModels(jar)
+    entry = vanilla.get('block/slab')     # (parent, textures, face variables)
+    vanilla.save()
+
+Only what parent-chain resolution needs is kept per model: its parent, its
+textures table, and the texture variables its elements' faces use (None
+if it has no elements). The jar is opened on the first model not already
+known, and only that entry is read; what has been read is kept in a
+compact index in the mod_utils cache directory, keyed on the jar's path,
+size and mtime, so later runs usually don't open the jar at all.
+
+find_client_jar() looks for a jar in the usual places: $MOD_UTILS_CLIENT_JAR,
+ForgeGradle's cache and the launcher's versions directory.
+"""
+
+import os
+import os.path
+import glob
+import json
+import zipfile
+
+from mod_utils import output
+
+INDEX_VERSION = 1
+MODELS = 'assets/minecraft/models/'
+# where client jars usually are; the newest is used.
+JAR_PATTERNS = (
+    '~/.gradle/caches/forge_gradle/minecraft_repo/versions/*/client.jar',
+    '~/.gradle/caches/minecraft/net/minecraft/minecraft/*/minecraft-*.jar',
+    '~/.minecraft/versions/*/*.jar',
+)
+
+
+def find_client_jar():
+    """ $MOD_UTILS_CLIENT_JAR, else the newest client jar found in the
+    usual places, else None.
+    """
+    jar = os.environ.get('MOD_UTILS_CLIENT_JAR')
+    if jar:
+        return jar
+    found = []
+    for pattern in JAR_PATTERNS:
+        found.extend(glob.glob(os.path.expanduser(pattern)))
+    if not found:
+        return None
+    return max(found, key=os.path.getmtime)
+
+
+def face_variables(elements):
+    """ the texture variables the faces of a model's elements use. """
+    names = set()
+    for element in elements:
+        if not isinstance(element, dict):
+            continue
+        for face in (element.get('faces') or {}).values():
+            texture = face.get('texture') if isinstance(face, dict) else None
+            if isinstance(texture, str):
+                names.add(texture[1:] if texture.startswith('#') else texture)
+    return sorted(names)
+
+
+def model_entry(tree):
+    """ (parent, textures, face variables or None) for a model tree. """
+    if not isinstance(tree, dict):
+        return None, {}, None
+    parent = tree.get('parent')
+    textures = tree.get('textures')
+    elements = tree.get('elements')
+    return (parent if isinstance(parent, str) else None,
+            textures if isinstance(textures, dict) else {},
+            face_variables(elements) if isinstance(elements, list) else None)
+
+
+class VanillaModels(object):
+    """ the minecraft namespace models of one client jar. """
+
+    def __init__(self, jar, use_cache=True):
+        self.jar = os.path.abspath(jar)
+        st = os.stat(self.jar)
+        self.stamp = [st.st_size, st.st_mtime_ns]
+        self.cache_file = output.cache_file('vanilla', self.jar) if use_cache else None
+        # model path ('block/slab') => [parent, textures, face variables],
+        # or None if the jar doesn't have it.
+        self.models = {}
+        self.read = 0
+        self.dirty = False
+        self._zip = None
+        if self.cache_file is not None:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION and data.get('stamp') == self.stamp:
+            self.models = data.get('models', {})
+
+    def save(self):
+        if self.cache_file is None or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        tmp = "{}.{}.tmp".format(self.cache_file, os.getpid())
+        text = json.dumps({ 'version' : INDEX_VERSION, 'jar' : self.jar, 'stamp' : self.stamp,
+                            'models' : self.models }, separators=(',', ':'))
+        with open(tmp, 'w') as f:
+            f.write(text)
+        os.replace(tmp, self.cache_file)
+        self.dirty = False
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def get(self, path):
+        """ (parent, textures, face variables) of minecraft:<path>, or None
+        if there's no such model.
+        """
+        if path in self.models:
+            return self.models[path]
+        if self._zip is None:
+            self._zip = zipfile.ZipFile(self.jar)
+        try:
+            tree = json.loads(self._zip.read(MODELS + path + '.json'))
+        except (KeyError, ValueError):
+            entry = None
+        else:
+            entry = list(model_entry(tree))
+        self.read += 1
+        self.models[path] = entry
+        self.dirty = True
+        return entry
@@ -0,0 +1,311 @@
+"""
+Variant engine for rotated blockstates: the variants of stairs, doors,
+facing blocks and pillars are worked out from their properties and a few small rotation
+tables, instead of being written out by hand.
+
+Each block type is a VariantRule: its properties (in blockstate key order),
+and a rule mapping one state to (model slot, x, y, uvlock). The rule is
+expanded once per type into a compiled Template, so each further block of
+that type only substitutes its model names:
+
+    template = variants.variant_template('stairs')
+    text = template.render(stairs="foo:block/copper_stairs", ...)
+
+Blocks with arbitrary properties ('other' blockstates) are described by a
+property spec instead, see PropertySpec; their variants are enumerated
+lazily and streamed out one at a time, since the number of states grows
+multiplicatively with the properties.
+"""
+
+import itertools
+import string
+
+from mod_utils.template import Template, Slot, get_profile, stream_json
+
+# ROTATION TABLES
+# y rotation taking a model that faces east (stairs, doors) to each facing.
+Y_FROM_EAST = { 'east' : 0, 'south' : 90, 'west' : 180, 'north' : 270 }
+# y rotation taking a model that faces north (machines) to each facing.
+Y_FROM_NORTH = { 'north' : 0, 'east' : 90, 'south' : 180, 'west' : 270 }
+# (x, y) taking a model that faces north to each of the 6 facings.
+XY_FROM_NORTH = { 'north' : (0, 0), 'east' : (0, 90), 'south' : (0, 180),
+                  'west' : (0, 270), 'up' : (270, 0), 'down' : (90, 0) }
+# (x, y) taking a model standing up (axis=y, like logs) to each axis.
+XY_FROM_AXIS = { 'y' : (0, 0), 'z' : (90, 0), 'x' : (90, 90) }
+
+# stairs: (half, side of the corner) => extra y rotation; corner shapes
+# are drawn for the right-hand side, the left-hand ones are turned.
+STAIRS_Y = { ('bottom', 'straight') : 0, ('bottom', 'right') : 0, ('bottom', 'left') : 270,
+             ('top', 'straight') : 0, ('top', 'right') : 90, ('top', 'left') : 0 }
+STAIRS_SLOTS = { 'straight' : 'stairs', 'outer' : 'outer', 'inner' : 'inner' }
+
+# doors: (hinge, open) => (use the hinge model, extra y rotation)
+DOOR_TABLE = { ('left', 'false') : (False, 0), ('left', 'true') : (True, 90),
+               ('right', 'false') : (True, 0), ('right', 'true') : (False, 270) }
+DOOR_HALVES = { 'lower' : 'bottom', 'upper' : 'top' }
+
+
+def variant(model, x=0, y=0, uvlock=False):
+    """ a variant dict, keys in the usual order, leaving out defaults. """
+    v = { "model" : model }
+    if x:
+        v["x"] = x
+    if y:
+        v["y"] = y
+    if uvlock:
+        v["uvlock"] = True
+    return v
+
+
+def state_key(properties, state):
+    """ 'facing=east,half=bottom' for state, properties in key order. """
+    return ','.join("{}={}".format(name, state[name]) for name, values in properties)
+
+
+class VariantRule(object):
+    """ properties is [(name, values)] in blockstate key order; rule(state)
+    returns (slot, x, y, uvlock) for a state dict. order lists the property
+    names outermost first, for the order the variants are written in
+    (default: key order).
+    """
+
+    def __init__(self, properties, rule, order=None):
+        self.properties = properties
+        self.rule = rule
+        self.order = order or [name for name, values in properties]
+        self._template = None
+
+    def states(self):
+        """ every state dict, in output order. """
+        values = dict(self.properties)
+        for combo in itertools.product(*(values[name] for name in self.order)):
+            yield dict(zip(self.order, combo))
+
+    def skeleton(self):
+        """ [(key, slot, x, y, uvlock)] for every state. """
+        result = []
+        for state in self.states():
+            slot, x, y, uvlock = self.rule(state)
+            result.append((state_key(self.properties, state), slot, x % 360, y % 360, uvlock))
+        return result
+
+    def template(self):
+        """ the compiled blockstate template, made on first use. """
+        if self._template is None:
+            self._template = Template({ "variants" : { key : variant(Slot(slot), x, y, uvlock)
+                                        for key, slot, x, y, uvlock in self.skeleton() } })
+        return self._template
+
+
+def stairs_rule(state):
+    half = state['half']
+    shape = state['shape']
+    if shape == 'straight':
+        slot, side = 'stairs', 'straight'
+    else:
+        corner, side = shape.split('_')
+        slot = STAIRS_SLOTS[corner]
+    x = 180 if half == 'top' else 0
+    y = (Y_FROM_EAST[state['facing']] + STAIRS_Y[(half, side)]) % 360
+    return slot, x, y, bool(x or y)
+
+
+def door_rule(state):
+    hinged, turn = DOOR_TABLE[(state['hinge'], state['open'])]
+    slot = DOOR_HALVES[state['half']]
+    if hinged:
+        slot += '_hinge'
+    return slot, 0, Y_FROM_EAST[state['facing']] + turn, False
+
+
+def facing_rule(state):
+    x, y = XY_FROM_NORTH[state['facing']]
+    return 'model', x, y, False
+
+
+def horizontal_rule(state):
+    return 'model', 0, Y_FROM_NORTH[state['facing']], False
+
+
+def pillar_rule(state):
+    x, y = XY_FROM_AXIS[state['axis']]
+    return 'model', x, y, False
+
+
+def log_rule(state):
+    x, y = XY_FROM_AXIS[state['axis']]
+    return 'model' if state['axis'] == 'y' else 'horizontal', x, y, False
+
+
+def machine_rule(state):
+    slot = 'model_on' if state['lit'] == 'true' else 'model'
+    return slot, 0, Y_FROM_NORTH[state['facing']], False
+
+
+RULES = {
+    'stairs' : VariantRule(
+        [ ('facing', ('east', 'west', 'south', 'north')), ('half', ('bottom', 'top')),
+          ('shape', ('straight', 'outer_right', 'outer_left', 'inner_right', 'inner_left')) ],
+        stairs_rule, order=('half', 'shape', 'facing')),
+    'door' : VariantRule(
+        [ ('facing', ('east', 'north', 'south', 'west')), ('half', ('lower', 'upper')),
+          ('hinge', ('left', 'right')), ('open', ('false', 'true')) ],
+        door_rule),
+    'facing' : VariantRule(
+        [ ('facing', ('down', 'east', 'north', 'south', 'up', 'west')) ], facing_rule),
+    'horizontal_facing' : VariantRule(
+        [ ('facing', ('east', 'north', 'south', 'west')) ], horizontal_rule),
+    'pillar' : VariantRule([ ('axis', ('x', 'y', 'z')) ], pillar_rule),
+    'log' : VariantRule([ ('axis', ('x', 'y', 'z')) ], log_rule),
+    'machine' : VariantRule(
+        [ ('facing', ('east', 'north', 'south', 'west')), ('lit', ('false', 'true')) ],
+        machine_rule),
+}
+
+
+def variant_template(blocktype):
+    """ the compiled blockstate template for one of the RULES types. """
+    return RULES[blocktype].template()
+
+
+# PROPERTY SPECS
+# past this many states, an 'other' blockstate is written as multipart.
+MAX_VARIANTS = 4096
+
+def _values(name, value):
+    """ property name's values from a spec: a list, or a 'min..max' range. """
+    if isinstance(value, str) and '..' in value:
+        low, high = value.split('..', 1)
+        try:
+            low, high = int(low), int(high)
+        except ValueError:
+            raise ValueError("property {}: bad range {!r}: bounds must be integers".format(name, value))
+        if high < low:
+            raise ValueError("property {}: empty range {!r}".format(name, value))
+        return [str(v) for v in range(low, high + 1)]
+    if isinstance(value, list) and value:
+        return [str(v).lower() if isinstance(v, bool) else str(v) for v in value]
+    raise ValueError("property {}: values must be a list or a 'min..max' range: {!r}".format(name, value))
+
+
+class PropertySpec(object):
+    """ the blockstate of a block with arbitrary properties, from a spec
+    (a parsed JSON/TOML document):
+
+        properties  - table of property => list of values, or 'min..max'
+                      for integers; in blockstate key order.
+        model       - model name for a state, with {name} for the block name
+                      and {<property>} for property values (default
+                      '{name}'); namespaced to <modid>:block/ if it isn't.
+        values      - optional table of property => { value => text }, to
+                      use in the model name instead of the raw value (e.g.
+                      lit = { true = "_on", false = "" }).
+        rotate      - optional property turning the model: facing values
+                      (north, east... up, down) or axis values (x, y, z).
+        uvlock      - lock textures when rotated (default false).
+        max_variants - past this many states, write multipart (default 4096).
+
+    Only the properties named in model and rotate change the model; when
+    there are more than max_variants states and some properties don't
+    matter, the blockstate is written as multipart, one part per
+    combination of the properties that do.
+    """
+
+    def __init__(self, spec, modid, blockname):
+        if not isinstance(spec, dict) or not isinstance(spec.get('properties'), dict) \
+                or not spec['properties']:
+            raise ValueError("property spec needs a 'properties' table")
+        self.modid = modid
+        self.blockname = blockname
+        self.properties = [ (name, _values(name, v)) for name, v in spec['properties'].items() ]
+        names = set(name for name, values in self.properties)
+        self.model = spec.get('model', '{name}')
+        self.names = dict((k, { str(val).lower() if isinstance(val, bool) else str(val) : text
+                                for val, text in v.items() })
+                          for k, v in (spec.get('values') or {}).items())
+        self.rotate = spec.get('rotate')
+        self.uvlock = bool(spec.get('uvlock', False))
+        self.max_variants = int(spec.get('max_variants', MAX_VARIANTS))
+
+        fields = set(f for text, f, fmt, conv in string.Formatter().parse(self.model) if f)
+        unknown = fields - names - { 'name' }
+        if unknown:
+            raise ValueError("model {} uses unknown properties: {}".format(self.model,
+                             ', '.join(sorted(unknown))))
+        self.relevant = fields & names
+        if self.rotate is not None:
+            if self.rotate not in names:
+                raise ValueError("rotate: no property {}".format(self.rotate))
+            rvalues = dict(self.properties)[self.rotate]
+            if set(rvalues) <= set(XY_FROM_AXIS):
+                self.rotation = XY_FROM_AXIS
+            elif set(rvalues) <= set(XY_FROM_NORTH):
+                self.rotation = XY_FROM_NORTH
+            else:
+                raise ValueError("rotate: {} values are not facings or axes".format(self.rotate))
+            self.relevant.add(self.rotate)
+        # the model is only formatted as the variants are streamed out, by
+        # when the file is half written: try it on the first state now.
+        try:
+            self.apply({ name : values[0] for name, values in self.properties })
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise ValueError("model {}: {}".format(self.model, e))
+
+    def count(self):
+        """ the number of states. """
+        n = 1
+        for name, values in self.properties:
+            n *= len(values)
+        return n
+
+    def multipart(self):
+        """ whether to write multipart rather than variants. """
+        if self.count() <= self.max_variants:
+            return False
+        return len(self.relevant) < len(self.properties)
+
+    def apply(self, state):
+        """ the variant dict for a state (only relevant properties needed). """
+        fields = { name : self.names.get(name, {}).get(value, value)
+                   for name, value in state.items() }
+        model = self.model.format(name=self.blockname, **fields)
+        if ':' not in model:
+            model = "{}:block/{}".format(self.modid, model)
+        x = y = 0
+        if self.rotate is not None:
+            x, y = self.rotation[state[self.rotate]]
+        return variant(model, x, y, self.uvlock and bool(x or y))
+
+    def _ordered(self, properties):
+        """ canonical output sorts keys, and so property names and values;
+        enumerating in sorted order keeps it streaming.
+        """
+        if get_profile() == 'canonical':
+            return sorted((name, sorted(values)) for name, values in properties)
+        return properties
+
+    def variants(self):
+        """ (key, variant) for every state, lazily. """
+        properties = self._ordered(self.properties)
+        names = [name for name, values in properties]
+        for combo in itertools.product(*(values for name, values in properties)):
+            state = dict(zip(names, combo))
+            yield ','.join("{}={}".format(n, v) for n, v in zip(names, combo)), self.apply(state)
+
+    def parts(self):
+        """ multipart parts, one per combination of relevant properties. """
+        properties = self._ordered([(name, values) for name, values in self.properties
+                                    if name in self.relevant])
+        names = [name for name, values in properties]
+        for combo in itertools.product(*(values for name, values in properties)):
+            state = dict(zip(names, combo))
+            if state:
+                yield { "when" : state, "apply" : self.apply(state) }
+            else:
+                yield { "apply" : self.apply(state) }
+
+    def stream(self):
+        """ the blockstate text, in chunks. """
+        if self.multipart():
+            return stream_json("multipart", self.parts(), mapping=False)
+        return stream_json("variants", self.variants())
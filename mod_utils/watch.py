@@ -0,0 +1,207 @@
+"""
+Watch directories for changed files, and work out which manifest rows
+changed between two reads of a manifest.
+
+    watcher = watch.open_watcher([manifest_dir, textures_block_dir])
+    for paths in watcher.batches(debounce=0.05):
+        ...
+        rows, removed = watch.diff_rows(old_rows, new_rows, lambda row: row['name'])
+
+On Linux, directories are watched with inotify (through ctypes, so nothing
+needs installing): a save shows up as soon as the editor closes or renames
+the file. Elsewhere, or if inotify can't be set up (no watches left, say),
+a PollingWatcher lists the directories every interval seconds and compares
+(mtime, size). Directories are watched, not files, since most editors save
+by writing a new file and renaming it over the old one.
+
+batches() waits for a change, then keeps collecting until nothing more has
+changed for debounce seconds, so a burst of saves (an editor writing a
+backup and the file, a texture pack unzipped into textures/block) is
+handled once.
+"""
+
+import os
+import os.path
+import sys
+import time
+import select
+import struct
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT = struct.Struct('iIII')
+# longest a burst of changes can hold off a batch, in seconds.
+MAX_DELAY = 1.0
+
+
+class Watcher(object):
+    """ base class: wait() returns the set of changed paths in the watched
+    directories, or an empty set after timeout seconds (None: no timeout).
+    """
+
+    def __init__(self, directories):
+        self.directories = sorted(set(os.path.abspath(d) for d in directories))
+
+    def wait(self, timeout=None):
+        raise NotImplementedError
+
+    def add(self, directory):
+        """ watch another directory too; raises OSError if it can't be. """
+        directory = os.path.abspath(directory)
+        if directory not in self.directories:
+            self._watch(directory)
+            self.directories.append(directory)
+
+    def _watch(self, directory):
+        pass
+
+    def batches(self, debounce=0.05):
+        """ yields the sets of paths changed, each once debounce seconds
+        have passed without further changes.
+        """
+        while True:
+            changed = set(self.wait())
+            deadline = time.monotonic() + MAX_DELAY
+            while time.monotonic() < deadline:
+                more = self.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+            yield changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher(Watcher):
+    """ inotify(7); raises OSError if it can't be used here. """
+
+    def __init__(self, directories):
+        Watcher.__init__(self, directories)
+        if ctypes is None or not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(self.libc, 'inotify_init1'):
+            raise OSError("no inotify in the C library")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        try:
+            for d in self.directories:
+                self._watch(d)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, "cannot watch {}: {}".format(directory, os.strerror(errno)))
+        self.watches[wd] = directory
+
+    def wait(self, timeout=None):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        pos = 0
+        while pos + EVENT.size <= len(data):
+            wd, mask, cookie, length = EVENT.unpack_from(data, pos)
+            name = data[pos + EVENT.size:pos + EVENT.size + length].rstrip(b'\0')
+            pos += EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # events were lost: say every directory changed.
+                changed.update(self.directories)
+            elif wd in self.watches:
+                directory = self.watches[wd]
+                changed.add(os.path.join(directory, os.fsdecode(name)) if name else directory)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher(Watcher):
+    """ lists the directories every interval seconds. """
+
+    def __init__(self, directories, interval=0.5):
+        Watcher.__init__(self, directories)
+        self.interval = interval
+        self.state = self._scan(self.directories)
+
+    def _watch(self, directory):
+        self.state.update(self._scan([directory]))
+
+    def _scan(self, directories):
+        state = {}
+        for d in directories:
+            try:
+                with os.scandir(d) as it:
+                    for entry in it:
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        state[entry.path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue
+        return state
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = self._scan(self.directories)
+            changed = { path for path in state.keys() | self.state.keys()
+                        if state.get(path) != self.state.get(path) }
+            self.state = state
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+
+
+def open_watcher(directories, poll=False, interval=0.5):
+    """ an InotifyWatcher where possible (unless poll), else a
+    PollingWatcher.
+    """
+    if not poll:
+        try:
+            return InotifyWatcher(directories)
+        except OSError:
+            pass
+    return PollingWatcher(directories, interval)
+
+
+def diff_rows(old, new, key):
+    """ (rows of new that are new or changed since old, names of old rows
+    no longer in new); rows are matched on key(row), their name.
+    """
+    before = { key(row) : row for row in old }
+    after = { key(row) : row for row in new }
+    changed = [row for name, row in after.items() if before.get(name) != row]
+    removed = [name for name in before if name not in after]
+    return changed, removed
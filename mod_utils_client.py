@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""
+Thin client for the mod_utils generator server: runs a generator script
+with the given arguments in the (already warm) server instead of starting a
+new python for it. Takes the same arguments as the script itself; e.g.
+
+    mod_utils_client.py gen_blockstate_jsons.py -t stairs copper_stairs
+
+The server is started in the background if it isn't running (see
+mod_utils_server.py). If it can't be reached, or the script wants to ask
+something (make_storage_recipes.py without --yes, say), the script is run
+directly.
+
+SYNOPSIS:
+
+mod_utils_client.py script [script arguments...]
+
+"""
+
+import sys
+import os
+import socket
+import json
+import time
+
+# how long to wait for a freshly started server.
+START_TIMEOUT = 5.0
+
+
+def socket_path():
+    # same as mod_utils.daemon.socket_path(); copied to keep the client tiny.
+    path = os.environ.get('MOD_UTILS_SOCKET')
+    if path:
+        return path
+    rundir = os.environ.get('XDG_RUNTIME_DIR')
+    if rundir and os.path.isdir(rundir):
+        return os.path.join(rundir, 'mod_utils.sock')
+    return os.path.join('/tmp', 'mod_utils-{}.sock'.format(os.getuid()))
+
+
+def connect(path):
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(path)
+    except OSError:
+        s.close()
+        return None
+    return s
+
+
+def start_server(path):
+    import subprocess
+    server = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                          'mod_utils_server.py')
+    subprocess.Popen([sys.executable, server, '--socket', path],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        s = connect(path)
+        if s is not None:
+            return s
+        time.sleep(0.02)
+    return None
+
+
+def run_directly(script, argv):
+    """ fallback: exec the script itself. """
+    here = os.path.dirname(os.path.realpath(__file__))
+    script = os.path.join(here, os.path.basename(script))
+    if not script.endswith('.py'):
+        script = script + '.py'
+    os.execv(sys.executable, [sys.executable, script] + argv)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help'):
+        print(__doc__.strip())
+        return 0 if len(sys.argv) >= 2 else 2
+    script = sys.argv[1]
+    argv = sys.argv[2:]
+    path = socket_path()
+
+    s = connect(path)
+    if s is None:
+        s = start_server(path)
+    if s is None:
+        run_directly(script, argv)
+
+    request = { 'script' : script, 'argv' : argv, 'cwd' : os.getcwd() }
+    with s:
+        s.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        chunks = []
+        while True:
+            data = s.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+    try:
+        response = json.loads(b''.join(chunks).decode('utf-8'))
+    except ValueError:
+        print("mod_utils_client: no reply from server; running {} directly".format(script),
+              file=sys.stderr)
+        run_directly(script, argv)
+    if response.get('interactive'):
+        run_directly(script, argv)
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    return response['status']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
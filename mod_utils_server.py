@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Run the persistent mod_utils generator server, which mod_utils_client.py
+talks to. Normally started on demand by mod_utils_client.py; shuts itself
+down after --idle seconds without requests.
+
+SYNOPSIS:
+
+usage: mod_utils_server.py [-h] [--socket SOCKET] [--idle IDLE] [--stop]
+
+Run the mod_utils generator server
+
+optional arguments:
+  -h, --help       show this help message and exit
+  --socket SOCKET  unix socket path (default: $MOD_UTILS_SOCKET, else
+                   $XDG_RUNTIME_DIR/mod_utils.sock or /tmp/mod_utils-<uid>.sock)
+  --idle IDLE      exit after this many seconds without requests
+  --stop           stop a running server
+
+"""
+
+import sys
+import socket
+import argparse
+import json
+
+from mod_utils import daemon
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the mod_utils generator server")
+    parser.add_argument("--socket", help="unix socket path")
+    parser.add_argument("--idle", type=float, default=daemon.DEFAULT_IDLE,
+            help="exit after this many seconds without requests")
+    parser.add_argument("--stop", action="store_true", help="stop a running server")
+    args = parser.parse_args(argv)
+
+    path = args.socket or daemon.socket_path()
+    if args.stop:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.connect(path)
+                s.sendall(json.dumps({ 'script' : '--stop' }).encode('utf-8') + b'\n')
+                s.recv(4096)
+        except OSError:
+            print("No mod_utils server running on {}".format(path))
+            return 1
+        return 0
+
+    try:
+        daemon.serve(path, args.idle)
+    except daemon.ServerRunning as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+"""
+Shrink blockstates: find the properties each variants map really depends
+on, and rewrite it as wildcard variants (keys naming only those properties)
+or multipart, whichever is smallest. Every rewrite is checked state by
+state against the original. Reports the entry count and size savings.
+Files whose smallest form is the same JSON, only in another --profile
+style, are counted separately and left alone.
+
+Runs over every .json file in the given files/directories (default: the
+current directory, normally assets/<modid>/blockstates), with a pool of
+worker processes.
+
+SYNOPSIS:
+
+usage: optimize_blockstates.py [-h] [--dry-run] [--quiet] [--jobs N]
+                               [--profile {pretty,minified,canonical}]
+                               [path [path ...]]
+
+positional arguments:
+  path                  blockstate files or directories (default: cwd)
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --dry-run, -n         only report what would be saved
+  --quiet, -q           only report the totals
+  --jobs N, -j N        optimize with N processes (default: one per CPU)
+  --profile {pretty,minified,canonical}
+                        JSON style to write (and compare sizes in); default
+                        pretty
+
+"""
+
+import sys
+import os
+import os.path
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from mod_utils import minimize, output, template
+
+
+def blockstate_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for f in sorted(filenames):
+                    if f.endswith('.json'):
+                        yield os.path.join(dirpath, f)
+        else:
+            yield path
+
+
+def optimize_file(path, profile):
+    """ (path, new text or None, info) for one blockstate file; info has
+    the sizes of the file before and after, or 'error'. A file whose
+    smaller form is the same JSON in another style is left alone, with
+    'reformat' set in info.
+    """
+    template.set_profile(profile)
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        original = json.loads(data)
+        tree, info = minimize.optimize(original, len(data))
+    except (OSError, ValueError) as e:
+        return path, None, { 'error' : str(e) }
+    if tree is None:
+        return path, None, info
+    if tree == original:
+        info['reformat'] = True
+        info['new_size'] = info['size']
+        info['new_entries'] = info['entries']
+        return path, None, info
+    text = template.dumps(tree)
+    if not text.endswith('\n') and data.endswith(b'\n'):
+        text += '\n'
+    info['new_size'] = len(text.encode('utf-8'))
+    if info['new_size'] >= info['size']:
+        info['new_size'] = info['size']
+        info['new_entries'] = info['entries']
+        return path, None, info
+    return path, text, info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rewrite blockstates in their smallest equivalent form")
+    parser.add_argument("path", nargs='*', default=[os.getcwd()],
+            help="blockstate files or directories (default: cwd)")
+    parser.add_argument("--dry-run", "-n", action="store_true",
+            help="only report what would be saved")
+    parser.add_argument("--quiet", "-q", action="store_true",
+            help="only report the totals")
+    parser.add_argument("--jobs", "-j", type=int, metavar="N",
+            help="optimize with N processes (default: one per CPU)")
+    parser.add_argument("--profile", choices=template.PROFILES, default='pretty',
+            help="JSON style to write (and compare sizes in); default pretty")
+    args = parser.parse_args(argv)
+
+    files = list(blockstate_files(args.path))
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs > 1 and len(files) > 1:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        results = pool.map(optimize_file, files, [args.profile] * len(files),
+                           chunksize=max(1, len(files) // (jobs * 8)))
+    else:
+        pool = None
+        results = (optimize_file(f, args.profile) for f in files)
+
+    writers = {}
+    totals = { 'files' : 0, 'rewritten' : 0, 'reformat' : 0, 'entries' : 0,
+               'new_entries' : 0, 'size' : 0, 'new_size' : 0, 'errors' : 0 }
+    try:
+        for path, text, info in results:
+            totals['files'] += 1
+            if 'error' in info:
+                print("Error: {}: {}".format(path, info['error']), file=sys.stderr)
+                totals['errors'] += 1
+                continue
+            for k in ('entries', 'new_entries', 'size', 'new_size'):
+                totals[k] += info[k]
+            if info.get('reformat'):
+                totals['reformat'] += 1
+            if text is None:
+                continue
+            totals['rewritten'] += 1
+            if not args.quiet:
+                print("{:<40} {:>6} => {:<6} entries {:>9} => {:<9} bytes  {}".format(
+                      os.path.basename(path), info['entries'], info['new_entries'],
+                      info['size'], info['new_size'], info['form']))
+            if not args.dry_run:
+                base = os.path.dirname(os.path.abspath(path))
+                if base not in writers:
+                    writers[base] = output.OutputWriter(base)
+                writers[base].write(os.path.basename(path), text)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        for writer in writers.values():
+            writer.close()
+
+    saved = totals['size'] - totals['new_size']
+    print("{} blockstates, {} {}: {} => {} entries, {} => {} bytes ({:.1%} smaller), {} errors".format(
+          totals['files'], totals['rewritten'], "could be rewritten" if args.dry_run else "rewritten",
+          totals['entries'], totals['new_entries'], totals['size'], totals['new_size'],
+          saved / totals['size'] if totals['size'] else 0.0, totals['errors']))
+    if totals['reformat']:
+        print("{} only differ from their smallest form in formatting; left alone".format(
+              totals['reformat']))
+    return 1 if totals['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+"""
+Run a shell script of generator calls (like test_custom.sh, or a mod's
+scripts/*.sh) in this one python process, instead of a new python for
+every line: cd, mkdir -p, variables and quoting are followed as sh would,
+and each gen_*.py/make_*.py line calls that script's main() directly, so
+the files come out the same. See mod_utils/replay.py for what is
+understood.
+
+SYNOPSIS:
+
+usage: replay_script.py [-h] [--cwd CWD] [--fallback] [--quiet] [--list]
+                        [--compare]
+                        script [arg [arg ...]]
+
+positional arguments:
+  script       shell script to replay
+  arg          arguments for the script ($1, $2...)
+
+optional arguments:
+  -h, --help   show this help message and exit
+  --cwd CWD    directory to start the script in (default: cwd)
+  --fallback   run lines that aren't generator calls, cd, mkdir, echo or
+               variable assignments with /bin/sh, and loops, ifs and the like
+               as whole blocks (default: report them as errors)
+  --quiet, -q  don't show the generators' output
+  --list       only show how each line would be run
+  --compare    also run the script with bash, and compare the wall-clock
+               times
+
+Exit status is the script's: that of the last line, or of the first to
+fail after 'set -e'.
+
+With --compare the script is run twice, with bash first; each run gets an
+empty mod_utils cache, so neither is helped by the other's hash index or
+generation cache. The replay does find the files bash wrote already there,
+which it would also after an earlier build.
+
+"""
+
+import sys
+import os
+import os.path
+import argparse
+import subprocess
+import tempfile
+import time
+
+from mod_utils import replay
+
+
+def run_shell(script, args, cwd, quiet):
+    """ (exit status, seconds) running script with bash, as normal. """
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ, MOD_UTILS_CACHE=cache)
+        result = subprocess.run(['bash', script] + list(args), cwd=cwd, env=env,
+                                stdout=subprocess.DEVNULL if quiet else None)
+    return result.returncode, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a shell script of generator calls in one process")
+    parser.add_argument("script", help="shell script to replay")
+    parser.add_argument("arg", nargs='*', help="arguments for the script ($1, $2...)")
+    parser.add_argument("--cwd", default=os.getcwd(),
+            help="directory to start the script in (default: cwd)")
+    parser.add_argument("--fallback", action="store_true",
+            help="run lines that aren't generator calls, cd, mkdir, echo or variable assignments "
+                 "with /bin/sh, and loops, ifs and the like as whole blocks (default: report them "
+                 "as errors)")
+    parser.add_argument("--quiet", "-q", action="store_true",
+            help="don't show the generators' output")
+    parser.add_argument("--list", action="store_true",
+            help="only show how each line would be run")
+    parser.add_argument("--compare", action="store_true",
+            help="also run the script with bash, and compare the wall-clock times")
+    args = parser.parse_args(argv)
+
+    script = os.path.abspath(args.script)
+    try:
+        steps = replay.parse_script(script, args.cwd, args.arg, args.fallback)
+    except OSError as e:
+        print("Error: cannot read {}: {}".format(args.script, e), file=sys.stderr)
+        return 1
+    except replay.ReplayError as e:
+        print("Error: {}: {}".format(args.script, e), file=sys.stderr)
+        return 1
+
+    shell = [step for step in steps if step.kind == 'shell']
+    if args.list:
+        for step in steps:
+            if step.kind == 'call':
+                what = "{} {}".format(step.script, ' '.join(step.argv))
+            elif step.kind == 'shell':
+                what = "sh: {}".format(step.text)
+            else:
+                what = "{} {}".format(step.kind, ' '.join(step.argv))
+            print("{:>5}  {:<40} {}".format(step.lineno, os.path.relpath(step.cwd, args.cwd), what))
+        return 0
+    if shell and not args.fallback:
+        for step in shell:
+            print("Error: line {}: not a generator call: {}".format(step.lineno, step.text),
+                  file=sys.stderr)
+        print("Use --fallback to run these with /bin/sh", file=sys.stderr)
+        return 1
+
+    shell_time = None
+    if args.compare:
+        status, shell_time = run_shell(script, args.arg, args.cwd, args.quiet)
+        print("bash: exit status {} in {:.3f} s".format(status, shell_time))
+
+    failed = []
+
+    def report(step, status):
+        if status:
+            failed.append((step, status))
+
+    calls = sum(1 for step in steps if step.kind == 'call')
+    saved_cache = os.environ.get('MOD_UTILS_CACHE')
+    with tempfile.TemporaryDirectory() as cache:
+        if args.compare:
+            os.environ['MOD_UTILS_CACHE'] = cache
+        start = time.perf_counter()
+        try:
+            status = replay.run_steps(steps, args.fallback, args.quiet, report)
+        finally:
+            if args.compare:
+                if saved_cache is None:
+                    del os.environ['MOD_UTILS_CACHE']
+                else:
+                    os.environ['MOD_UTILS_CACHE'] = saved_cache
+        elapsed = time.perf_counter() - start
+
+    for step, code in failed:
+        print("Failed: line {} (exit status {})".format(step.lineno, code), file=sys.stderr)
+    print("Replayed {} generator calls ({} shell lines) in {:.3f} s, {} failed".format(
+          calls, len(shell), elapsed, len(failed)))
+    if shell_time is not None:
+        print("bash: {:.3f} s, replay: {:.3f} s ({:.1f}x faster)".format(
+              shell_time, elapsed, shell_time / elapsed if elapsed else 0.0))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
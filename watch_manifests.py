@@ -0,0 +1,373 @@
+#!/usr/bin/python3
+"""
+Watch a mod's manifests (and textures) and regenerate what changes while
+you edit them: each time a block manifest or material spec is saved, it is
+read again and compared row by row with the last version, and only the
+blocks/materials that were added or changed get their blockstates, models,
+recipes, loot tables and advancements generated again. With --detect, the
+block and item rows come from the texture names instead (as
+gen_model_jsons.py --detect), and adding, removing or renaming textures
+regenerates the blocks and items affected.
+
+Everything listed is generated once at start (files that are already
+right are left alone), then the manifests' directories are watched: with
+inotify on Linux, otherwise by polling. Bursts of saves are handled once,
+after --debounce ms without changes. Editing a property spec named in a
+block manifest's spec column regenerates the rows using it. Rows removed
+from a manifest are reported; their files are left alone.
+
+Must be run in src/main/resources (or given --resources).
+
+SYNOPSIS:
+
+usage: watch_manifests.py [-h] [--resources RESOURCES] [--modid MODID]
+                          [--blocks MANIFEST | --detect] [--materials SPEC]
+                          [--manifest-format {json,toml,csv}] [--debounce MS]
+                          [--poll] [--interval SECONDS] [--quiet] [--force]
+                          [--zip ARCHIVE]
+                          [--profile {pretty,minified,canonical}] [--jobs N]
+
+Regenerate the blocks and materials that change in manifests as they are
+edited
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --resources RESOURCES
+                        the src/main/resources directory (default: cwd)
+  --modid MODID         mod id (default: the only mod under assets/ & data/)
+  --blocks MANIFEST     block manifest, as gen_blockstate_jsons.py --manifest
+                        takes: blockstates and models
+  --detect              block & item rows from the textures, as
+                        gen_model_jsons.py --detect: blockstates and models
+  --materials SPEC      material spec, as make_material.py takes: recipes,
+                        models, blockstates, loot tables and advancements (may
+                        be repeated)
+  --manifest-format {json,toml,csv}
+                        manifest format, if it cannot be told from the file
+                        extension
+  --debounce MS         wait this long after a change for more before
+                        regenerating (default: 50)
+  --poll                poll for changes even where inotify is available
+  --interval SECONDS    polling interval (default: 0.5)
+  --quiet, -q           only report the changes, not every file
+
+output options:
+  --force               rewrite output files even if their content is
+                        unchanged
+  --zip ARCHIVE         add output to this datapack/resource pack zip instead
+                        of writing files
+  --profile {pretty,minified,canonical}
+                        JSON output style: pretty (default), minified or
+                        canonical (sorted keys)
+  --jobs N, -j N        write files with a pool of N threads
+
+Stop it with Ctrl-C.
+
+"""
+
+import sys
+import os
+import os.path
+import argparse
+import contextlib
+import time
+
+from mod_utils import detect, manifest, output, watch
+from mod_utils.pipeline import StageError, run_stages
+import gen_blockstate_jsons
+import gen_model_jsons
+import make_material
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    """ gen_blockstate_jsons.py takes spec files relative to blockstates/. """
+    saved = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(saved)
+
+
+def block_name(row):
+    return row.get('blockname') or row.get('name')
+
+
+def material_name(row):
+    return row.get('name') or row.get('material')
+
+
+class Blocks(object):
+    """ block rows, from a manifest or from the textures: blockstates and
+    models.
+    """
+
+    def __init__(self, resources, modid, args):
+        self.modid = modid
+        self.args = args
+        assets = os.path.join(resources, 'assets', modid)
+        self.blockstates = os.path.join(assets, 'blockstates')
+        self.models = os.path.join(assets, 'models')
+        self.textures = os.path.join(assets, 'textures')
+        if args.detect:
+            self.name = 'textures'
+            self.directories = [os.path.join(self.textures, folder) for folder in ('block', 'item')]
+            self.triggers = None
+        else:
+            self.name = os.path.basename(args.blocks)
+            self.directories = [os.path.dirname(args.blocks)]
+            self.triggers = { args.blocks }
+        self.key = block_name
+        self.writers = None
+        # property spec => [rows using it]
+        self.specs = {}
+
+    def read(self):
+        if self.args.detect:
+            rows, unused = detect.detect_models(detect.TextureIndex(self.textures), self.modid)
+            return rows
+        return manifest.read_manifest(self.args.blocks, self.args.manifest_format, 'blocks')
+
+    def update(self, rows):
+        """ watch the property specs rows name (relative to blockstates/,
+        as gen_blockstate_jsons.py takes them) as well.
+        """
+        if self.args.detect:
+            return
+        self.specs = {}
+        for row in rows:
+            if row.get('spec'):
+                path = os.path.normpath(os.path.join(self.blockstates, row['spec']))
+                self.specs.setdefault(path, []).append(row)
+        self.triggers = { self.args.blocks } | set(self.specs)
+        directories = [os.path.dirname(self.args.blocks)]
+        directories.extend(sorted(set(os.path.dirname(path) for path in self.specs)))
+        self.directories = list(dict.fromkeys(directories))
+
+    def dependents(self, changed):
+        """ rows whose property spec is among the changed paths. """
+        rows = []
+        for path, users in self.specs.items():
+            if path in changed or os.path.dirname(path) in changed:
+                rows.extend(users)
+        return rows
+
+    def generate(self, rows):
+        if self.writers is None:
+            os.makedirs(self.blockstates, exist_ok=True)
+            self.writers = [output.open_writer(self.args, self.blockstates),
+                            output.open_writer(self.args, self.models)]
+        blockstates, models = self.writers
+        with working_directory(self.blockstates):
+            errors = gen_blockstate_jsons.run_manifest(self.modid, rows, blockstates, self.args.quiet)
+        errors += gen_model_jsons.run_manifest(self.modid, rows, models, self.args.quiet)
+        return errors
+
+    def flush(self):
+        return flush_writers(self.writers or ())
+
+
+class Materials(object):
+    """ material spec rows: everything make_material.py generates. """
+
+    def __init__(self, resources, modid, args):
+        self.resources = resources
+        self.modid = modid
+        self.args = args
+        self.name = ', '.join(os.path.basename(spec) for spec in args.materials)
+        self.directories = [os.path.dirname(spec) for spec in args.materials]
+        self.triggers = set(args.materials)
+        self.key = material_name
+        self.pipeline = None
+
+    def update(self, rows):
+        pass
+
+    def dependents(self, changed):
+        return []
+
+    def read(self):
+        rows = []
+        for spec in self.args.materials:
+            rows.extend(manifest.read_manifest(spec, self.args.manifest_format, 'materials'))
+        # bad rows are found here, not halfway through generating.
+        for row in rows:
+            make_material.Material(row)
+        return rows
+
+    def generate(self, rows):
+        materials = [make_material.Material(row) for row in rows]
+        if self.pipeline is None:
+            self.pipeline = make_material.MaterialPipeline(self.resources, self.modid, [], self.args)
+        # the stages work on whatever materials the pipeline holds.
+        self.pipeline.materials = materials
+
+        def report(name, seconds, files):
+            if not self.args.quiet:
+                print("  {:<20} {:6d} files  {:8.3f} s".format(name, len(files), seconds))
+        try:
+            run_stages(self.pipeline.stages(), self.args.jobs, report)
+        except StageError as e:
+            for name, err in e.errors.items():
+                print("Error: stage {} failed: {}".format(name, err), file=sys.stderr)
+            return 1
+        return 0
+
+    def flush(self):
+        if self.pipeline is None:
+            return 0
+        return flush_writers(self.pipeline.writers.values())
+
+
+def flush_writers(writers):
+    """ close (saving their hash indexes) writers that are used again
+    for the next change; returns the number of write errors.
+    """
+    errors = 0
+    for out in writers:
+        out.close()
+        errors += output.report_errors(out)
+        # ParallelWriters keep their errors; they've been reported now.
+        if getattr(out, 'errors', None):
+            out.errors.clear()
+    return errors
+
+
+def affected(source, changed):
+    """ whether any of the changed paths are source's files (a watched
+    directory itself is in changed when its events were lost).
+    """
+    for path in changed:
+        if path in source.directories:
+            return True
+        if source.triggers is None:
+            if os.path.dirname(path) in source.directories:
+                return True
+        elif path in source.triggers:
+            return True
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate the blocks and materials that change in manifests as they are edited")
+    parser.add_argument("--resources", default=os.getcwd(),
+            help="the src/main/resources directory (default: cwd)")
+    parser.add_argument("--modid", help="mod id (default: the only mod under assets/ & data/)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--blocks", metavar="MANIFEST",
+            help="block manifest, as gen_blockstate_jsons.py --manifest takes: blockstates and models")
+    group.add_argument("--detect", action="store_true",
+            help="block & item rows from the textures, as gen_model_jsons.py --detect: blockstates and models")
+    parser.add_argument("--materials", metavar="SPEC", action="append", default=[],
+            help="material spec, as make_material.py takes: recipes, models, blockstates, loot tables "
+                 "and advancements (may be repeated)")
+    parser.add_argument("--manifest-format", choices=manifest.FORMATS,
+            help="manifest format, if it cannot be told from the file extension")
+    parser.add_argument("--debounce", type=float, default=50, metavar="MS",
+            help="wait this long after a change for more before regenerating (default: 50)")
+    parser.add_argument("--poll", action="store_true",
+            help="poll for changes even where inotify is available")
+    parser.add_argument("--interval", type=float, default=0.5, metavar="SECONDS",
+            help="polling interval (default: 0.5)")
+    parser.add_argument("--quiet", "-q", action="store_true",
+            help="only report the changes, not every file")
+    # no incremental.Generation here, so no --depfile or --no-cache.
+    output.add_output_arguments(parser, generation=False)
+    args = parser.parse_args(argv)
+    if not (args.blocks or args.detect or args.materials):
+        parser.error("give --blocks, --detect and/or --materials")
+
+    resources = os.path.abspath(args.resources)
+    if os.path.basename(resources) != 'resources':
+        print('Warning: not in src/main/resources directory')
+        return 1
+    modid = args.modid or make_material.find_modid(resources)
+    if modid is None:
+        print('Error: cannot tell which mod this is; use --modid', file=sys.stderr)
+        return 1
+    # the working directory changes while generating.
+    if args.blocks:
+        args.blocks = os.path.abspath(args.blocks)
+    args.materials = [os.path.abspath(spec) for spec in args.materials]
+
+    sources = []
+    if args.blocks or args.detect:
+        sources.append(Blocks(resources, modid, args))
+    if args.materials:
+        sources.append(Materials(resources, modid, args))
+
+    rows = {}
+    for source in sources:
+        try:
+            rows[source] = source.read()
+        except (OSError, ValueError, KeyError) as e:
+            print("Error: cannot read {}: {}".format(source.name, e), file=sys.stderr)
+            return 1
+        source.update(rows[source])
+        start = time.perf_counter()
+        errors = source.generate(rows[source])
+        errors += source.flush()
+        print("{}: generated {} rows in {:.3f} s, {} errors".format(source.name,
+              len(rows[source]), time.perf_counter() - start, errors))
+
+    # watch_more() adds (or warns about) the rest.
+    directories = [d for source in sources for d in source.directories if os.path.isdir(d)]
+    watcher = watch.open_watcher(directories, args.poll, args.interval)
+    print("Watching {} ({}); Ctrl-C to stop".format(', '.join(source.name for source in sources),
+          'inotify' if isinstance(watcher, watch.InotifyWatcher) else 'polling'))
+    sys.stdout.flush()
+
+    def watch_more(source):
+        for d in source.directories:
+            try:
+                watcher.add(d)
+            except OSError as e:
+                print("Warning: {}".format(e), file=sys.stderr)
+    try:
+        for source in sources:
+            watch_more(source)
+        for changed in watcher.batches(args.debounce / 1000.0):
+            for source in sources:
+                if not affected(source, changed):
+                    continue
+                start = time.perf_counter()
+                try:
+                    new = source.read()
+                except (OSError, ValueError, KeyError) as e:
+                    # most likely saved half-way; wait for the next save.
+                    print("Error: cannot read {}: {}".format(source.name, e), file=sys.stderr)
+                    continue
+                updated, removed = watch.diff_rows(rows[source], new, source.key)
+                rows[source] = new
+                source.update(new)
+                watch_more(source)
+                seen = set(source.key(row) for row in updated)
+                for row in source.dependents(changed):
+                    if source.key(row) not in seen:
+                        seen.add(source.key(row))
+                        updated.append(row)
+                for name in removed:
+                    print("{}: {} removed; its files are left alone".format(source.name, name))
+                if not updated:
+                    continue
+                errors = source.generate(updated)
+                names = [str(source.key(row)) for row in updated]
+                if len(names) > 10:
+                    names[10:] = ["and {} more".format(len(names) - 10)]
+                print("{}: {} changed, regenerated in {:.1f} ms, {} errors".format(source.name,
+                      ', '.join(names), (time.perf_counter() - start) * 1000.0, errors))
+                # saving the hash indexes can wait until the files are out.
+                source.flush()
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        for source in sources:
+            source.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())